@@ -0,0 +1,289 @@
+# analysis_queue.py - 角度分析的持久化工作佇列
+# SQLite 保存工作；固定大小的 worker 池；同一 (user, topic) 只保留一筆進行中工作；執行中定期續約，租約逾時（程序中斷）才重新執行
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+
+class AnalysisQueue:
+    """
+    持久化工作佇列
+
+    handler(job) 在 worker 執行緒中執行；拋出例外時會重試，超過 max_attempts 後呼叫 on_give_up(job, error)
+    job 為 dict：id, user_id, topic_id, analysis_id, status, attempts, enqueued_at, started_at
+    """
+
+    def __init__(self, path, handler, workers=2, lease_seconds=180, max_attempts=3,
+                 poll_seconds=2.0, on_give_up=None):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.on_give_up = on_give_up
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {'completed': 0, 'failed': 0, 'retried': 0, 'recovered': 0, 'wait_seconds_total': 0.0}
+
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                topic_id TEXT NOT NULL,
+                analysis_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_until REAL,
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_active
+                ON analysis_jobs(user_id, topic_id) WHERE status IN ('pending', 'running');
+            CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status
+                ON analysis_jobs(status, id);
+        ''')
+
+    # ---------- 連線 ----------
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    # ---------- 對外介面 ----------
+
+    def start(self):
+        """啟動 worker 池（可重複呼叫），並回收已終止程序遺留的工作"""
+        with self._start_lock:
+            if self._threads:
+                return
+            self._recover_orphans()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'analysis-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, user_id, topic_id, analysis_id):
+        """
+        加入工作；同一 (user, topic) 已有待處理或執行中的工作時直接回傳該工作
+        Returns:
+            (job, created)
+        """
+        conn = self._conn()
+        try:
+            conn.execute(
+                'INSERT INTO analysis_jobs (user_id, topic_id, analysis_id, enqueued_at) VALUES (?, ?, ?, ?)',
+                (user_id, topic_id, analysis_id, time.time())
+            )
+            created = True
+        except sqlite3.IntegrityError:
+            created = False
+        job = self.find_active(user_id, topic_id)
+        if created:
+            self._wakeup.set()
+        return job, created
+
+    def find_active(self, user_id, topic_id):
+        """取得 (user, topic) 待處理或執行中的工作"""
+        row = self._conn().execute(
+            "SELECT * FROM analysis_jobs WHERE user_id = ? AND topic_id = ? AND status IN ('pending', 'running')",
+            (user_id, topic_id)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self):
+        """佇列深度與處理統計"""
+        conn = self._conn()
+        counts = {row['status']: row['n'] for row in conn.execute(
+            'SELECT status, COUNT(*) AS n FROM analysis_jobs GROUP BY status')}
+        oldest = conn.execute(
+            "SELECT MIN(enqueued_at) FROM analysis_jobs WHERE status = 'pending'").fetchone()[0]
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        started = metrics['completed'] + metrics['failed'] + metrics['retried']
+        return {
+            'pending': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'workers': self.workers,
+            'oldest_pending_seconds': round(time.time() - oldest, 1) if oldest else 0,
+            'avg_wait_seconds': round(metrics['wait_seconds_total'] / started, 2) if started else 0,
+            'completed_total': metrics['completed'],
+            'failed_total': metrics['failed'],
+            'retried_total': metrics['retried'],
+            'recovered_total': metrics['recovered']
+        }
+
+    # ---------- 內部 ----------
+
+    def _count(self, key, value=1):
+        with self._metrics_lock:
+            self._metrics[key] += value
+
+    def _recover_orphans(self):
+        """本機上已終止程序持有的工作，不必等租約到期就放回佇列"""
+        conn = self._conn()
+        host = socket.gethostname()
+        rows = conn.execute(
+            "SELECT id, worker_id FROM analysis_jobs WHERE status = 'running'").fetchall()
+        for row in rows:
+            owner_host, _, owner_pid = (row['worker_id'] or '').rpartition(':')
+            if owner_host != host or not owner_pid.isdigit():
+                continue
+            if self._pid_alive(int(owner_pid)):
+                continue
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'pending', lease_until = NULL WHERE id = ? AND status = 'running'",
+                (row['id'],)
+            )
+            self._count('recovered')
+            print(f"[ANALYSIS-QUEUE] 回收已終止程序的工作 #{row['id']}")
+
+    @staticmethod
+    def _pid_alive(pid):
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    def _claim(self):
+        """取得一筆待處理工作，或租約已過期的執行中工作"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT * FROM analysis_jobs "
+                "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if not row:
+                conn.execute('COMMIT')
+                return None
+            if row['status'] == 'running':
+                self._count('recovered')
+                if row['attempts'] >= self.max_attempts:
+                    # 反覆在執行中斷線的工作不再重試
+                    conn.execute(
+                        "UPDATE analysis_jobs SET status = 'failed', finished_at = ?, lease_until = NULL, "
+                        "error = ? WHERE id = ?",
+                        (now, '租約逾時次數過多', row['id'])
+                    )
+                    conn.execute('COMMIT')
+                    self._count('failed')
+                    if self.on_give_up:
+                        try:
+                            self.on_give_up(dict(row), TimeoutError('租約逾時次數過多'))
+                        except Exception as give_up_error:
+                            print(f"[ANALYSIS-QUEUE] 失敗處理發生錯誤: {give_up_error}")
+                    return self._claim()
+                print(f"[ANALYSIS-QUEUE] 工作 #{row['id']} 租約逾時，重新執行")
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'running', attempts = attempts + 1, worker_id = ?, "
+                "lease_until = ?, started_at = ? WHERE id = ?",
+                (self.worker_id, now + self.lease_seconds, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+        job = dict(row)
+        job['attempts'] += 1
+        job['started_at'] = now
+        return job
+
+    def _renew_lease(self, job):
+        """延長執行中工作的租約；工作已不屬於本程序時回傳 False"""
+        cursor = self._conn().execute(
+            "UPDATE analysis_jobs SET lease_until = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, job['id'], self.worker_id)
+        )
+        return cursor.rowcount > 0
+
+    def _heartbeat(self, job, stop):
+        """handler 執行期間每 1/3 租約時間續約一次，長時間的分析不會被其他程序當成逾時而重複執行"""
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                if not self._renew_lease(job):
+                    print(f"[ANALYSIS-QUEUE] 工作 #{job['id']} 的租約已被其他程序取得")
+                    return
+            except Exception as e:
+                print(f"[ANALYSIS-QUEUE] 工作 #{job['id']} 續約失敗: {e}")
+
+    def _run_handler(self, job):
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop),
+                                     name=f"analysis-lease-{job['id']}", daemon=True)
+        heartbeat.start()
+        try:
+            self.handler(job)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def _finish(self, job, status, error=None):
+        self._conn().execute(
+            "UPDATE analysis_jobs SET status = ?, finished_at = ?, lease_until = NULL, error = ? "
+            "WHERE id = ? AND worker_id = ?",
+            (status, time.time(), error, job['id'], self.worker_id)
+        )
+
+    def _worker_loop(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"[ANALYSIS-QUEUE] 取得工作失敗: {e}")
+                job = None
+
+            if job is None:
+                # 其他 worker 程序加入的工作靠輪詢發現
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+
+            self._count('wait_seconds_total', job['started_at'] - job['enqueued_at'])
+            try:
+                self._run_handler(job)
+                self._finish(job, 'done')
+                self._count('completed')
+            except Exception as e:
+                if job['attempts'] < self.max_attempts:
+                    print(f"[ANALYSIS-QUEUE] 工作 #{job['id']} 失敗（第 {job['attempts']} 次），稍後重試: {e}")
+                    self._finish(job, 'pending', str(e))
+                    self._count('retried')
+                else:
+                    print(f"[ANALYSIS-QUEUE] 工作 #{job['id']} 已達重試上限: {e}")
+                    self._finish(job, 'failed', str(e))
+                    self._count('failed')
+                    if self.on_give_up:
+                        try:
+                            self.on_give_up(job, e)
+                        except Exception as give_up_error:
+                            print(f"[ANALYSIS-QUEUE] 失敗處理發生錯誤: {give_up_error}")
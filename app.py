@@ -1,20 +1,27 @@
 # 專題雷達 - Topic Radar
 # Python 後端：RSS 抓取 + 關鍵字過濾 + AI 摘要 (Perplexity) + AI 關鍵字 (Claude)
 
+import time
+_IMPORT_START = time.perf_counter()
+
 import os
 import re
 import json
-import time
+import queue
 import hashlib
-import feedparser
-import requests
+import importlib
+import importlib.util
+import tempfile
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone, timedelta
+from urllib.parse import quote_plus
 from zoneinfo import ZoneInfo
 from flask import Flask, jsonify, request, make_response
 from flask_cors import CORS
-from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
 
 # 台北時區
@@ -28,15 +35,92 @@ CORS(app)
 
 # 引入認證模組
 import auth
+import snapshot
+import store
+import analysis_queue
+import search_index
+import source_schedule
+import source_health
+import feed_pipeline
+import topic_buffer
+import translation_retry
+import load_admission
+from feed_pipeline import keyword_match, item_matches, item_hash, item_url, item_ts, envelope, persisted
+
+# ============ 冷啟動計時與延遲載入 ============
+
+# 冷啟動各階段耗時（毫秒），延遲載入的模組在首次使用時記錄為 lazy_import:<名稱>
+STARTUP_TIMINGS = {'imports': round((time.perf_counter() - _IMPORT_START) * 1000, 1)}
+
+@contextmanager
+def _startup_phase(name):
+    """記錄啟動階段耗時"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = round((time.perf_counter() - start) * 1000, 1)
+
+class _LazyProxy:
+    """首次存取屬性時才載入目標物件（模組或客戶端），避免拖慢冷啟動"""
+
+    def __init__(self, label, loader):
+        self._label = label
+        self._loader = loader
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    with _startup_phase(f'lazy_import:{self._label}'):
+                        target = self._loader()
+                    self._target = target
+        return self._target
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+def _import_requests():
+    module = importlib.import_module('requests')
+    import urllib3
+    urllib3.disable_warnings()
+    return module
+
+# 重量級相依套件改為首次使用時才匯入
+requests = _LazyProxy('requests', _import_requests)
+
+# Supabase 客戶端（使用 auth 模組的單例，首次查詢時才建立連線）
+# 啟動時只用 find_spec 確認套件存在（不實際匯入）；客戶端在背景初始化時預先建立，
+# 建立失敗（網址或金鑰格式錯誤）時與過去相同，改用非認證模式
+AUTH_ENABLED = bool(os.getenv('SUPABASE_URL') and os.getenv('SUPABASE_KEY'))
+if AUTH_ENABLED and importlib.util.find_spec('supabase') is None:
+    print("[WARNING] 無法初始化 Supabase 客戶端: 未安裝 supabase 套件，停用認證")
+    AUTH_ENABLED = False
 
-# 初始化 Supabase 客戶端 (使用 auth 模組的單例)
-try:
-    supabase = auth.get_supabase()
-    AUTH_ENABLED = True
-except Exception as e:
-    print(f"[WARNING] 無法初始化 Supabase 客戶端: {e}")
-    supabase = None
+def _create_supabase_client():
+    try:
+        return auth.get_supabase()
+    except Exception as e:
+        _disable_auth(e)
+        raise
+
+def _disable_auth(error):
+    """客戶端無法建立：停用認證與依賴資料庫的服務，之後的請求以非認證模式處理"""
+    global AUTH_ENABLED, supabase, ANALYSIS_QUEUE, SEARCH_INDEX
+    print(f"[WARNING] 無法初始化 Supabase 客戶端: {error}，停用認證")
     AUTH_ENABLED = False
+    supabase = None
+    ANALYSIS_QUEUE = None
+    SEARCH_INDEX = None
+
+if AUTH_ENABLED:
+    supabase = _LazyProxy('supabase', _create_supabase_client)
+else:
+    if not (os.getenv('SUPABASE_URL') and os.getenv('SUPABASE_KEY')):
+        print("[WARNING] 無法初始化 Supabase 客戶端: SUPABASE_URL 和 SUPABASE_KEY 環境變數未設定")
+    supabase = None
 
 
 # ============ 設定 ============
@@ -92,6 +176,28 @@ GOOGLE_NEWS_INTL_REGIONS = {
     '韓國': {'code': 'KR', 'lang': 'ko'},
 }
 
+# 每個 RSS 來源依新新聞速率調整抓取間隔（15 分鐘 ~ 6 小時），初始間隔沿用原本排程
+SOURCE_SCHEDULER = source_schedule.SourceScheduler(min_interval=15 * 60, max_interval=6 * 3600)
+for _name in RSS_SOURCES_TW:
+    SOURCE_SCHEDULER.register(_name, 'domestic', 3600)
+for _name in RSS_SOURCES_INTL:
+    SOURCE_SCHEDULER.register(_name, 'international', 7200)
+
+# 來源健康狀態：連續失敗 3 次後暫停抓取，冷卻 5 分鐘起、探測失敗加倍至 1 小時
+SOURCE_HEALTH = source_health.SourceHealth(failure_threshold=3, base_cooldown=5 * 60, max_cooldown=3600)
+
+# Google News 補充搜尋維持原本頻率（國內每小時、國際每 2 小時），不隨排程變密
+GOOGLE_TOPUP_INTERVALS = {'domestic': 3600, 'international': 7200}
+_LAST_GOOGLE_TOPUP = {'domestic': 0.0, 'international': 0.0}
+
+def _google_topup_due(group):
+    """本輪是否執行 Google News 補充（到期時順便記錄本輪時間）"""
+    now = time.time()
+    if now - _LAST_GOOGLE_TOPUP[group] < GOOGLE_TOPUP_INTERVALS[group] - 60:
+        return False
+    _LAST_GOOGLE_TOPUP[group] = now
+    return True
+
 # 預設專題設定
 DEFAULT_TOPICS = {
     'migrant_workers': {
@@ -129,11 +235,38 @@ LOADING_STATUS = {
 
 TOPICS = {}
 
+# 共享資料後端：memory = 單一程序；sqlite = 多個 worker 共用（讀到排程 leader 寫入的資料）
+STORE_BACKEND = os.getenv('STORE_BACKEND', 'memory')
+STORE_SQLITE_PATH = os.getenv('STORE_SQLITE_PATH', 'topicradar_store.db')
+STORE = _LazyProxy('store', lambda: store.create_store(STORE_BACKEND, STORE_SQLITE_PATH))  # sqlite 檔案在首次使用時才開啟
+
+# 本程序已同步到的後端版本 {user_id: version}
+_STORE_SYNCED_VERSIONS = {}
+
+# 其他 worker 的載入中旗標超過此秒數視為失效（該 worker 可能已終止）
+STORE_LOADING_STALE_SECONDS = 600
+
 # 資料快取檔案路徑
 DATA_CACHE_FILE = 'data_cache.json'
+DATA_SNAPSHOT_FILE = 'data_cache.bin'
+
+# 本地快取格式：'snapshot' = 二進位快照（原子寫入、mmap 讀取），'json' = 舊版 JSON
+DATA_CACHE_FORMAT = os.getenv('DATA_CACHE_FORMAT', 'snapshot')
+
+# 本程序最後一次讀寫時的快取檔案修改時間（非 leader worker 以此判斷是否需要重新載入）
+_DATA_CACHE_MTIME = None
 
 # ============ 資料快取管理 ============
 
+def _data_cache_mtime():
+    """快取檔案（快照與 JSON）中最新的修改時間，皆不存在時為 None"""
+    mtimes = [os.path.getmtime(path) for path in (DATA_SNAPSHOT_FILE, DATA_CACHE_FILE) if os.path.exists(path)]
+    return max(mtimes) if mtimes else None
+
+def _remember_data_cache_mtime():
+    global _DATA_CACHE_MTIME
+    _DATA_CACHE_MTIME = _data_cache_mtime()
+
 def save_data_cache():
     """儲存資料到快取（認證模式下同步到 Supabase，否則存檔案）"""
     try:
@@ -162,6 +295,20 @@ def save_data_cache():
             return
 
         # ================= 舊版檔案儲存邏輯 (Legacy) =================
+        if DATA_CACHE_FORMAT == 'snapshot':
+            start_time = time.time()
+            snapshot.write_snapshot(
+                DATA_SNAPSHOT_FILE,
+                DATA_STORE['topics'],
+                DATA_STORE['international'],
+                DATA_STORE['summaries'],
+                DATA_STORE['last_update'],
+                tz=TAIPEI_TZ
+            )
+            _remember_data_cache_mtime()
+            print(f"[CACHE] 快照已儲存到 {DATA_SNAPSHOT_FILE}（{(time.time() - start_time) * 1000:.0f} ms）")
+            return
+
         # 非認證模式：使用舊格式（向後相容）
         cache_data = {
             'topics': {},
@@ -173,7 +320,7 @@ def save_data_cache():
         for tid, news_list in DATA_STORE['topics'].items():
             cache_data['topics'][tid] = []
             for news in news_list:
-                news_copy = news.copy()
+                news_copy = persisted(news)
                 if 'published' in news_copy and isinstance(news_copy['published'], datetime):
                     news_copy['published'] = news_copy['published'].isoformat()
                 cache_data['topics'][tid].append(news_copy)
@@ -181,13 +328,14 @@ def save_data_cache():
         for tid, news_list in DATA_STORE['international'].items():
             cache_data['international'][tid] = []
             for news in news_list:
-                news_copy = news.copy()
+                news_copy = persisted(news)
                 if 'published' in news_copy and isinstance(news_copy['published'], datetime):
                     news_copy['published'] = news_copy['published'].isoformat()
                 cache_data['international'][tid].append(news_copy)
 
         with open(DATA_CACHE_FILE, 'w', encoding='utf-8') as f:
             json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        _remember_data_cache_mtime()
 
         print(f"[CACHE] 資料已儲存到 {DATA_CACHE_FILE}")
 
@@ -195,9 +343,27 @@ def save_data_cache():
         print(f"[CACHE] 儲存失敗: {e}")
 
 def load_data_cache():
-    """從快取檔案載入資料（支援新舊格式）"""
+    """從快取檔案載入資料（支援二進位快照與新舊 JSON 格式）"""
     global DATA_STORE
 
+    # 先記錄再讀取：讀取期間 leader 若又寫入，下次檢查仍會重新載入
+    _remember_data_cache_mtime()
+
+    # 優先讀取二進位快照，失敗或不存在時退回 JSON 快取
+    if DATA_CACHE_FORMAT == 'snapshot' and os.path.exists(DATA_SNAPSHOT_FILE):
+        try:
+            start_time = time.time()
+            snap = snapshot.read_snapshot(DATA_SNAPSHOT_FILE, TAIPEI_TZ)
+            DATA_STORE['topics'] = snap['topics']
+            DATA_STORE['international'] = snap['international']
+            DATA_STORE['summaries'] = snap['summaries']
+            DATA_STORE['last_update'] = snap['last_update']
+            DATA_STORE['topic_owners'] = {}
+            print(f"[CACHE] 從快照載入了 {len(DATA_STORE['topics'])} 個專題的資料（{(time.time() - start_time) * 1000:.0f} ms）")
+            return
+        except Exception as e:
+            print(f"[CACHE] 快照載入失敗，改用 JSON 快取: {e}")
+
     if not os.path.exists(DATA_CACHE_FILE):
         print(f"[CACHE] 快取檔案不存在，將使用空資料")
         return
@@ -316,6 +482,114 @@ def load_data_cache():
     except Exception as e:
         print(f"[CACHE] 載入快取失敗: {e}")
 
+def reload_data_cache_if_changed():
+    """
+    非認證模式下資料只存在本地快取檔案，且只有排程 leader 會更新；
+    其他 worker 定期呼叫此函式，檔案變動時重新載入，避免一直回應啟動時的舊資料
+    """
+    if _data_cache_mtime() == _DATA_CACHE_MTIME:
+        return False
+    print(f"[CACHE] 快取檔案已被其他 worker 更新，重新載入 (pid={os.getpid()})")
+    load_data_cache()
+    return True
+
+
+# ============ 共享資料後端同步 ============
+
+def _mark_store_synced(user_id, version):
+    """寫入後更新本程序的同步版本；中間若有其他 worker 寫入則保留差距，下次讀取時再拉取"""
+    if version == _STORE_SYNCED_VERSIONS.get(user_id, 0) + 1:
+        _STORE_SYNCED_VERSIONS[user_id] = version
+
+def publish_user_topic(user_id, tid):
+    """將使用者單一專題的資料寫入共享後端"""
+    user_data = DATA_STORE.get(user_id)
+    if not user_data:
+        return
+    try:
+        version = STORE.put_topic(
+            user_id, tid,
+            user_data.get('topics', {}).get(tid, []),
+            user_data.get('international', {}).get(tid, []),
+            user_data.get('summaries', {}).get(tid, {})
+        )
+        _mark_store_synced(user_id, version)
+    except Exception as e:
+        print(f"[STORE] 寫入專題資料失敗 ({user_id}/{tid}): {e}")
+
+def publish_user_meta(user_id):
+    """將使用者層級狀態（最後更新時間、載入中旗標）寫入共享後端"""
+    user_data = DATA_STORE.get(user_id)
+    if not user_data:
+        return
+    is_loading = bool(user_data.get('is_loading')) and not user_data.get('loading_remote')
+    try:
+        version = STORE.put_user_meta(user_id, {
+            'last_update': user_data.get('last_update', ''),
+            'is_loading': is_loading,
+            'load_mode': user_data.get('load_mode', ''),
+            'loading_since': time.time() if is_loading else None,
+            'topic_updated': user_data.get('topic_updated', {})
+        })
+        _mark_store_synced(user_id, version)
+    except Exception as e:
+        print(f"[STORE] 寫入使用者狀態失敗 ({user_id}): {e}")
+
+def sync_user_from_store(user_id):
+    """共享後端有較新版本時，將該使用者的資料拉回本程序的 DATA_STORE"""
+    if not STORE.shared:
+        return
+    try:
+        if STORE.user_version(user_id) <= _STORE_SYNCED_VERSIONS.get(user_id, 0):
+            return
+        data = STORE.get_user(user_id)
+    except Exception as e:
+        print(f"[STORE] 讀取共享後端失敗 ({user_id}): {e}")
+        return
+    if not data:
+        return
+
+    user_data = DATA_STORE.setdefault(user_id, {
+        'topics': {},
+        'international': {},
+        'summaries': {},
+        'last_update': ''
+    })
+    for tid, topic_data in data['topics'].items():
+        user_data['topics'][tid] = topic_data['topics']
+        user_data['international'][tid] = topic_data['international']
+        user_data['summaries'][tid] = topic_data['summary']
+
+    meta = data['meta']
+    if meta.get('last_update') and meta['last_update'] > (user_data.get('last_update') or ''):
+        user_data['last_update'] = meta['last_update']
+    for tid, kinds in (meta.get('topic_updated') or {}).items():
+        for kind, ts in kinds.items():
+            mark_topic_fresh(user_data, tid, kind, ts)
+
+    # 本程序自己的載入工作優先；否則沿用其他 worker 的載入中旗標（逾時視為失效）
+    if not (user_data.get('is_loading') and not user_data.get('loading_remote')):
+        loading_since = meta.get('loading_since') or 0
+        remote_loading = bool(meta.get('is_loading')) and time.time() - loading_since < STORE_LOADING_STALE_SECONDS
+        user_data['is_loading'] = remote_loading
+        user_data['loading_remote'] = remote_loading
+        if remote_loading:
+            user_data['load_mode'] = meta.get('load_mode', 'fetch')
+
+    _STORE_SYNCED_VERSIONS[user_id] = data['version']
+
+def sync_all_users_from_store():
+    """排程更新前同步其他 worker 載入的使用者，讓 leader 也能更新他們的專題"""
+    if not STORE.shared:
+        return
+    try:
+        user_ids = STORE.list_users()
+    except Exception as e:
+        print(f"[STORE] 讀取使用者清單失敗: {e}")
+        return
+    for uid in user_ids:
+        sync_user_from_store(uid)
+
 # ============ 專題設定管理 ============
 
 def load_topics_config():
@@ -495,8 +769,11 @@ def translate_with_gemini(text, source_lang='auto', target_lang='zh-TW', max_ret
 
             response = requests.post(url, headers=headers, params=params, json=payload, timeout=15)
             
-            # 如果是 429 Too Many Requests，等待後重試
+            # 如果是 429 Too Many Requests，等待後重試（最後一次就不等了）
             if response.status_code == 429:
+                if attempt == max_retries - 1:
+                    print(f"[WARN] Gemini API 速率限制")
+                    break
                 wait_time = (attempt + 1) * 2  # 2, 4, 6 秒
                 print(f"[WARN] Gemini API 速率限制，等待 {wait_time} 秒後重試...")
                 time.sleep(wait_time)
@@ -706,234 +983,530 @@ def generate_topic_summary(topic_id, topic_name=None, user_id=None):
 
 # ============ RSS 抓取 ============
 
-def fetch_rss(url, source_name, timeout=15, max_items=50):
-    """抓取 RSS，增加最大抓取數量以確保能找到足夠的相關新聞"""
-    
-    # URL 黑名單：排除社群媒體貼文
-    URL_BLACKLIST = [
-        'facebook.com',
-        'fb.com',
-        'm.facebook.com',
-        'instagram.com',
-        'twitter.com',
-        'x.com',
-        'threads.net',
-    ]
-    
+# RSS 解析統計：fast = 精簡解析器，fallback = 格式非預期改用 feedparser
+FEED_PARSER_STATS = {'fast': 0, 'fallback': 0}
+
+def parse_feed_entries(content, max_items=50):
+    """解析 RSS/RDF/Atom 內容，回傳前 max_items 則項目（以 entry.get(...) 存取欄位）"""
+    entries, used_fallback = feed_pipeline.parse_entries(content, max_items)
+    FEED_PARSER_STATS['fallback' if used_fallback else 'fast'] += 1
+    return entries
+
+# 解析程序池：排程更新時 RSS 解析、正規化與專題比對在子程序執行，不受 GIL 限制（0 = 在抓取執行緒中處理）
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0'))
+PARSE_POOL = None
+_parse_pool_lock = threading.Lock()
+
+def get_parse_pool():
+    """延遲建立解析程序池；未啟用時回傳 None"""
+    global PARSE_POOL
+    # 直接以 python app.py 執行時，子程序會重新執行 app.py 的啟動流程，因此只在由 gunicorn 等載入時啟用
+    if PARSE_WORKERS <= 0 or __name__ == '__main__':
+        return None
+    with _parse_pool_lock:
+        if PARSE_POOL is None:
+            # forkserver 子程序只預先載入 feed_pipeline，不會重新執行 app 的啟動流程
+            ctx = multiprocessing.get_context('forkserver')
+            ctx.set_forkserver_preload(['feed_pipeline'])
+            PARSE_POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=ctx)
+            print(f"[RSS] 解析程序池啟動（{PARSE_WORKERS} 個程序）")
+        return PARSE_POOL
+
+def _reset_parse_pool():
+    global PARSE_POOL
+    with _parse_pool_lock:
+        if PARSE_POOL is not None:
+            PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+            PARSE_POOL = None
+
+def _parse_and_route(content, source_name, max_items, seen_keys, routes):
+    """有解析程序池時送到子程序處理，程序池故障時重建並改在目前執行緒處理"""
+    args = (content, source_name, TAIPEI_TZ, max_items, seen_keys, routes)
+    pool = get_parse_pool()
+    if pool is not None:
+        try:
+            return pool.submit(feed_pipeline.parse_and_route, *args).result()
+        except BrokenProcessPool as e:
+            print(f"[RSS] 解析程序池故障，重建並改在執行緒中解析: {e}")
+            _reset_parse_pool()
+    return feed_pipeline.parse_and_route(*args)
+
+def fetch_rss(url, source_name, timeout=15, max_items=50, include_seen=False, routes=None):
+    """
+    抓取 RSS，增加最大抓取數量以確保能找到足夠的相關新聞
+
+    預設只回傳該來源游標（SOURCE_SCHEDULER 的 seen）中沒出現過的項目，並推進游標、更新抓取頻率（排程的全域更新使用）
+    include_seen=True 回傳完整列表且不推進游標（單一使用者/專題需要完整資料時使用）
+    routes（{topic_id: (keywords, negative_keywords)}）指定時一併比對專題，新聞帶 hash 與 topic_ids；
+    啟用 PARSE_WORKERS 時解析與比對在程序池中執行
+    """
+    # 斷路中的來源直接略過，不再每輪等滿逾時
+    if not SOURCE_HEALTH.allow(source_name):
+        print(f"[RSS] {source_name} 斷路冷卻中，略過")
+        return []
+
+    fetch_start = time.perf_counter()
     try:
         headers = {'User-Agent': 'Mozilla/5.0'}
         response = requests.get(url, headers=headers, timeout=timeout, verify=True)
         response.raise_for_status()
-        feed = feedparser.parse(response.content)
-
-        items = []
-        # 增加抓取數量從 30 到 max_items，確保有足夠新聞可過濾
-        for entry in feed.entries[:max_items]:
-            # 獲取標題，跳過空標題
-            title = entry.get('title', '').strip()
-            if not title:
-                continue
-            
-            # 獲取連結並檢查是否為社群媒體貼文
-            link = entry.get('link', '')
-            is_blacklisted = any(domain in link.lower() for domain in URL_BLACKLIST)
-            if is_blacklisted:
-                continue  # 跳過社群媒體貼文
 
-            published = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                # RSS 時間通常是 UTC，轉換為台北時間
-                published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                published = published.astimezone(TAIPEI_TZ)
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-                published = published.astimezone(TAIPEI_TZ)
-            else:
-                # 使用台北時間的當前時間
-                published = datetime.now(TAIPEI_TZ)
+        # 先用游標篩掉已處理的項目，後續的時間解析、黑名單與關鍵字比對只做在新項目上
+        seen_keys = None if include_seen else SOURCE_SCHEDULER.seen_keys(source_name)
 
-            items.append({
-                'title': title,
-                'link': link,  # 使用已檢查的 link
-                'source': source_name,
-                'published': published,
-                'summary': entry.get('summary', '')[:200]
-            })
+        # 增加抓取數量從 30 到 max_items，確保有足夠新聞可過濾
+        keys, items, used_fallback = _parse_and_route(response.content, source_name, max_items, seen_keys, routes)
+        FEED_PARSER_STATS['fallback' if used_fallback else 'fast'] += 1
+        if not include_seen:
+            SOURCE_SCHEDULER.observe(source_name, keys)
+        elif routes is None and items:
+            FEED_SNAPSHOTS[source_name] = (time.time(), items)
+
+        SOURCE_HEALTH.record_success(source_name, time.perf_counter() - fetch_start)
         return items
     except Exception as e:
+        SOURCE_HEALTH.record_failure(source_name, time.perf_counter() - fetch_start, e)
         print(f"[ERROR] 抓取 {source_name} 失敗: {e}")
         return []
 
-def fetch_rss_parallel(sources_dict, max_workers=8, timeout_per_source=20):
+# 每個來源最近一次完整抓取（include_seen=True）的結果 {來源: (抓取時間, 新聞列表)}
+# 使用者載入 worker 在有效期內直接沿用，不必每位使用者登入都重抓所有來源
+FEED_SNAPSHOT_MAX_AGE = 600
+FEED_SNAPSHOTS = {}
+
+def fetch_rss_snapshot(url, source_name, max_age=FEED_SNAPSHOT_MAX_AGE):
+    """有效期內回傳記憶體中的完整抓取結果，否則重新抓取（include_seen=True）"""
+    snapshot_entry = FEED_SNAPSHOTS.get(source_name)
+    if snapshot_entry and time.time() - snapshot_entry[0] < max_age:
+        return list(snapshot_entry[1])
+    return fetch_rss(url, source_name, max_items=50, include_seen=True)
+
+# 逾時後才完成的抓取結果 {群組: [(標籤, 新聞列表)]}，併入該群組下一輪的處理
+LATE_FETCH_RESULTS = {}
+_late_fetch_lock = threading.Lock()
+
+def _stash_late_result(group, label, future):
+    if future.cancelled():
+        return
+    try:
+        items = future.result()
+    except Exception as e:
+        print(f"[RSS-PARALLEL] {label} 逾時後失敗: {e}")
+        return
+    if items:
+        with _late_fetch_lock:
+            LATE_FETCH_RESULTS.setdefault(group, []).append((label, items))
+        print(f"[RSS-PARALLEL] {label} 逾時後完成 {len(items)} 則，併入下一輪")
+
+def has_late_results(group):
+    with _late_fetch_lock:
+        return bool(LATE_FETCH_RESULTS.get(group))
+
+def iter_parallel(tasks, max_workers=8, timeout=20, late_group=None, on_straggler=None):
     """
-    並行抓取多個 RSS 來源
-    
+    並行執行抓取任務，每個任務完成就 yield 結果（不等全部完成）
+
+    完成的結果先放進佇列，逾時只計算抓取本身；下游處理（例如翻譯）再慢也不會讓已完成的來源被判定逾時
+    到達期限時回傳已完成的部分、不等待未完成的任務；指定 late_group 時，逾時任務之後完成的結果
+    會暫存起來，在同一群組下一輪開始時先行 yield
+
     Args:
-        sources_dict: {'名稱': 'URL'} 字典
-        max_workers: 最大並行執行緒數（建議 5-10）
-        timeout_per_source: 每個來源的超時時間（秒）
-    
-    Returns:
-        list: 所有新聞項目的列表
+        tasks: [(標籤, 函數, args, kwargs)]
+        late_group: 暫存逾時結果的群組名稱（例如 'domestic'）
+        on_straggler: 到達期限時對每個未完成任務的標籤呼叫（例如記錄來源健康狀態）
+    Yields:
+        (標籤, 結果列表)；失敗的任務回傳空列表
     """
-    all_news = []
-    
-    print(f"[RSS-PARALLEL] 開始並行抓取 {len(sources_dict)} 個來源（max_workers={max_workers}）")
-    start_time = time.time()
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有 RSS 抓取任務
-        future_to_source = {
-            executor.submit(fetch_rss, url, name, timeout=15, max_items=50): name
-            for name, url in sources_dict.items()
-        }
-        
-        # 按完成順序收集結果
-        completed = 0
-        for future in as_completed(future_to_source, timeout=timeout_per_source):
-            source_name = future_to_source[future]
-            completed += 1
+    if late_group:
+        with _late_fetch_lock:
+            late_results = LATE_FETCH_RESULTS.pop(late_group, [])
+        for label, items in late_results:
+            yield f'{label}（上一輪逾時）', items
+
+    done_queue = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    try:
+        for label, fn, args, kwargs in tasks:
+            future = executor.submit(fn, *args, **kwargs)
+            pending[future] = label
+            future.add_done_callback(done_queue.put)
+
+        deadline = time.monotonic() + timeout
+        while pending:
             try:
-                news_items = future.result()
-                all_news.extend(news_items)
-                print(f"[RSS-PARALLEL] ({completed}/{len(sources_dict)}) {source_name}: {len(news_items)} 則新聞")
+                future = done_queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                print(f"[RSS-PARALLEL] 逾時 {timeout} 秒，未完成: {', '.join(pending.values())}")
+                for straggler, label in pending.items():
+                    if on_straggler:
+                        on_straggler(label)
+                    if late_group:
+                        straggler.add_done_callback(
+                            lambda f, label=label: _stash_late_result(late_group, label, f))
+                break
+            label = pending.pop(future)
+            try:
+                yield label, future.result()
             except Exception as e:
-                print(f"[RSS-PARALLEL] ({completed}/{len(sources_dict)}) {source_name} 失敗: {e}")
-    
-    elapsed = time.time() - start_time
-    print(f"[RSS-PARALLEL] 完成！共 {len(all_news)} 則新聞，耗時 {elapsed:.1f} 秒")
-    
-    return all_news
+                print(f"[RSS-PARALLEL] {label} 失敗: {e}")
+                yield label, []
+    finally:
+        # 不等待逾時的任務；尚未開始的任務直接取消
+        executor.shutdown(wait=False, cancel_futures=True)
 
+def record_rss_straggler(label):
+    """只有 RSS 來源記入健康狀態；Google News 查詢等任務的標籤不是來源，不建立紀錄"""
+    if label in RSS_SOURCES_TW or label in RSS_SOURCES_INTL:
+        SOURCE_HEALTH.record_straggler(label)
 
-def fetch_google_news_by_keywords(keywords, max_items=50):
-    """使用 Google News 搜索特定關鍵字的新聞，並提取原始媒體來源"""
-    if not keywords:
-        return []
+def iter_rss_parallel(sources_dict, max_workers=8, timeout_per_source=20, include_seen=False, late_group=None,
+                      routes=None):
+    """
+    並行抓取多個 RSS 來源，每個來源完成就 yield (來源名稱, 新聞列表)
+    late_group 見 iter_parallel；routes 見 fetch_rss
+    """
+    print(f"[RSS-PARALLEL] 開始並行抓取 {len(sources_dict)} 個來源（max_workers={max_workers}）")
+    tasks = [(name, fetch_rss, (url, name),
+              {'timeout': 15, 'max_items': 50, 'include_seen': include_seen, 'routes': routes})
+             for name, url in sources_dict.items()]
+    completed = 0
+    for source_name, news_items in iter_parallel(tasks, max_workers=max_workers, timeout=timeout_per_source,
+                                                 late_group=late_group, on_straggler=record_rss_straggler):
+        completed += 1
+        print(f"[RSS-PARALLEL] ({completed}/{len(sources_dict)}) {source_name}: {len(news_items)} 則新聞")
+        yield source_name, news_items
+
+# ---------- 串流處理階段：抓取 → 去重 → 分派專題 → 寫入專題緩衝區（TopKBuffer.add 負責專題內去重）----------
+# 各階段以 generator 串接，第一個來源抓完就開始比對專題，不必等所有來源
+
+def stage_items(batches, completed=None):
+    """(標籤, 新聞列表) → 逐則新聞；completed 指定時記錄在期限內完成的任務標籤"""
+    for label, news_items in batches:
+        if completed is not None:
+            completed.add(label)
+        yield from news_items
+
+def stage_dedupe(items):
+    """同一輪內以標題 hash 與正規化網址去重（不同來源轉載同一篇文章時只留第一則）"""
+    seen = set()
+    seen_urls = set()
+    for item in items:
+        h = item_hash(item)
+        url = item_url(item)
+        if h in seen or (url and url in seen_urls):
+            continue
+        seen.add(h)
+        seen_urls.add(url)
+        yield item
 
-    # 使用第一個關鍵字作為搜索詞
-    search_term = keywords[0] if isinstance(keywords, list) else keywords
-    # Google News 搜索 RSS
-    url = f"https://news.google.com/rss/search?q={search_term}&hl=zh-TW&gl=TW&ceid=TW:zh-Hant"
+def stage_route(items, routes):
+    """
+    將新聞分派到符合關鍵字的專題
+    routes: {topic_id: (keywords, negative_keywords)}
+    Yields: (topic_id, item)；同一則新聞可能分派到多個專題
+    """
+    for item in items:
+        topic_ids = item.pop('topic_ids', None)
+        if topic_ids is not None:
+            # fetch_rss 已比對過（可能在解析程序池中）
+            for tid in topic_ids:
+                if tid in routes:
+                    yield tid, item
+            continue
+        for tid, (keywords, negative_keywords) in routes.items():
+            if item_matches(item, keywords, negative_keywords):
+                yield tid, item
 
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=15, verify=True)
-        response.raise_for_status()
-        feed = feedparser.parse(response.content)
+# ---------- 國際新聞翻譯：篩選、去重、排序都以原文標題進行，只翻譯最後會顯示的新聞 ----------
 
-        items = []
-        for entry in feed.entries[:max_items]:
-            # 獲取標題，跳過空標題
-            title = entry.get('title', '').strip()
-            if not title:
-                continue
+# 翻譯統計：translated = 實際呼叫翻譯的則數；avoided = 以原文進入候選、最後沒顯示而省下的翻譯
+# last_cycle: {流程名稱: 最近一輪的統計}，/api/admin/translation-stats 回報
+TRANSLATION_STATS = {'translated': 0, 'avoided': 0, 'last_cycle': {}}
+_translation_stats_lock = threading.Lock()
 
-            # 提取原始媒體來源（Google News RSS 特有）
-            source_name = 'Google News'
-            if hasattr(entry, 'source') and entry.source:
-                source_name = entry.source.get('title', 'Google News')
+# 並行處理的專題共用同一份 RSS 新聞物件，先登記 title_original 再翻譯，同一則不會被兩個專題重複翻譯
+_translation_claim_lock = threading.Lock()
 
-            # 處理時間
-            published = None
-            is_date_only = False
+def _claim_translation(news):
+    with _translation_claim_lock:
+        if 'title_original' in news:
+            return False
+        news['title_original'] = news['title']
+        return True
 
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                published = published.astimezone(TAIPEI_TZ)
+def _translate_once(text):
+    """更新流程用：只呼叫一次 Gemini，失敗回傳 None，重試交給 TRANSLATION_RETRY"""
+    result = translate_with_gemini(text, max_retries=1)
+    return None if result.startswith('[翻譯失敗]') else result
 
-                # 檢查是否是整點時間（可能只是日期的占位符）
-                # 例如 08:00:00 可能只代表當天，不是真實時間
-                if published.minute == 0 and published.second == 0:
-                    is_date_only = True
+# 翻譯失敗時舊版會寫入快取的標題前綴
+UNTRANSLATED_PREFIXES = ('[翻譯失敗]', '[未翻譯]')
+
+def _needs_translation_retry(item):
+    """
+    翻譯失敗的國際新聞：本程序剛失敗、標題仍等於原文，或快取中留下失敗前綴
+    （_translation_failed 不會寫入快取，重啟後從快取讀回的新聞以標題判斷）
+    """
+    original = item.get('title_original')
+    if not original:
+        return False
+    title = item['title']
+    return item.get('_translation_failed') or title == original or title.startswith(UNTRANSLATED_PREFIXES)
+
+def queue_translation_retries(news_lists):
+    """將需要重試翻譯的新聞排入 TRANSLATION_RETRY（失敗前綴的標題先改回原文顯示），回傳排入則數"""
+    if not TRANSLATION_RETRY:
+        return 0
+    queued = 0
+    for items in news_lists:
+        for item in items:
+            if _needs_translation_retry(item):
+                item['title'] = item['title_original']
+                queued += TRANSLATION_RETRY.enqueue(item['title_original'])
+    return queued
+
+def translate_for_display(items, delay=0.5):
+    """
+    翻譯即將顯示的國際新聞中尚未翻譯的標題（就地修改），回傳翻譯則數
+    每則只嘗試一次；失敗時先顯示原文，由 TRANSLATION_RETRY 在背景重試後就地更新
+    """
+    translated = 0
+    for item in items:
+        if _claim_translation(item):
+            result = _translate_once(item['title_original'])
+            if result:
+                item['title'] = result
             else:
-                published = datetime.now(TAIPEI_TZ)
+                item['_translation_failed'] = True
+            translated += 1
+            time.sleep(delay)
+    queue_translation_retries([items])
+    return translated
 
-            items.append({
-                'title': title,
-                'link': entry.get('link', ''),
-                'source': source_name,  # 使用原始媒體名稱
-                'published': published,
-                'summary': entry.get('summary', '')[:200],
-                'is_date_only': is_date_only  # 標記僅有日期
-            })
-        return items
-    except Exception as e:
-        print(f"[ERROR] Google News 搜索失敗: {e}")
-        return []
+def record_translation_cycle(label, candidates, translated):
+    """
+    記錄一輪的翻譯數量
+    candidates: 本輪以原文標題進入候選的新聞（原本每則都會立即翻譯）；以 id() 計算，同一物件只算一次
+    """
+    avoided = max(len(candidates) - translated, 0)
+    with _translation_stats_lock:
+        TRANSLATION_STATS['translated'] += translated
+        TRANSLATION_STATS['avoided'] += avoided
+        TRANSLATION_STATS['last_cycle'][label] = {
+            'candidates': len(candidates),
+            'translated': translated,
+            'avoided': avoided,
+            'at': datetime.now(TAIPEI_TZ).isoformat()
+        }
+    if candidates:
+        print(f"[TRANSLATE] {label}: 候選 {len(candidates)} 則，翻譯 {translated} 則，省下 {avoided} 次翻譯")
 
-def fetch_google_news_intl(keywords, region_code, lang, max_items=30):
-    """使用 Google News 國際版搜索特定國家的新聞"""
-    if not keywords:
-        return []
+def _apply_retried_translation(original, translated):
+    """
+    重試成功：就地更新所有顯示中的同一則國際新聞（以 title_original 比對），只寫回有變動的專題
+    在重試執行緒中執行，請求執行緒可能同時改動 DATA_STORE，走訪前先複製字典與列表
+    """
+    patched_global = False
+    patched_topics = []  # [(user_id, topic_id)]
+    for key, data in list(DATA_STORE.items()):
+        if key == 'international':
+            lists = [(None, tid, items) for tid, items in list(data.items())]
+        elif key not in ['topics', 'summaries', 'last_update', 'topic_owners'] and isinstance(data, dict):
+            lists = [(key, tid, items) for tid, items in list(data.get('international', {}).items())]
+        else:
+            continue
+        for user_id, tid, items in lists:
+            hit = False
+            for item in list(items):
+                if item.get('title_original') == original and item['title'] != translated:
+                    item['title'] = translated
+                    item.pop('_translation_failed', None)
+                    hit = True
+            if hit:
+                if user_id is None:
+                    patched_global = True
+                else:
+                    patched_topics.append((user_id, tid))
+
+    for user_id, tid in patched_topics:
+        publish_user_topic(user_id, tid)
+        user_data = DATA_STORE.get(user_id)
+        if AUTH_ENABLED and user_data:
+            auth.save_topic_cache_item(
+                user_id, tid,
+                user_data.get('topics', {}).get(tid, []),
+                user_data.get('international', {}).get(tid, []),
+                user_data.get('summaries', {}).get(tid, {})
+            )
+    # 全域列表只在非認證模式寫入本地快取（認證模式下 save_data_cache 會同步所有使用者，使用者的專題已在上面個別寫回）
+    if patched_global and not AUTH_ENABLED:
+        save_data_cache()
+    print(f"[TRANSLATE] 重試翻譯成功，更新 {len(patched_topics) + patched_global} 個專題: {translated[:40]}")
+
+# 翻譯失敗的延後重試（指數退避：30 秒起跳、上限 30 分鐘，最多 6 次）；沒有設定 Gemini 金鑰時不啟用
+TRANSLATION_RETRY = None
+if GEMINI_API_KEY:
+    TRANSLATION_RETRY = translation_retry.TranslationRetryQueue(_translate_once, _apply_retried_translation)
+
+
+# 每個專題顯示的新聞則數
+TOPIC_NEWS_LIMIT = 10
+
+# 每個專題的 top-K 緩衝區 {('topics' | 'international', topic_id): TopKBuffer}
+# 跨輪保留 hash 索引與被擠出的 hash，不必每輪重建；DATA_STORE 被其他路徑改寫時自動重建
+TOPIC_BUFFERS = {}
+_topic_buffers_lock = threading.Lock()
+
+def get_topic_buffer(kind, tid, current):
+    """取得專題的緩衝區，current 為 DATA_STORE 中目前的列表"""
+    with _topic_buffers_lock:
+        buffer = TOPIC_BUFFERS.get((kind, tid))
+        if buffer is None:
+            buffer = TOPIC_BUFFERS[(kind, tid)] = topic_buffer.TopKBuffer(TOPIC_NEWS_LIMIT)
+    if buffer.published is not current:
+        buffer.reset_from(current)
+    return buffer
+
+def publish_topic_buffer(buffer):
+    """緩衝區 → 新到舊列表（寫回 DATA_STORE 用），並記住這份列表以便下一輪沿用"""
+    buffer.published = buffer.items()
+    return buffer.published
+
+def drop_topic_buffers(tid):
+    with _topic_buffers_lock:
+        TOPIC_BUFFERS.pop(('topics', tid), None)
+        TOPIC_BUFFERS.pop(('international', tid), None)
+
+
+# Google News 查詢規劃：多個關鍵字（可來自多個專題）以 OR 合併成少量查詢，URL 過長時分批
+GOOGLE_QUERY_MAX_TERMS = 8          # 單一查詢的關鍵字上限（太多會稀釋每個關鍵字的結果數）
+GOOGLE_QUERY_MAX_ENCODED_CHARS = 1500  # 編碼後 q 參數長度上限，避免 URL 超過約 2000 字元
+
+def plan_google_queries(keyword_lists):
+    """
+    將多組關鍵字合併成 OR 查詢列表（不分大小寫去重、保留首次出現順序）
 
-    # 使用第一個關鍵字作為搜索詞
-    search_term = keywords[0] if isinstance(keywords, list) else keywords
-    # Google News 國際版 RSS（根據國家代碼和語言）
-    url = f"https://news.google.com/rss/search?q={search_term}&hl={lang}&gl={region_code}&ceid={region_code}:{lang}"
+    Args:
+        keyword_lists: [[關鍵字, ...], ...]，也接受單一關鍵字字串
+    Returns:
+        list: 查詢字串，例如 ['移工 OR 外勞 OR "migrant workers"']
+    """
+    terms = []
+    seen = set()
+    for keywords in keyword_lists:
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        for kw in keywords or []:
+            kw = (kw or '').strip().replace('"', '')
+            if not kw or kw.lower() in seen:
+                continue
+            seen.add(kw.lower())
+            terms.append(f'"{kw}"' if ' ' in kw else kw)
+
+    queries = []
+    current = []
+    for term in terms:
+        candidate = ' OR '.join(current + [term])
+        if current and (len(current) >= GOOGLE_QUERY_MAX_TERMS
+                        or len(quote_plus(candidate)) > GOOGLE_QUERY_MAX_ENCODED_CHARS):
+            queries.append(' OR '.join(current))
+            current = []
+        current.append(term)
+    if current:
+        queries.append(' OR '.join(current))
+    return queries
+
+def fetch_google_news_query(query, region_code='TW', lang='zh-TW', max_items=50):
+    """
+    以單一查詢字串搜尋 Google News，並提取原始媒體來源
+    region_code='TW' 使用台灣版（標記可能只有日期的時間），其他為國際版
+    """
+    if region_code == 'TW':
+        url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=zh-TW&gl=TW&ceid=TW:zh-Hant"
+        default_source = 'Google News'
+    else:
+        url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl={lang}&gl={region_code}&ceid={region_code}:{lang}"
+        default_source = f'Google News ({region_code})'
 
     try:
         headers = {'User-Agent': 'Mozilla/5.0'}
         response = requests.get(url, headers=headers, timeout=15, verify=True)
         response.raise_for_status()
-        feed = feedparser.parse(response.content)
-
         items = []
-        for entry in feed.entries[:max_items]:
+        for entry in parse_feed_entries(response.content, max_items):
+            # 獲取標題，跳過空標題
             title = entry.get('title', '').strip()
             if not title:
                 continue
 
-            # 提取原始媒體來源
-            source_name = f'Google News ({region_code})'
-            if hasattr(entry, 'source') and entry.source:
-                source_name = entry.source.get('title', source_name)
+            # 提取原始媒體來源（Google News RSS 特有）
+            source_name = default_source
+            if entry.get('source'):
+                source_name = entry['source'].get('title') or default_source
 
             # 處理時間
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+            is_date_only = False
+            if entry.get('published_parsed'):
+                published = datetime(*entry['published_parsed'][:6], tzinfo=timezone.utc)
                 published = published.astimezone(TAIPEI_TZ)
+
+                # 檢查是否是整點時間（可能只是日期的占位符）
+                # 例如 08:00:00 可能只代表當天，不是真實時間
+                if region_code == 'TW' and published.minute == 0 and published.second == 0:
+                    is_date_only = True
             else:
                 published = datetime.now(TAIPEI_TZ)
 
-            items.append({
+            item = {
                 'title': title,
                 'link': entry.get('link', ''),
-                'source': source_name,
+                'source': source_name,  # 使用原始媒體名稱
                 'published': published,
                 'summary': entry.get('summary', '')[:200]
-            })
+            }
+            if region_code == 'TW':
+                item['is_date_only'] = is_date_only  # 標記僅有日期
+            items.append(envelope(item))
         return items
     except Exception as e:
-        print(f"[ERROR] Google News {region_code} 搜索失敗: {e}")
+        print(f"[ERROR] Google News {region_code} 搜索失敗 ({query[:40]}): {e}")
         return []
 
-def keyword_match(text, keywords, negative_keywords=None):
-    """
-    關鍵字比對，支援負面關鍵字過濾
-
-    Args:
-        text: 要檢查的文字
-        keywords: 正面關鍵字列表（匹配任一即可）
-        negative_keywords: 負面關鍵字列表（包含任一則排除）
-    """
-    if not text or not keywords:
-        return False
-
-    text_lower = text.lower()
+def fetch_google_news_by_keywords(keywords, max_items=50):
+    """使用 Google News 搜索特定關鍵字的新聞（所有關鍵字以 OR 合併），並提取原始媒體來源"""
+    if not keywords:
+        return []
 
-    # 先檢查負面關鍵字，如果包含則直接排除
-    if negative_keywords:
-        for neg_kw in negative_keywords:
-            if neg_kw.lower() in text_lower:
-                return False
+    items = []
+    seen_urls = set()
+    for query in plan_google_queries([keywords]):
+        for item in fetch_google_news_query(query, 'TW', 'zh-TW', max_items=max_items):
+            if item_url(item) not in seen_urls:
+                seen_urls.add(item_url(item))
+                items.append(item)
+    return items
 
-    # 再檢查正面關鍵字
-    for kw in keywords:
-        if kw.lower() in text_lower:
-            return True
+def fetch_google_news_intl(keywords, region_code, lang, max_items=30):
+    """使用 Google News 國際版搜索特定國家的新聞（所有關鍵字以 OR 合併）"""
+    if not keywords:
+        return []
 
-    return False
+    items = []
+    seen_urls = set()
+    for query in plan_google_queries([keywords]):
+        for item in fetch_google_news_query(query, region_code, lang, max_items=max_items):
+            if item_url(item) not in seen_urls:
+                seen_urls.add(item_url(item))
+                items.append(item)
+    return items
+
+def google_query_tasks(keyword_lists, region_code, lang, max_items=20):
+    """多個專題的關鍵字合併規劃後，產生 iter_parallel 可用的抓取任務（相同查詢只會出現一次）"""
+    return [
+        (f'Google {region_code}: {query[:30]}', fetch_google_news_query, (query, region_code, lang), {'max_items': max_items})
+        for query in plan_google_queries(keyword_lists)
+    ]
 
 def filter_news_by_keywords(news_list, topic_config, is_international=False):
     """根據專題設定過濾新聞列表"""
@@ -957,15 +1530,12 @@ def filter_news_by_keywords(news_list, topic_config, is_international=False):
     seen_hashes = set()
 
     for item in news_list:
-        # 內容組合標題和摘要以增加匹配率
-        content = f"{item['title']} {item['summary']}"
-        
-        if keyword_match(content, target_keywords, negative_keywords):
+        # 比對標題和摘要以增加匹配率
+        if item_matches(item, target_keywords, negative_keywords):
             # 去重
-            h = hashlib.md5(item['title'].encode()).hexdigest()
+            h = item_hash(item)
             if h not in seen_hashes:
                 seen_hashes.add(h)
-                item['hash'] = h
                 filtered.append(item)
     
     return filtered
@@ -973,19 +1543,207 @@ def filter_news_by_keywords(news_list, topic_config, is_international=False):
 
 # ============ 新聞歸檔系統（角度發現功能） ============
 
+# 歸檔新聞的本地全文索引（與 topic_archive 同步寫入，供 /api/search 使用）
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'search_index.db')
+SEARCH_INDEX = None
+if AUTH_ENABLED:
+    if search_index.fts5_available():
+        SEARCH_INDEX = _LazyProxy('search_index', lambda: search_index.SearchIndex(SEARCH_INDEX_PATH))
+    else:
+        print("[SEARCH] 目前的 SQLite 未支援 FTS5，停用全文搜尋")
+
+SEARCH_BACKFILL_PAGE_SIZE = 1000
+
+def backfill_search_index():
+    """
+    索引是空的（新部署或索引檔遺失）時，從 topic_archive 重建一次
+    之後的歸檔由 archive_news_to_db 同步寫入
+    """
+    if not SEARCH_INDEX or SEARCH_INDEX.count() > 0:
+        return 0
+
+    started = time.time()
+    total = 0
+    offset = 0
+    while True:
+        result = supabase.table('topic_archive')\
+            .select('user_id, topic_id, news_hash, title, summary, url, source, published_at')\
+            .order('published_at', desc=True)\
+            .range(offset, offset + SEARCH_BACKFILL_PAGE_SIZE - 1)\
+            .execute()
+        rows = result.data or []
+
+        grouped = {}
+        for row in rows:
+            try:
+                published_ts = datetime.fromisoformat(row['published_at'].replace('Z', '+00:00')).timestamp()
+            except (AttributeError, ValueError):
+                published_ts = None
+            grouped.setdefault((row['user_id'], row['topic_id']), []).append({
+                'news_hash': row['news_hash'],
+                'title': row.get('title') or '',
+                'summary': row.get('summary') or '',
+                'url': row.get('url') or '',
+                'source': row.get('source') or '',
+                'published_ts': published_ts
+            })
+        for (user_id, topic_id), docs in grouped.items():
+            total += SEARCH_INDEX.add(user_id, topic_id, docs)
+
+        if len(rows) < SEARCH_BACKFILL_PAGE_SIZE:
+            break
+        offset += SEARCH_BACKFILL_PAGE_SIZE
+
+    print(f"[SEARCH] 從歸檔重建索引 {total} 則（{time.time() - started:.1f}s）")
+    return total
+
+# Turbo 按鈕狀態的記憶體計數：{(user_id, topic_id): {'days': {日序: set(news_hash)}, 'analysis_status', 'seeded_at'}}
+# 歸檔時遞增、依日期桶過期；首次查詢時從資料庫補種一次
+ARCHIVE_WINDOW_DAYS = 30
+ARCHIVE_READY_THRESHOLD = 30
+# 多 worker 共用資料時，其他程序寫入的歸檔不會經過本程序，定期重新補種
+ARCHIVE_COUNTER_RESEED_SECONDS = 300
+ARCHIVE_COUNTERS = {}
+_archive_counters_lock = threading.Lock()
+
+# 30 天歸檔視窗的共用讀取：一次查詢取得資料列與（有上限的）數量，短暫快取供 Turbo 相關 API 共用
+ARCHIVE_WINDOW_READ_LIMIT = 1000   # 與 Supabase 單次回傳上限一致
+ARCHIVE_WINDOW_TTL_SECONDS = 60
+_ARCHIVE_WINDOW_CACHE = {}
+_archive_window_lock = threading.Lock()
+
+def read_archive_window(user_id, topic_id):
+    """
+    讀取近 30 天歸檔（新到舊），60 秒內重複呼叫直接回傳快取
+    Returns:
+        {'rows': [...], 'count': 列數, 'capped': 是否達讀取上限, 'fetched_at': epoch}
+    """
+    key = (user_id, topic_id)
+    with _archive_window_lock:
+        cached = _ARCHIVE_WINDOW_CACHE.get(key)
+        if cached and time.time() - cached['fetched_at'] < ARCHIVE_WINDOW_TTL_SECONDS:
+            return cached
+
+    window_start = (datetime.now() - timedelta(days=ARCHIVE_WINDOW_DAYS)).isoformat()
+    result = supabase.table('topic_archive')\
+        .select('news_hash, title, summary, source, published_at')\
+        .eq('topic_id', topic_id)\
+        .eq('user_id', user_id)\
+        .gte('published_at', window_start)\
+        .order('published_at', desc=True)\
+        .limit(ARCHIVE_WINDOW_READ_LIMIT)\
+        .execute()
+
+    rows = result.data or []
+    window = {
+        'rows': rows,
+        'count': len(rows),
+        'capped': len(rows) >= ARCHIVE_WINDOW_READ_LIMIT,
+        'fetched_at': time.time()
+    }
+    with _archive_window_lock:
+        _ARCHIVE_WINDOW_CACHE[key] = window
+    return window
+
+def archive_window_has_at_least(window, n):
+    """視窗內是否至少有 n 則（n 不超過讀取上限時為精確判斷）"""
+    return window['count'] >= n
+
+def invalidate_archive_window(user_id, topic_id):
+    with _archive_window_lock:
+        _ARCHIVE_WINDOW_CACHE.pop((user_id, topic_id), None)
+
+def _archive_day(published):
+    """新聞發布時間 → 台北時間日序（無法解析時視為今天）"""
+    if isinstance(published, str):
+        try:
+            published = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        except ValueError:
+            published = None
+    if not isinstance(published, datetime):
+        return datetime.now(TAIPEI_TZ).date().toordinal()
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.astimezone(TAIPEI_TZ).date().toordinal()
+
+def _archive_counter(user_id, topic_id):
+    """取得計數器（呼叫端需持有 _archive_counters_lock）"""
+    key = (user_id, topic_id)
+    counter = ARCHIVE_COUNTERS.get(key)
+    if counter is None:
+        counter = ARCHIVE_COUNTERS[key] = {'days': {}, 'analysis_status': None, 'seeded_at': None}
+    return counter
+
+def _prune_archive_days(counter):
+    cutoff = datetime.now(TAIPEI_TZ).date().toordinal() - ARCHIVE_WINDOW_DAYS
+    for day in [d for d in counter['days'] if d < cutoff]:
+        del counter['days'][day]
+    return cutoff
+
+def record_archived(user_id, topic_id, entries):
+    """歸檔成功後遞增計數；entries 為 [(news_hash, published)]，同一則新聞重複歸檔不重複計算"""
+    with _archive_counters_lock:
+        counter = _archive_counter(user_id, topic_id)
+        cutoff = _prune_archive_days(counter)
+        for news_hash, published in entries:
+            day = _archive_day(published)
+            if day < cutoff or any(news_hash in hashes for hashes in counter['days'].values()):
+                continue
+            counter['days'].setdefault(day, set()).add(news_hash)
+
+def set_archive_analysis_status(user_id, topic_id, status):
+    """記錄最新一筆角度分析的狀態（processing / completed / failed）"""
+    with _archive_counters_lock:
+        _archive_counter(user_id, topic_id)['analysis_status'] = status
+
+def _seed_archive_counter(user_id, topic_id):
+    """從資料庫補種計數與分析狀態（每個計數器只做一次；共享後端時定期重做）"""
+    window = read_archive_window(user_id, topic_id)
+    analysis_result = supabase.table('topic_angles')\
+        .select('status')\
+        .eq('topic_id', topic_id)\
+        .eq('user_id', user_id)\
+        .order('created_at', desc=True)\
+        .limit(1)\
+        .execute()
+
+    with _archive_counters_lock:
+        counter = _archive_counter(user_id, topic_id)
+        # 與補種期間的遞增合併，不覆蓋
+        for row in window['rows']:
+            day = _archive_day(row.get('published_at'))
+            if not any(row['news_hash'] in hashes for hashes in counter['days'].values()):
+                counter['days'].setdefault(day, set()).add(row['news_hash'])
+        if analysis_result.data:
+            counter['analysis_status'] = analysis_result.data[0]['status']
+        counter['seeded_at'] = time.time()
+
+def get_archive_stats(user_id, topic_id):
+    """回傳 (30 天內歸檔數, 最新分析狀態)，只有首次（或共享後端過期）才查資料庫"""
+    with _archive_counters_lock:
+        counter = ARCHIVE_COUNTERS.get((user_id, topic_id))
+        seeded_at = counter['seeded_at'] if counter else None
+    needs_seed = seeded_at is None or (STORE.shared and time.time() - seeded_at > ARCHIVE_COUNTER_RESEED_SECONDS)
+    if needs_seed:
+        _seed_archive_counter(user_id, topic_id)
+
+    with _archive_counters_lock:
+        counter = _archive_counter(user_id, topic_id)
+        _prune_archive_days(counter)
+        count = sum(len(hashes) for hashes in counter['days'].values())
+        return count, counter['analysis_status']
+
 def archive_news_to_db(user_id, topic_id, news_list):
     """將過濾後的新聞歸檔到資料庫"""
     if not AUTH_ENABLED:
         return
     
     archived_count = 0
+    indexed_docs = []
+    archived_entries = []
     for news in news_list:
         try:
-            # 確保有 hash key
-            news_hash = news.get('hash')
-            if not news_hash:
-                import hashlib
-                news_hash = hashlib.md5(news['title'].encode()).hexdigest()
+            news_hash = item_hash(news)
 
             supabase.table('topic_archive').upsert({
                 'user_id': user_id,
@@ -998,27 +1756,66 @@ def archive_news_to_db(user_id, topic_id, news_list):
                 'published_at': news['published'].isoformat() if hasattr(news['published'], 'isoformat') else str(news['published'])
             }, on_conflict='user_id,topic_id,news_hash').execute()
             archived_count += 1
+            archived_entries.append((news_hash, news['published']))
+            indexed_docs.append({
+                'news_hash': news_hash,
+                'title': news['title'],
+                'summary': news.get('summary', '')[:200],
+                'url': news['link'],
+                'source': news['source'],
+                'published_ts': item_ts(news) or None
+            })
         except Exception as e:
             print(f"[ARCHIVE] 歸檔失敗 {news.get('title', '')[:30]}: {e}")
     
     if archived_count > 0:
         print(f"[ARCHIVE] 成功歸檔 {archived_count} 則新聞")
+        record_archived(user_id, topic_id, archived_entries)
+        invalidate_archive_window(user_id, topic_id)
 
-def analyze_topic_angles(topic_id, news_data, summary_context=None):
-    """使用 Claude Opus 4.5 分析專題角度"""
+    if SEARCH_INDEX and indexed_docs:
+        try:
+            SEARCH_INDEX.add(user_id, topic_id, indexed_docs)
+        except Exception as e:
+            print(f"[SEARCH] 寫入索引失敗: {e}")
+
+# 角度分析使用的模型（也是分析結果快取指紋的一部分）
+ANALYSIS_MODEL = "claude-3-5-sonnet-20240620"
+
+# 角度分析 prompt 的新聞 token 預算；從較多的歸檔候選中挑選最有訊號的新聞填滿
+ANALYSIS_TOKEN_BUDGET = int(os.getenv('ANALYSIS_TOKEN_BUDGET', '12000'))
+ANALYSIS_CANDIDATE_LIMIT = 300
+ANALYSIS_MAX_ITEMS = 100
+ANALYSIS_DUPLICATE_THRESHOLD = 0.6   # 標題字元 bigram Jaccard 相似度，達此值視為同一事件
+ANALYSIS_SOURCE_DECAY = 0.8          # 同來源每多選一則，分數乘上此係數
+
+# 分析結果快取統計
+ANALYSIS_CACHE_STATS = {'hits': 0, 'misses': 0}
+_analysis_cache_lock = threading.Lock()
+
+class AngleAnalysisError(Exception):
+    """角度分析失敗（API 錯誤、逾時或回應無法解析）"""
+
+def _angle_analysis_failure(summary, raise_errors):
+    if raise_errors:
+        raise AngleAnalysisError(summary)
+    return {
+        "angles": [],
+        "summary": summary
+    }
+
+def analyze_topic_angles(topic_id, news_data, summary_context=None, raise_errors=False):
+    """
+    使用 Claude Opus 4.5 分析專題角度
+    raise_errors: True 時失敗拋出 AngleAnalysisError（佇列工作據此重試），否則回傳空角度與錯誤說明
+    """
     
     if not ANTHROPIC_API_KEY:
         print("[AI-ANALYZE] Anthropic API Key 未設定")
-        return {
-            "angles": [],
-            "summary": "Claude API 未設定，無法進行深度分析"
-        }
+        return _angle_analysis_failure("Claude API 未設定，無法進行深度分析", raise_errors)
     
     # 準備新聞摘要
-    news_text = "\n\n".join([
-        f"[{item.get('published_at', '')[:10]}] {item.get('source', '')}\n標題：{item.get('title', '')}\n摘要：{item.get('summary', '')[:200]}"
-        for item in news_data[:100]
-    ])
+    news_text = "\n\n".join([_format_analysis_item(item) for item in news_data[:ANALYSIS_MAX_ITEMS]])
     
     # 準備背景資訊
     context_text = ""
@@ -1071,7 +1868,7 @@ def analyze_topic_angles(topic_id, news_data, summary_context=None):
                 "anthropic-version": "2023-06-01"
             },
             json={
-                "model": "claude-3-5-sonnet-20240620",
+                "model": ANALYSIS_MODEL,
                 "max_tokens": 4096,
                 "messages": [
                     {"role": "user", "content": prompt}
@@ -1083,20 +1880,14 @@ def analyze_topic_angles(topic_id, news_data, summary_context=None):
         if response.status_code != 200:
             error_msg = f"API Error {response.status_code}: {response.text}"
             print(f"[AI-ANALYZE] Claude 分析失敗: {error_msg}")
-            return {
-                "angles": [],
-                "summary": f"Claude API 錯誤 ({response.status_code})"
-            }
+            return _angle_analysis_failure(f"Claude API 錯誤 ({response.status_code})", raise_errors)
         
         result = response.json()
         
         # Claude Messages API 回應格式
         if 'content' not in result or not result['content']:
             print(f"[AI-ANALYZE] Claude 回應異常: {result}")
-            return {
-                "angles": [],
-                "summary": "Claude 回應格式異常"
-            }
+            return _angle_analysis_failure("Claude 回應格式異常", raise_errors)
         
         # 取得文字內容
         angles_text = result['content'][0]['text']
@@ -1119,24 +1910,163 @@ def analyze_topic_angles(topic_id, news_data, summary_context=None):
         except json.JSONDecodeError as json_err:
             print(f"[AI-ANALYZE] JSON 解析失敗: {json_err}")
             print(f"[AI-ANALYZE] 原始文本: {angles_text[:500]}")
-            return {
-                "angles": [],
-                "summary": f"AI 回應格式異常，無法解析結果"
-            }
+            return _angle_analysis_failure(f"AI 回應格式異常，無法解析結果", raise_errors)
 
+    except AngleAnalysisError:
+        raise
     except requests.exceptions.Timeout:
         print(f"[AI-ANALYZE] Claude 分析超時")
-        return {
-            "angles": [],
-            "summary": "分析超時，請稍後再試"
-        }
+        return _angle_analysis_failure("分析超時，請稍後再試", raise_errors)
     except Exception as e:
         print(f"[AI-ANALYZE] Claude 分析失敗 (Exception): {e}")
-        return {
-            "angles": [],
-            "summary": f"分析過程發生錯誤: {str(e)}"
-        }
+        return _angle_analysis_failure(f"分析過程發生錯誤: {str(e)}", raise_errors)
+
+
+def analysis_fingerprint(news_data, summary_context=None):
+    """角度分析輸入的指紋：實際送進 prompt 的新聞集合 + 背景摘要 + 模型"""
+    h = hashlib.sha256()
+    h.update(f"{ANALYSIS_MODEL}\x1e{len(news_data)}\x1e{summary_context or ''}\x1e".encode('utf-8'))
+    for item in news_data[:100]:
+        h.update('\x1f'.join([
+            str(item.get('published_at') or '')[:10],
+            item.get('source') or '',
+            item.get('title') or '',
+            (item.get('summary') or '')[:200]
+        ]).encode('utf-8'))
+        h.update(b'\x1e')
+    return h.hexdigest()
+
+def find_cached_analysis(user_id, topic_id, fingerprint):
+    """查詢相同輸入指紋的已完成分析，命中時回傳該筆 topic_angles 記錄"""
+    try:
+        result = supabase.table('topic_angles')\
+            .select('id, angles_data, analyzed_news_count')\
+            .eq('user_id', user_id)\
+            .eq('topic_id', topic_id)\
+            .eq('status', 'completed')\
+            .eq('input_fingerprint', fingerprint)\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+    except Exception as e:
+        # 尚未執行 sql/add_topic_angles_fingerprint.sql 時欄位不存在，視為未命中
+        print(f"[ANALYSIS-CACHE] 查詢快取失敗: {e}")
+        return None
+
+    with _analysis_cache_lock:
+        if result.data:
+            ANALYSIS_CACHE_STATS['hits'] += 1
+        else:
+            ANALYSIS_CACHE_STATS['misses'] += 1
 
+    if result.data:
+        print(f"[ANALYSIS-CACHE] 命中快取: topic={topic_id}, 來源分析={result.data[0]['id']}")
+        return result.data[0]
+    return None
+
+def save_analysis_fingerprint(analysis_id, fingerprint, angles_data):
+    """分析成功後記錄輸入指紋（失敗或空結果不快取，以免重複回傳錯誤）"""
+    if not angles_data or not angles_data.get('angles'):
+        return
+    try:
+        supabase.table('topic_angles')\
+            .update({'input_fingerprint': fingerprint})\
+            .eq('id', analysis_id)\
+            .execute()
+    except Exception as e:
+        print(f"[ANALYSIS-CACHE] 記錄指紋失敗: {e}")
+
+_CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]')
+_TITLE_NOISE_RE = re.compile(r'[\W_]+')
+
+def _format_analysis_item(item):
+    """新聞在角度分析 prompt 中的呈現格式"""
+    return f"[{item.get('published_at', '')[:10]}] {item.get('source', '')}\n標題：{item.get('title', '')}\n摘要：{item.get('summary', '')[:200]}"
+
+def estimate_tokens(text):
+    """粗估 token 數：中日韓文字約 1 字 1 token，其餘約 4 字元 1 token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+def _title_bigrams(title):
+    normalized = _TITLE_NOISE_RE.sub('', (title or '').lower())
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)} or {normalized}
+
+def _analysis_item_score(item, keywords, now):
+    """關鍵字強度（標題命中權重高於摘要）+ 時間新近度"""
+    title = (item.get('title') or '').lower()
+    summary = (item.get('summary') or '').lower()
+    score = 0.0
+    for kw in keywords:
+        kw_lower = kw.lower()
+        if kw_lower in title:
+            score += 3
+        elif kw_lower in summary:
+            score += 1
+
+    try:
+        published = datetime.fromisoformat(item.get('published_at', ''))
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        age_days = max(0.0, (now - published).total_seconds() / 86400)
+        score += max(0.0, 1 - age_days / 30) * 2
+    except (TypeError, ValueError):
+        pass
+    return score
+
+def select_analysis_items(news_data, keywords=None, negative_keywords=None, budget=None):
+    """
+    從歸檔候選中挑出送進角度分析的新聞
+    1. 依關鍵字強度與新近度評分（排除負面關鍵字）
+    2. 標題近似的新聞只保留分數最高的一則
+    3. 同來源逐則降權，避免單一來源佔滿 prompt
+    4. 依 token 預算填滿，最後按時間新到舊排列
+    """
+    budget = budget or ANALYSIS_TOKEN_BUDGET
+    keywords = [kw for kw in (keywords or []) if kw]
+    now = datetime.now(timezone.utc)
+
+    candidates = []
+    for item in news_data:
+        text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
+        if negative_keywords and any(neg.lower() in text for neg in negative_keywords):
+            continue
+        candidates.append((_analysis_item_score(item, keywords, now), item))
+    candidates.sort(key=lambda pair: pair[0], reverse=True)
+
+    # 近似重複合併：依分數高到低，與已保留的代表比較
+    representatives = []
+    for score, item in candidates:
+        grams = _title_bigrams(item.get('title'))
+        duplicate = False
+        for _, _, rep_grams in representatives:
+            if len(grams & rep_grams) / len(grams | rep_grams) >= ANALYSIS_DUPLICATE_THRESHOLD:
+                duplicate = True
+                break
+        if not duplicate:
+            representatives.append((score, item, grams))
+
+    # 來源多樣性 + token 預算
+    selected = []
+    source_counts = {}
+    used_tokens = 0
+    remaining = [(score, item) for score, item, _ in representatives]
+    while remaining and len(selected) < ANALYSIS_MAX_ITEMS:
+        best_index = max(
+            range(len(remaining)),
+            key=lambda i: remaining[i][0] * ANALYSIS_SOURCE_DECAY ** source_counts.get(remaining[i][1].get('source'), 0)
+        )
+        _, item = remaining.pop(best_index)
+        cost = estimate_tokens(_format_analysis_item(item))
+        if used_tokens + cost > budget:
+            continue
+        used_tokens += cost
+        source_counts[item.get('source')] = source_counts.get(item.get('source'), 0) + 1
+        selected.append(item)
+
+    selected.sort(key=lambda item: item.get('published_at') or '', reverse=True)
+    print(f"[AI-ANALYZE] 挑選 {len(selected)}/{len(news_data)} 則新聞（近似重複 {len(candidates) - len(representatives)} 則，約 {used_tokens} tokens）")
+    return selected
 
 def update_single_topic_news(topic_id):
     """只更新單一專題的新聞（用於新增專題時）"""
@@ -1146,107 +2076,75 @@ def update_single_topic_news(topic_id):
     cfg = TOPICS[topic_id]
     print(f"\n[UPDATE] 更新單一專題新聞: {cfg['name']}")
 
-    # 1. 抓取台灣新聞
-    all_news_tw = []
-    for name, url in RSS_SOURCES_TW.items():
-        all_news_tw.extend(fetch_rss(url, name, max_items=50))
-
-    # 2. 抓取國際新聞
-    all_news_intl = []
-    for name, url in RSS_SOURCES_INTL.items():
-        all_news_intl.extend(fetch_rss(url, name, max_items=50))
-
-    # 3. 抓取該專題的 Google News 國際版
     keywords = cfg.get('keywords', {})
     if isinstance(keywords, dict):
+        keywords_zh = keywords.get('zh', [])
         keywords_en = keywords.get('en', [])
         keywords_ja = keywords.get('ja', [])
         keywords_ko = keywords.get('ko', [])
-
-        if keywords_ja:
-            all_news_intl.extend(fetch_google_news_intl(keywords_ja, 'JP', 'ja', max_items=20))
-        if keywords_en:
-            all_news_intl.extend(fetch_google_news_intl(keywords_en, 'US', 'en', max_items=20))
-            all_news_intl.extend(fetch_google_news_intl(keywords_en, 'FR', 'fr', max_items=20))
-        if keywords_ko:
-            all_news_intl.extend(fetch_google_news_intl(keywords_ko, 'KR', 'ko', max_items=20))
-
-    # 4. 過濾該專題的新聞
-    keywords_zh = keywords.get('zh', []) if isinstance(keywords, dict) else keywords
-    keywords_en = keywords.get('en', []) if isinstance(keywords, dict) else []
-    keywords_ja = keywords.get('ja', []) if isinstance(keywords, dict) else []
+    else:
+        keywords_zh, keywords_en, keywords_ja, keywords_ko = keywords, [], [], []
     negative_keywords = cfg.get('negative_keywords', [])
+    intl_keywords = keywords_en + keywords_ja
 
-    # 過濾台灣新聞
-    filtered_tw = [n for n in all_news_tw if keyword_match(n['title'], keywords_zh, negative_keywords)]
-    print(f"[SEARCH] {cfg['name']}: 找到 {len(filtered_tw)} 則台灣新聞")
-
-    # Google News 補充（如需要）
-    if len(filtered_tw) < 10:
-        print(f"[SEARCH] {cfg['name']}: 只有 {len(filtered_tw)} 則，使用 Google News 搜索補充...")
-        google_news = fetch_google_news_by_keywords(keywords_zh, max_items=20)
-        for n in google_news:
-            if keyword_match(n['title'], keywords_zh, negative_keywords):
-                filtered_tw.append(n)
-        print(f"[SEARCH] {cfg['name']}: 補充後共 {len(filtered_tw)} 則新聞")
-
-    # 更新該專題的台灣新聞
-    existing = DATA_STORE['topics'].get(topic_id, [])
-    existing_hashes = {n['hash'] for n in existing}
-
+    # 1. 台灣新聞：並行取得各來源（有效期內沿用記憶體中的抓取結果），串流比對後放進專題緩衝區
+    buffer = get_topic_buffer('topics', topic_id, DATA_STORE['topics'].get(topic_id, []))
     new_items = []
-    for n in filtered_tw[:10]:
-        n_hash = hashlib.md5(n['title'].encode()).hexdigest()
-        n['hash'] = n_hash
-        if n_hash not in existing_hashes:
-            new_items.append(n)
-
-    all_items = new_items + existing
-    DATA_STORE['topics'][topic_id] = all_items[:10]
+    if keywords_zh:
+        routes = {topic_id: (keywords_zh, negative_keywords)}
+        feed_tasks = [(name, fetch_rss_snapshot, (url, name), {}) for name, url in RSS_SOURCES_TW.items()]
+        batches = iter_parallel(feed_tasks, max_workers=8, on_straggler=record_rss_straggler)
+        for _, item in stage_route(stage_dedupe(stage_items(batches)), routes):
+            if buffer.add(item):
+                new_items.append(item)
+        print(f"[SEARCH] {cfg['name']}: 找到 {len(new_items)} 則台灣新聞")
+
+        # Google News 補充（如需要）
+        if buffer.missing() > 0:
+            print(f"[SEARCH] {cfg['name']}: 只有 {len(buffer)} 則，使用 Google News 搜索補充...")
+            for item in fetch_google_news_by_keywords(keywords_zh, max_items=20):
+                if item_matches(item, keywords_zh, negative_keywords) and buffer.add(item):
+                    new_items.append(item)
+            print(f"[SEARCH] {cfg['name']}: 補充後共 {len(buffer)} 則新聞")
 
+    DATA_STORE['topics'][topic_id] = publish_topic_buffer(buffer)
     if new_items:
         print(f"[UPDATE] {cfg['name']}: 新增 {len(new_items)} 則新聞，當前 {len(DATA_STORE['topics'][topic_id])} 則")
 
-    # 過濾國際新聞
-    intl_keywords = keywords_en + keywords_ja
-    filtered_intl = [n for n in all_news_intl if keyword_match(n['title'], intl_keywords, negative_keywords)]
-
-    # 翻譯國際新聞
-    for n in filtered_intl:
-        if 'title_original' not in n:
-            n['title_original'] = n['title']
-            translated = translate_with_gemini(n['title'])
-            n['title'] = translated if translated else n['title']
-            time.sleep(0.5)
-
-    # Google News 國際補充
-    if len(filtered_intl) < 5:
-        for region_name, region_info in GOOGLE_NEWS_INTL_REGIONS.items():
-            if len(filtered_intl) >= 5:
-                break
-            search_keywords = keywords_ja if region_info['lang'] == 'ja' else keywords_en
-            google_intl = fetch_google_news_intl(search_keywords, region_info['code'], region_info['lang'], max_items=20)
-            for n in google_intl:
-                if keyword_match(n['title'], search_keywords, negative_keywords):
-                    n['title_original'] = n['title']
-                    translated = translate_with_gemini(n['title'])
-                    n['title'] = translated if translated else n['title']
-                    filtered_intl.append(n)
-                    time.sleep(0.5)
-
-    # 更新該專題的國際新聞
-    existing_intl = DATA_STORE['international'].get(topic_id, [])
-    existing_intl_hashes = {n['hash'] for n in existing_intl}
-
+    # 2. 國際新聞：RSS 來源與該專題的 Google News 國際版查詢放進同一個抓取池（以原文標題進入緩衝區）
+    buffer = get_topic_buffer('international', topic_id, DATA_STORE['international'].get(topic_id, []))
     new_intl_items = []
-    for n in filtered_intl[:10]:
-        n_hash = hashlib.md5(n.get('title_original', n['title']).encode()).hexdigest()
-        n['hash'] = n_hash
-        if n_hash not in existing_intl_hashes:
-            new_intl_items.append(n)
+    candidates = set()
+    if intl_keywords:
+        routes = {topic_id: (intl_keywords, negative_keywords)}
+        feed_tasks = [(name, fetch_rss_snapshot, (url, name), {}) for name, url in RSS_SOURCES_INTL.items()]
+        feed_tasks += (google_query_tasks([keywords_ja] if keywords_ja else [], 'JP', 'ja')
+                       + google_query_tasks([keywords_en] if keywords_en else [], 'US', 'en')
+                       + google_query_tasks([keywords_en] if keywords_en else [], 'FR', 'fr')
+                       + google_query_tasks([keywords_ko] if keywords_ko else [], 'KR', 'ko'))
+        batches = iter_parallel(feed_tasks, max_workers=8, on_straggler=record_rss_straggler)
+        for _, item in stage_route(stage_dedupe(stage_items(batches)), routes):
+            if buffer.add(item):
+                new_intl_items.append(item)
+                if 'title_original' not in item:
+                    candidates.add(id(item))
+
+        # Google News 國際補充
+        if len(buffer) < 5:
+            for region_name, region_info in GOOGLE_NEWS_INTL_REGIONS.items():
+                if len(buffer) >= 5:
+                    break
+                search_keywords = keywords_ja if region_info['lang'] == 'ja' else keywords_en
+                if not search_keywords:
+                    continue
+                google_intl = fetch_google_news_intl(search_keywords, region_info['code'], region_info['lang'], max_items=20)
+                for item in google_intl:
+                    if item_matches(item, search_keywords, negative_keywords) and buffer.add(item):
+                        candidates.add(id(item))
 
-    all_intl_items = new_intl_items + existing_intl
-    DATA_STORE['international'][topic_id] = all_intl_items[:10]
+    # 只翻譯最後留下的 10 則
+    record_translation_cycle('single', candidates, translate_for_display(buffer.items()))
+    DATA_STORE['international'][topic_id] = publish_topic_buffer(buffer)
 
     if new_intl_items:
         print(f"[UPDATE] {cfg['name']} (國際): 新增 {len(new_intl_items)} 則新聞，當前 {len(DATA_STORE['international'][topic_id])} 則")
@@ -1259,27 +2157,72 @@ def update_single_topic_news(topic_id):
 
     print(f"[UPDATE] {cfg['name']} 更新完成")
 
-def load_user_data(user_id, check_freshness=False):
+# ---------- 每個 (使用者, 專題) 的新鮮度 ----------
+# DATA_STORE[user_id]['topic_updated'] = {topic_id: {'topics': epoch, 'international': epoch}}
+# 使用者載入 worker 兩者都更新；排程的國內/國際更新各自更新對應的一項
+
+def mark_topic_fresh(user_data, tid, kind=None, ts=None):
+    """記錄專題的更新時間（kind=None 代表國內與國際都已更新）；只會往後推進"""
+    ts = ts or time.time()
+    entry = user_data.setdefault('topic_updated', {}).setdefault(tid, {})
+    for k in ((kind,) if kind else ('topics', 'international')):
+        if ts > entry.get(k, 0):
+            entry[k] = ts
+
+def topic_freshness(user_data, tid):
+    """專題最後完整更新的時間（國內與國際取較舊者）；沒有紀錄時為 0"""
+    entry = user_data.get('topic_updated', {}).get(tid)
+    if not entry:
+        return 0
+    return min(entry.get('topics', 0), entry.get('international', 0))
+
+def stale_topic_ids(user_data, tids, max_age):
+    now = time.time()
+    return [tid for tid in tids if now - topic_freshness(user_data, tid) > max_age]
+
+# 使用者載入 worker 同時處理的專題數（每個專題可能等待 Google News 補充、翻譯與歸檔）
+USER_TOPIC_WORKERS = int(os.getenv('USER_TOPIC_WORKERS', '4'))
+
+def load_user_data(user_id, check_freshness=False, user_topics=None):
     """
     載入使用者資料
     check_freshness: True=登入檢查(5分門檻), False=一般輪詢(60分門檻)
+    user_topics: 呼叫端已讀取的使用者專題（判斷新增專題是否過期用）；未提供時只以已載入的專題判斷，不另外查詢資料庫
     """
     global DATA_STORE
 
+    # 0. 先同步其他 worker 寫入共享後端的資料
+    sync_user_from_store(user_id)
+
     # 1. 檢查是否正在載入中，避免重複請求（Race Condition Fix）
     if user_id in DATA_STORE and DATA_STORE[user_id].get('is_loading'):
-        # print(f"[LOAD] 使用者 {user_id} 正在載入中，跳過")
+        # 還在排隊的話，持續輪詢代表使用者正在等待，提升優先順序
+        USER_LOAD_QUEUE.touch(user_id)
         return True
 
     should_refresh = False
 
+    # 設定過期門檻
+    threshold_seconds = 300 if check_freshness else 3600
+    threshold_desc = "5分鐘" if check_freshness else "60分鐘"
+    refresh_max_age = None  # None = worker 更新所有專題
+
     # 2. 檢查記憶體快取是否存在且有效
-    if user_id in DATA_STORE and DATA_STORE[user_id].get('last_update'):
+    if user_id in DATA_STORE and DATA_STORE[user_id].get('topic_updated'):
+        # 依每個專題的新鮮度判斷，只有過期的專題需要重新處理
+        # 以使用者目前的專題判斷（上次載入後新增的專題沒有 topic_updated 紀錄，視為過期）
+        user_data = DATA_STORE[user_id]
+        # （專題讀取失敗時為空列表，改用已載入的專題判斷）
+        topic_ids = [topic['id'] for topic in user_topics or []] or list(user_data['topic_updated'].keys())
+        stale = stale_topic_ids(user_data, topic_ids, threshold_seconds)
+        if not stale:
+            return True
+
+        refresh_max_age = threshold_seconds
+        print(f"[LOAD] 使用者 {user_id} 有 {len(stale)} 個專題已過期 (>{threshold_desc})，觸發背景更新...")
+
+    elif user_id in DATA_STORE and DATA_STORE[user_id].get('last_update'):
         last_update_str = DATA_STORE[user_id]['last_update']
-        
-        # 設定過期門檻
-        threshold_seconds = 300 if check_freshness else 3600
-        threshold_desc = "5分鐘" if check_freshness else "60分鐘"
 
         if last_update_str:
             try:
@@ -1330,38 +2273,185 @@ def load_user_data(user_id, check_freshness=False):
                 t_updated = data.get('updated_at', '')
                 if t_updated and t_updated > latest_update_time:
                     latest_update_time = t_updated
+
+                # 每個專題各自的新鮮度
+                if t_updated:
+                    try:
+                        mark_topic_fresh(DATA_STORE[user_id], tid, ts=datetime.fromisoformat(t_updated).timestamp())
+                    except ValueError:
+                        pass
                     
                 loaded_topics += 1
             
             if latest_update_time:
                 DATA_STORE[user_id]['last_update'] = latest_update_time
+
+            # 上次執行時翻譯失敗的標題（失敗標記不會寫入資料庫，以標題判斷）
+            queue_translation_retries(DATA_STORE[user_id]['international'].values())
                 
             print(f"[LOAD] 從資料庫恢復了 {loaded_topics} 個專題的資料 (最後更新: {latest_update_time})")
             
             # 恢復完成，解除載入鎖定
             DATA_STORE[user_id]['is_loading'] = False
+
+            # 分享給其他 worker，避免它們重複讀取資料庫
+            for tid in db_cache.keys():
+                publish_user_topic(user_id, tid)
+            publish_user_meta(user_id)
             
             # 遞迴呼叫自己，進行新鮮度檢查
-            return load_user_data(user_id, check_freshness)
+            return load_user_data(user_id, check_freshness, user_topics)
         else:
             # {} 表示資料庫中確實沒有快取
             print(f"[LOAD] 資料庫無快取，觸發使用者 {user_id} 首次資料載入 (背景執行)...")
             # 保持 is_loading=True，往下執行以啟動背景執行緒
 
-    # 4. 啟動背景執行緒（適用於資料過期或全新載入的情況）
+    # 4. 排入載入佇列（適用於資料過期或全新載入的情況），由固定數量的 worker 依優先順序執行
     if user_id in DATA_STORE:
         # 確保標記為載入中，並設置為蒐集新資料模式
         DATA_STORE[user_id]['is_loading'] = True
+        DATA_STORE[user_id]['loading_remote'] = False
         DATA_STORE[user_id]['load_mode'] = 'fetch'  # 開始蒐集新資料
-        
-        thread = threading.Thread(target=_load_user_data_worker, args=(user_id,))
-        thread.daemon = True
-        thread.start()
+        publish_user_meta(user_id)
+
+        if not USER_LOAD_QUEUE.submit(user_id, refresh_max_age):
+            # 佇列已滿：先顯示現有資料，下次輪詢再排入
+            print(f"[LOAD] 載入佇列已滿，使用者 {user_id} 稍後再試")
+            DATA_STORE[user_id]['is_loading'] = False
+            DATA_STORE[user_id]['load_mode'] = 'cache'
+            publish_user_meta(user_id)
     
     return True
 
-def _load_user_data_worker(user_id):
-    """背景執行緒：實際執行資料抓取"""
+def _load_user_topic(user_id, tid, cfg, all_news_tw, all_news_intl):
+    """使用者載入 worker 的單一專題處理：過濾、補充、翻譯後立即寫入 DATA_STORE 與快取"""
+    # 過濾台灣新聞
+    filtered_tw = filter_news_by_keywords(all_news_tw, cfg)
+
+    # 如果 RSS 找不到足夠的新聞（少於 5 則），嘗試用 Google News 補充
+    if len(filtered_tw) < 5:
+        keywords = cfg.get('keywords', {})
+        if isinstance(keywords, list):
+            keywords_zh = keywords
+        else:
+            keywords_zh = keywords.get('zh', [])
+
+        if keywords_zh:
+            print(f"[WORKER] {cfg['name']}: RSS 只有 {len(filtered_tw)} 則，使用 Google News 補充...")
+            try:
+                google_news = fetch_google_news_by_keywords(keywords_zh, max_items=20)
+
+                # 過濾並去重
+                existing_hashes = {item_hash(item) for item in filtered_tw}
+                negative_keywords = cfg.get('negative_keywords', [])
+
+                for item in google_news:
+                    if len(filtered_tw) >= 10:
+                        break
+                    if item_matches(item, keywords_zh, negative_keywords):
+                        h = item_hash(item)
+                        if h not in existing_hashes:
+                            existing_hashes.add(h)
+                            filtered_tw.append(item)
+            except Exception as e:
+                print(f"[WORKER] Google News 補充失敗: {e}")
+
+    # 按時間排序並取前 10 則
+    filtered_tw.sort(key=item_ts, reverse=True)
+    DATA_STORE[user_id]['topics'][tid] = filtered_tw[:10]
+
+    # 歸檔所有過濾後的新聞
+    archive_news_to_db(user_id, tid, filtered_tw)
+
+    # 過濾國際新聞
+    filtered_intl = filter_news_by_keywords(all_news_intl, cfg, is_international=True)
+
+    # 如果 RSS 找不到足夠的國際新聞（少於 5 則），嘗試用 Google News 補充
+    if len(filtered_intl) < 5:
+        keywords = cfg.get('keywords', {})
+        if isinstance(keywords, dict):
+            keywords_en = keywords.get('en', [])
+            keywords_ja = keywords.get('ja', [])
+            keywords_ko = keywords.get('ko', [])
+
+            # 決定搜尋關鍵字
+            search_keywords = keywords_en
+            if keywords_ja: search_keywords = keywords_ja
+
+            if search_keywords:
+               print(f"[WORKER] {cfg['name']} (國際): RSS 只有 {len(filtered_intl)} 則，使用 Google News 補充...")
+               try:
+                   # 簡單策略：依據關鍵字語言選擇一個區域補充
+                   region = 'US'
+                   lang = 'en'
+                   if keywords_ja:
+                       region = 'JP'
+                       lang = 'ja'
+                   elif keywords_ko:
+                       region = 'KR'
+                       lang = 'ko'
+                       search_keywords = keywords_ko
+
+                   google_intl = fetch_google_news_intl(search_keywords, region, lang, max_items=10)
+
+                   existing_hashes = {item_hash(item) for item in filtered_intl}
+                   negative_keywords = cfg.get('negative_keywords', [])
+                   all_intl_keywords = keywords_en + keywords_ja + keywords_ko
+
+                   for item in google_intl:
+                       if len(filtered_intl) >= 10:
+                           break
+                       if item_matches(item, all_intl_keywords, negative_keywords):
+                           h = item_hash(item)
+                           if h not in existing_hashes:
+                               existing_hashes.add(h)
+                               filtered_intl.append(item)
+               except Exception as e:
+                   print(f"[WORKER] Google News (國際) 補充失敗: {e}")
+
+    # 按時間排序並取前 10 則，只翻譯這 10 則
+    filtered_intl.sort(key=item_ts, reverse=True)
+    candidates = set()
+    translated = 0
+    if GEMINI_API_KEY:
+        candidates = {id(news) for news in filtered_intl if 'title_original' not in news}
+        translated = translate_for_display(filtered_intl[:10], delay=0.2)
+    DATA_STORE[user_id]['international'][tid] = filtered_intl[:10]
+    mark_topic_fresh(DATA_STORE[user_id], tid)
+    publish_user_topic(user_id, tid)
+
+    # 處理完就存快取，不等其他專題
+    auth.save_topic_cache_item(
+        user_id, tid,
+        DATA_STORE[user_id]['topics'].get(tid, []),
+        DATA_STORE[user_id]['international'].get(tid, []),
+        DATA_STORE[user_id]['summaries'].get(tid, {})
+    )
+    return candidates, translated
+
+def fetch_login_feeds(timeout=20):
+    """
+    使用者載入用：並行取得所有國內與國際來源的完整列表（其他使用者剛抓過的來源直接沿用）
+    期限內未完成的來源略過，不影響其他來源
+    Returns:
+        (國內新聞列表, 國際新聞列表)
+    """
+    groups = {name: 'tw' for name in RSS_SOURCES_TW}
+    groups.update({name: 'intl' for name in RSS_SOURCES_INTL})
+    sources = dict(RSS_SOURCES_TW, **RSS_SOURCES_INTL)
+    feed_tasks = [(name, fetch_rss_snapshot, (url, name), {}) for name, url in sources.items()]
+
+    all_news = {'tw': [], 'intl': []}
+    for name, news_items in iter_parallel(feed_tasks, max_workers=8, timeout=timeout,
+                                          on_straggler=record_rss_straggler):
+        all_news[groups[name]].extend(news_items)
+    return all_news['tw'], all_news['intl']
+
+def _load_user_data_worker(user_id, max_age=None):
+    """
+    背景執行緒：實際執行資料抓取
+    max_age 指定時只重新處理超過 max_age 秒未更新的專題；RSS 來源沿用記憶體中夠新的抓取結果
+    """
     print(f"[WORKER] 開始為使用者 {user_id} 抓取資料...")
     
     try:
@@ -1384,139 +2474,38 @@ def _load_user_data_worker(user_id):
                 'user_id': user_id
             }
 
+        if max_age is not None:
+            stale = set(stale_topic_ids(DATA_STORE[user_id], topics_to_load.keys(), max_age))
+            topics_to_load = {tid: cfg for tid, cfg in topics_to_load.items() if tid in stale}
+            if not topics_to_load:
+                print(f"[WORKER] 使用者 {user_id} 的專題都還在有效期內")
+                return
+
         print(f"[WORKER] 為使用者 {user_id} 載入 {len(topics_to_load)} 個專題的新聞...")
 
-        # 抓取 RSS 新聞
-        all_news_tw = []
-        for name, url in RSS_SOURCES_TW.items():
-            try:
-                all_news_tw.extend(fetch_rss(url, name, max_items=50))
-            except Exception as e:
-                print(f"[WORKER] RSS 抓取失敗 ({name}): {e}")
+        # 並行抓取 RSS 新聞（其他使用者剛抓過的來源直接沿用）
+        all_news_tw, all_news_intl = fetch_login_feeds()
 
-        all_news_intl = []
-        for name, url in RSS_SOURCES_INTL.items():
-            try:
-                all_news_intl.extend(fetch_rss(url, name, max_items=50))
-            except Exception as e:
-                print(f"[WORKER] RSS 抓取失敗 ({name}): {e}")
-
-        # 為每個專題過濾新聞
-        for tid, cfg in topics_to_load.items():
-            # 過濾台灣新聞
-            filtered_tw = filter_news_by_keywords(all_news_tw, cfg)
-            
-            # 如果 RSS 找不到足夠的新聞（少於 5 則），嘗試用 Google News 補充
-            if len(filtered_tw) < 5:
-                keywords = cfg.get('keywords', {})
-                if isinstance(keywords, list):
-                    keywords_zh = keywords
-                else:
-                    keywords_zh = keywords.get('zh', [])
-                
-                if keywords_zh:
-                    print(f"[WORKER] {cfg['name']}: RSS 只有 {len(filtered_tw)} 則，使用 Google News 補充...")
-                    try:
-                        google_news = fetch_google_news_by_keywords(keywords_zh, max_items=20)
-                        
-                        # 過濾並去重
-                        existing_hashes = {hashlib.md5(item['title'].encode()).hexdigest() for item in filtered_tw}
-                        negative_keywords = cfg.get('negative_keywords', [])
-                        
-                        for item in google_news:
-                            if len(filtered_tw) >= 10:
-                                break
-                            content = f"{item['title']} {item['summary']}"
-                            if keyword_match(content, keywords_zh, negative_keywords):
-                                h = hashlib.md5(item['title'].encode()).hexdigest()
-                                if h not in existing_hashes:
-                                    existing_hashes.add(h)
-                                    filtered_tw.append(item)
-                    except Exception as e:
-                        print(f"[WORKER] Google News 補充失敗: {e}")
-
-            # 按時間排序並取前 10 則
-            filtered_tw.sort(key=lambda x: x['published'], reverse=True)
-            DATA_STORE[user_id]['topics'][tid] = filtered_tw[:10]
-            
-            # 歸檔所有過濾後的新聞
-            archive_news_to_db(user_id, tid, filtered_tw)
-
-            # 過濾國際新聞
-            filtered_intl = filter_news_by_keywords(all_news_intl, cfg, is_international=True)
-            
-            # 如果 RSS 找不到足夠的國際新聞（少於 5 則），嘗試用 Google News 補充
-            if len(filtered_intl) < 5:
-                keywords = cfg.get('keywords', {})
-                if isinstance(keywords, dict):
-                    keywords_en = keywords.get('en', [])
-                    keywords_ja = keywords.get('ja', [])
-                    keywords_ko = keywords.get('ko', [])
-                    
-                    # 決定搜尋關鍵字
-                    search_keywords = keywords_en
-                    if keywords_ja: search_keywords = keywords_ja
-                    
-                    if search_keywords:
-                       print(f"[WORKER] {cfg['name']} (國際): RSS 只有 {len(filtered_intl)} 則，使用 Google News 補充...")
-                       try:
-                           # 簡單策略：依據關鍵字語言選擇一個區域補充
-                           region = 'US'
-                           lang = 'en'
-                           if keywords_ja:
-                               region = 'JP'
-                               lang = 'ja'
-                           elif keywords_ko:
-                               region = 'KR'
-                               lang = 'ko'
-                               search_keywords = keywords_ko
-                           
-                           google_intl = fetch_google_news_intl(search_keywords, region, lang, max_items=10)
-                           
-                           existing_hashes = {hashlib.md5(item.get('title_original', item['title']).encode()).hexdigest() for item in filtered_intl}
-                           negative_keywords = cfg.get('negative_keywords', [])
-                           all_intl_keywords = keywords_en + keywords_ja + keywords_ko
-
-                           for item in google_intl:
-                               if len(filtered_intl) >= 10:
-                                   break
-                               content = f"{item['title']} {item['summary']}"
-                               if keyword_match(content, all_intl_keywords, negative_keywords):
-                                   h = hashlib.md5(item['title'].encode()).hexdigest()
-                                   if h not in existing_hashes:
-                                       existing_hashes.add(h)
-                                       # 翻譯
-                                       if GEMINI_API_KEY:
-                                            item['title_original'] = item['title']
-                                            item['title'] = translate_with_gemini(item['title'])
-                                            time.sleep(0.5)
-                                       filtered_intl.append(item)
-                       except Exception as e:
-                           print(f"[WORKER] Google News (國際) 補充失敗: {e}")
-
-            # 翻譯不需要補充的（原本 RSS 抓到的）標題
-            if GEMINI_API_KEY:
-                for news in filtered_intl:
-                    if 'title_original' not in news:
-                        news['title_original'] = news['title']
-                        news['title'] = translate_with_gemini(news['title'])
-                        time.sleep(0.2)
-            
-            # 按時間排序並取前 10 則
-            filtered_intl.sort(key=lambda x: x['published'], reverse=True)
-            DATA_STORE[user_id]['international'][tid] = filtered_intl[:10]
+        # 各專題以有上限的執行緒池並行處理，每個專題完成就寫入 DATA_STORE，儀表板逐步顯示
+        with ThreadPoolExecutor(max_workers=USER_TOPIC_WORKERS) as executor:
+            futures = {
+                executor.submit(_load_user_topic, user_id, tid, cfg, all_news_tw, all_news_intl): cfg['name']
+                for tid, cfg in topics_to_load.items()
+            }
+            candidates = set()
+            translated = 0
+            for future in futures:
+                try:
+                    topic_candidates, topic_translated = future.result()
+                    candidates |= topic_candidates
+                    translated += topic_translated
+                except Exception as e:
+                    print(f"[WORKER] 專題 {futures[future]} 處理失敗: {e}")
+        record_translation_cycle('login', candidates, translated)
 
         # 更新最後更新時間
         DATA_STORE[user_id]['last_update'] = datetime.now(TAIPEI_TZ).isoformat()
         
-        # 儲存快取到 Supabase
-        print(f"[WORKER] 正在將使用者 {user_id} 的快取同步到 Supabase...")
-        for tid in topics_to_load.keys():
-            domestic = DATA_STORE[user_id]['topics'].get(tid, [])
-            intl = DATA_STORE[user_id]['international'].get(tid, [])
-            summary = DATA_STORE[user_id]['summaries'].get(tid, {})
-            auth.save_topic_cache_item(user_id, tid, domestic, intl, summary)
-        
         # 舊的檔案快取可保留可移除，這裡我們先移除以避免混淆
         # save_data_cache()
 
@@ -1531,14 +2520,22 @@ def _load_user_data_worker(user_id):
         # 確保無論成功失敗都解除載入鎖定，避免死鎖
         if user_id in DATA_STORE:
             DATA_STORE[user_id]['is_loading'] = False
+            publish_user_meta(user_id)
+
+# 使用者資料載入的准入控制：固定 LOAD_WORKERS 個 worker，取代每位使用者一條執行緒
+# 登入潮時最多同時 LOAD_WORKERS 個完整抓取，其餘排隊；同一使用者只排一次，正在輪詢的使用者優先
+LOAD_WORKERS = int(os.getenv('LOAD_WORKERS', '2'))
+LOAD_QUEUE_MAX = int(os.getenv('LOAD_QUEUE_MAX', '500'))
+USER_LOAD_QUEUE = load_admission.LoadAdmission(_load_user_data_worker, workers=LOAD_WORKERS, max_pending=LOAD_QUEUE_MAX)
 
 def update_topic_news():
     global LOADING_STATUS
 
     # 在認證模式下，只更新有快取的使用者專題（按需載入策略）
     if AUTH_ENABLED:
-        # 從快取中取得已載入的使用者 ID
-        cached_user_ids = [uid for uid in DATA_STORE.keys() if uid not in ['topics', 'international', 'summaries', 'last_update']]
+        # 從快取中取得已載入的使用者 ID（含其他 worker 載入的使用者）
+        sync_all_users_from_store()
+        cached_user_ids = [uid for uid in DATA_STORE.keys() if uid not in ['topics', 'international', 'summaries', 'last_update', 'topic_owners']]
 
         if not cached_user_ids:
             print(f"[UPDATE] 沒有使用者快取，跳過更新")
@@ -1572,58 +2569,16 @@ def update_topic_news():
         'total': total_topics,
         'current_topic': '',
         'phase': 'news'
-    }
-    print(f"\n[UPDATE] 開始更新新聞 - {datetime.now(TAIPEI_TZ).strftime('%H:%M:%S')}")
-
-    # 1. 抓取台灣新聞（增加抓取數量）
-    all_news_tw = []
-    for name, url in RSS_SOURCES_TW.items():
-        all_news_tw.extend(fetch_rss(url, name, max_items=50))
-
-    # 2. 抓取國際新聞（增加抓取數量）
-    all_news_intl = []
-    for name, url in RSS_SOURCES_INTL.items():
-        all_news_intl.extend(fetch_rss(url, name, max_items=50))
-
-    # 2.5 抓取 Google News 國際版新聞（日本、美國、法國）
-    # 2.5 抓取 Google News 國際版新聞（優化：去重搜尋 + 支援韓文）
-    # 先收集所有需要搜尋的唯一關鍵字組合，避免重複抓取
-    unique_searches = set() # (region, lang, keyword)
-
-    for tid, cfg in topics_to_update.items():
-        keywords = cfg.get('keywords', {})
-        if isinstance(keywords, dict):
-            keywords_en = keywords.get('en', [])
-            keywords_ja = keywords.get('ja', [])
-            keywords_ko = keywords.get('ko', [])
-
-            # 取第一個關鍵字作為代表進行搜尋
-            if keywords_ja: unique_searches.add(('JP', 'ja', keywords_ja[0]))
-            if keywords_en: 
-                unique_searches.add(('US', 'en', keywords_en[0]))
-                unique_searches.add(('FR', 'fr', keywords_en[0]))
-            if keywords_ko: unique_searches.add(('KR', 'ko', keywords_ko[0]))
-
-    print(f"[UPDATE] 彙整後需執行 {len(unique_searches)} 次 Google News 搜尋")
-    
-    google_news_intl = []
-    # 執行去重後的搜尋
-    for region, lang, keyword in unique_searches:
-        try:
-            google_news_intl.extend(fetch_google_news_intl([keyword], region, lang, max_items=20))
-            time.sleep(1) # 溫柔一點
-        except Exception as e:
-            print(f"[UPDATE] Google Search error ({region}/{keyword}): {e}")
-
-    all_news_intl.extend(google_news_intl)
-
-    # 3. 過濾台灣新聞和國際新聞
-    topic_index = 0
-    for tid, cfg in topics_to_update.items():
-        topic_index += 1
-        LOADING_STATUS['current'] = topic_index
-        LOADING_STATUS['current_topic'] = cfg['name']
+    }
+    print(f"\n[UPDATE] 開始更新新聞 - {datetime.now(TAIPEI_TZ).strftime('%H:%M:%S')}")
 
+    # 1. 整理各專題的關鍵字與現有新聞緩衝區
+    routes_tw = {}
+    routes_intl = {}
+    intl_keywords_by_topic = {}
+    buffers_tw = {}
+    buffers_intl = {}
+    for tid, cfg in topics_to_update.items():
         # 記錄專題擁有者（在認證模式下）
         if AUTH_ENABLED and 'user_id' in cfg:
             DATA_STORE['topic_owners'][tid] = cfg['user_id']
@@ -1635,160 +2590,159 @@ def update_topic_news():
             keywords_zh = keywords
             keywords_en = []
             keywords_ja = []
+            keywords_ko = []
         else:
             keywords_zh = keywords.get('zh', [])
             keywords_en = keywords.get('en', [])
             keywords_ja = keywords.get('ja', [])
+            keywords_ko = keywords.get('ko', [])
 
         # 獲取負面關鍵字
         negative_keywords = cfg.get('negative_keywords', [])
 
-        # 過濾台灣新聞（使用中文關鍵字）- 確保至少10則
-        if not keywords_zh:
+        # 取得現有新聞列表的緩衝區（認證模式下在擁有者的資料中）
+        if AUTH_ENABLED and 'user_id' in cfg:
+            owner_data = DATA_STORE.get(cfg['user_id'], {})
+        else:
+            owner_data = DATA_STORE
+
+        if keywords_zh:
+            routes_tw[tid] = (keywords_zh, negative_keywords)
+            buffers_tw[tid] = get_topic_buffer('topics', tid, owner_data.get('topics', {}).get(tid, []))
+        else:
             DATA_STORE['topics'][tid] = []
+
+        intl_keywords = keywords_en + keywords_ja
+        if intl_keywords:
+            routes_intl[tid] = (intl_keywords, negative_keywords)
+            intl_keywords_by_topic[tid] = (keywords_en, keywords_ja, keywords_ko)
+            buffers_intl[tid] = get_topic_buffer('international', tid, owner_data.get('international', {}).get(tid, []))
         else:
-            # 取得現有新聞列表
-            existing_news = DATA_STORE['topics'].get(tid, [])
-            existing_hashes = {hashlib.md5(item['title'].encode()).hexdigest(): item
-                             for item in existing_news}
-
-            # 過濾新新聞
-            filtered_tw = []
-            seen_tw = set(existing_hashes.keys())
-            new_items = []
-
-            for item in all_news_tw:
-                content = f"{item['title']} {item['summary']}"
-                if keyword_match(content, keywords_zh, negative_keywords):
-                    h = hashlib.md5(item['title'].encode()).hexdigest()
-                    if h not in seen_tw:
-                        seen_tw.add(h)
-                        new_items.append(item)
-
-            # 合併：新新聞 + 現有新聞，按時間排序
-            all_items = new_items + existing_news
-            all_items.sort(key=lambda x: x['published'], reverse=True)
-
-            # 如果新聞數量少於 10 則，使用 Google News 搜索補充
-            if len(all_items) < 10:
-                print(f"[SEARCH] {cfg['name']}: 只有 {len(all_items)} 則，使用 Google News 搜索補充...")
-                google_news = fetch_google_news_by_keywords(keywords_zh, max_items=100)
+            DATA_STORE['international'][tid] = []
 
-                # 過濾並去重
-                existing_hashes_all = {hashlib.md5(item['title'].encode()).hexdigest() for item in all_items}
-                for item in google_news:
-                    if len(all_items) >= 10:
+    # 2. 台灣新聞串流管線：所有來源並行抓取（完整列表，不推進游標），先抓完的來源先去重、分派到專題緩衝區
+    new_by_topic = {tid: [] for tid in routes_tw}
+    if routes_tw:
+        batches = iter_rss_parallel(RSS_SOURCES_TW, max_workers=8, include_seen=True, routes=routes_tw)
+        for tid, item in stage_route(stage_dedupe(stage_items(batches)), routes_tw):
+            if buffers_tw[tid].add(item):
+                new_by_topic[tid].append(item)
+
+    # Google News 補充：不足 10 則的專題關鍵字合併成 OR 查詢一起抓，結果再依關鍵字分派回各專題
+    topup_lists = [routes_tw[tid][0] for tid in routes_tw if buffers_tw[tid].missing() > 0]
+    google_pool = []
+    if topup_lists:
+        google_tasks = google_query_tasks(topup_lists, 'TW', 'zh-TW', max_items=100)
+        print(f"[UPDATE] Google News 查詢 {len(google_tasks)} 次（{len(topup_lists)} 個專題需要補充）")
+        google_pool = list(stage_items(iter_parallel(google_tasks, max_workers=4)))
+
+    # 3. 國際新聞串流管線：RSS 來源與 Google News 國際版查詢（依地區合併成 OR 查詢）放進同一個抓取池
+    # 以原文標題進入緩衝區，寫入前才翻譯最後留下的 10 則
+    new_intl_by_topic = {tid: [] for tid in routes_intl}
+    intl_candidates = set()
+    if routes_intl:
+        fetch_tasks = [(name, fetch_rss, (url, name),
+                        {'timeout': 15, 'max_items': 50, 'include_seen': True, 'routes': routes_intl})
+                       for name, url in RSS_SOURCES_INTL.items()]
+        ja_lists = [kw[1] for kw in intl_keywords_by_topic.values() if kw[1]]
+        en_lists = [kw[0] for kw in intl_keywords_by_topic.values() if kw[0]]
+        ko_lists = [kw[2] for kw in intl_keywords_by_topic.values() if kw[2]]
+        google_tasks = (google_query_tasks(ja_lists, 'JP', 'ja')
+                        + google_query_tasks(en_lists, 'US', 'en')
+                        + google_query_tasks(en_lists, 'FR', 'fr')
+                        + google_query_tasks(ko_lists, 'KR', 'ko'))
+        print(f"[UPDATE] 彙整後需執行 {len(google_tasks)} 次 Google News 搜尋")
+        fetch_tasks.extend(google_tasks)
+
+        batches = iter_parallel(fetch_tasks, max_workers=8, on_straggler=record_rss_straggler)
+        for tid, item in stage_route(stage_dedupe(stage_items(batches)), routes_intl):
+            if buffers_intl[tid].add(item):
+                new_intl_by_topic[tid].append(item)
+                if 'title_original' not in item:
+                    intl_candidates.add(id(item))
+
+    # 4. 各專題補充並寫入
+    intl_translated = 0
+    google_query_cache = {}
+    topic_index = 0
+    for tid, cfg in topics_to_update.items():
+        topic_index += 1
+        LOADING_STATUS['current'] = topic_index
+        LOADING_STATUS['current_topic'] = cfg['name']
+
+        owner_id = cfg.get('user_id') if AUTH_ENABLED else None
+        owner_data = DATA_STORE.get(owner_id) if owner_id else None
+
+        if tid in routes_tw:
+            keywords_zh, negative_keywords = routes_tw[tid]
+            buffer = buffers_tw[tid]
+
+            if google_pool and buffer.missing() > 0:
+                for item in google_pool:
+                    if buffer.missing() <= 0:
                         break
-                    content = f"{item['title']} {item['summary']}"
-                    if keyword_match(content, keywords_zh, negative_keywords):
-                        h = hashlib.md5(item['title'].encode()).hexdigest()
-                        if h not in existing_hashes_all:
-                            existing_hashes_all.add(h)
-                            all_items.append(item)
-
-                all_items.sort(key=lambda x: x['published'], reverse=True)
-                print(f"[SEARCH] {cfg['name']}: 補充後共 {len(all_items)} 則新聞")
-
-            # 保持最新的 10 則（一則一則替換）
-            if AUTH_ENABLED and tid in DATA_STORE.get('topic_owners', {}):
-                owner_id = DATA_STORE['topic_owners'][tid]
-                if owner_id in DATA_STORE:
-                    DATA_STORE[owner_id]['topics'][tid] = all_items[:10]
+                    if item_matches(item, keywords_zh, negative_keywords):
+                        buffer.add(item)
+                print(f"[SEARCH] {cfg['name']}: 補充後共 {len(buffer)} 則新聞")
+
+            if owner_id:
+                if owner_data and 'topics' in owner_data:
+                    owner_data['topics'][tid] = publish_topic_buffer(buffer)
+                    publish_user_topic(owner_id, tid)
             else:
-                DATA_STORE['topics'][tid] = all_items[:10]
+                DATA_STORE['topics'][tid] = publish_topic_buffer(buffer)
 
-            if new_items:
-                current_count = len(DATA_STORE[owner_id]['topics'][tid]) if (AUTH_ENABLED and tid in DATA_STORE.get('topic_owners', {}) and owner_id in DATA_STORE) else len(DATA_STORE['topics'][tid])
-                print(f"[UPDATE] {cfg['name']}: 新增 {len(new_items)} 則新聞，當前 {current_count} 則")
+            if new_by_topic[tid]:
+                print(f"[UPDATE] {cfg['name']}: 新增 {len(new_by_topic[tid])} 則新聞，當前 {len(buffer)} 則")
 
-        # 過濾國際新聞（使用英日文關鍵字）- 確保至少10則
-        intl_keywords = keywords_en + keywords_ja
-        if not intl_keywords:
-            DATA_STORE['international'][tid] = []
-        else:
-            # 取得現有國際新聞
-            existing_intl = DATA_STORE['international'].get(tid, [])
-            existing_intl_hashes = {hashlib.md5(item.get('title_original', item['title']).encode()).hexdigest(): item
-                                   for item in existing_intl}
-
-            # 過濾新的國際新聞
-            filtered_intl = []
-            seen_intl = set(existing_intl_hashes.keys())
-            new_intl_items = []
-
-            for item in all_news_intl:
-                content = f"{item['title']} {item['summary']}"
-                if keyword_match(content, intl_keywords, negative_keywords):
-                    h = hashlib.md5(item['title'].encode()).hexdigest()
-                    if h not in seen_intl:
-                        seen_intl.add(h)
-                        # 翻譯標題（加入延遲避免 API 速率限制）
-                        original_title = item['title']
-                        translated_title = translate_with_gemini(original_title)
-                        item['title_original'] = original_title
-                        item['title'] = translated_title
-                        new_intl_items.append(item)
-                        time.sleep(0.5)  # 每次翻譯後等待 0.5 秒
-
-            # 合併：新新聞 + 現有新聞，按時間排序
-            all_intl_items = new_intl_items + existing_intl
-            all_intl_items.sort(key=lambda x: x['published'], reverse=True)
-
-            # 如果新聞數量少於 5 則，使用 Google News 國際版補充
-            if len(all_intl_items) < 5:
-                print(f"[SEARCH] {cfg['name']} (國際): 只有 {len(all_intl_items)} 則，使用 Google News 國際版補充...")
-
-                # 依序從日本、美國、法國 Google News 補充
+        if tid in routes_intl:
+            intl_keywords, negative_keywords = routes_intl[tid]
+            keywords_en, keywords_ja, keywords_ko = intl_keywords_by_topic[tid]
+            buffer = buffers_intl[tid]
+
+            # 如果新聞數量少於 5 則，依序從各地區 Google News 國際版補充
+            if len(buffer) < 5:
+                print(f"[SEARCH] {cfg['name']} (國際): 只有 {len(buffer)} 則，使用 Google News 國際版補充...")
                 for region_name, region_info in GOOGLE_NEWS_INTL_REGIONS.items():
-                    if len(all_intl_items) >= 5:
+                    if len(buffer) >= 5:
                         break
 
                     # 根據語言選擇關鍵字
-                    search_keywords = keywords_ja if region_info['lang'] == 'ja' else keywords_en
+                    if region_info['lang'] == 'ja':
+                        search_keywords = keywords_ja
+                    elif region_info['lang'] == 'ko':
+                        search_keywords = keywords_ko
+                    else:
+                        search_keywords = keywords_en
                     if not search_keywords:
                         continue
 
-                    google_intl = fetch_google_news_intl(
-                        search_keywords,
-                        region_info['code'],
-                        region_info['lang'],
-                        max_items=20
-                    )
-
-                    # 過濾並翻譯
-                    existing_hashes_all = {hashlib.md5(item.get('title_original', item['title']).encode()).hexdigest()
-                                         for item in all_intl_items}
-                    for item in google_intl:
-                        if len(all_intl_items) >= 5:
+                    # 多個使用者的專題關鍵字相同時，同一輪只查詢一次
+                    query_key = (region_info['code'], tuple(plan_google_queries([search_keywords])))
+                    if query_key not in google_query_cache:
+                        google_query_cache[query_key] = fetch_google_news_intl(search_keywords, region_info['code'], region_info['lang'], max_items=20)
+                    for item in [dict(item) for item in google_query_cache[query_key]]:  # 後續會就地翻譯，各專題各自一份
+                        if len(buffer) >= 5:
                             break
-                        content = f"{item['title']} {item['summary']}"
-                        if keyword_match(content, intl_keywords, negative_keywords):
-                            h = hashlib.md5(item['title'].encode()).hexdigest()
-                            if h not in existing_hashes_all:
-                                existing_hashes_all.add(h)
-                                # 翻譯標題
-                                original_title = item['title']
-                                translated_title = translate_with_gemini(original_title)
-                                item['title_original'] = original_title
-                                item['title'] = translated_title
-                                all_intl_items.append(item)
-                                time.sleep(0.5)
-
-                all_intl_items.sort(key=lambda x: x['published'], reverse=True)
-                print(f"[SEARCH] {cfg['name']} (國際): 補充後共 {len(all_intl_items)} 則新聞")
-
-            # 保持最新的 10 則
-            if AUTH_ENABLED and tid in DATA_STORE.get('topic_owners', {}):
-                owner_id = DATA_STORE['topic_owners'][tid]
-                if owner_id in DATA_STORE:
-                    DATA_STORE[owner_id]['international'][tid] = all_intl_items[:10]
+                        if item_matches(item, intl_keywords, negative_keywords) and buffer.add(item):
+                            intl_candidates.add(id(item))
+
+                print(f"[SEARCH] {cfg['name']} (國際): 補充後共 {len(buffer)} 則新聞")
+
+            # 只翻譯最後留下的 10 則（同一則新聞符合多個專題時只翻譯一次）
+            intl_translated += translate_for_display(buffer.items())
+
+            if owner_id:
+                if owner_data and 'international' in owner_data:
+                    owner_data['international'][tid] = publish_topic_buffer(buffer)
+                    publish_user_topic(owner_id, tid)
             else:
-                DATA_STORE['international'][tid] = all_intl_items[:10]
+                DATA_STORE['international'][tid] = publish_topic_buffer(buffer)
 
-            if new_intl_items:
-                current_count = len(DATA_STORE[owner_id]['international'][tid]) if (AUTH_ENABLED and tid in DATA_STORE.get('topic_owners', {}) and owner_id in DATA_STORE) else len(DATA_STORE['international'][tid])
-                print(f"[UPDATE] {cfg['name']} (國際): 新增 {len(new_intl_items)} 則新聞，當前 {current_count} 則")
+            if new_intl_by_topic[tid]:
+                print(f"[UPDATE] {cfg['name']} (國際): 新增 {len(new_intl_by_topic[tid])} 則新聞，當前 {len(buffer)} 則")
 
+    record_translation_cycle('full', intl_candidates, intl_translated)
     DATA_STORE['last_update'] = datetime.now(TAIPEI_TZ).isoformat()
     LOADING_STATUS['is_loading'] = False
     LOADING_STATUS['current'] = total_topics
@@ -1800,12 +2754,19 @@ def update_topic_news():
     # 摘要更新改用排程（每天 8:00 和 18:00），不在新聞更新時觸發
 
 def update_domestic_news():
-    """只更新國內新聞（整點開始每30分鐘）"""
+    """只更新國內新聞（每 15 分鐘檢查一次，只抓取已到期的來源）"""
     global LOADING_STATUS
 
+    due_sources = SOURCE_SCHEDULER.due(RSS_SOURCES_TW)
+    google_topup = _google_topup_due('domestic')
+    if not due_sources and not google_topup and not has_late_results('domestic'):
+        print(f"[UPDATE:DOMESTIC] 沒有到期的來源，略過本輪")
+        return
+
     # 在認證模式下，從 Supabase 讀取所有使用者的專題
     if AUTH_ENABLED:
         try:
+            sync_all_users_from_store()
             all_user_topics = auth.get_all_topics_admin()
             topics_to_update = {}
             for topic in all_user_topics:
@@ -1841,16 +2802,10 @@ def update_domestic_news():
     }
     print(f"\n[UPDATE:DOMESTIC] 開始更新國內新聞 - {datetime.now(TAIPEI_TZ).strftime('%H:%M:%S')}")
 
-    # 1. 並行抓取台灣新聞（21 個來源）
-    all_news_tw = fetch_rss_parallel(RSS_SOURCES_TW, max_workers=8)
-
-    # 2. 過濾台灣新聞
-    topic_index = 0
+    # 1. 整理各專題的關鍵字與現有新聞
+    routes = {}
+    buffers = {}
     for tid, cfg in topics_to_update.items():
-        topic_index += 1
-        LOADING_STATUS['current'] = topic_index
-        LOADING_STATUS['current_topic'] = cfg['name']
-
         # 記錄專題擁有者（在認證模式下）
         if AUTH_ENABLED and 'user_id' in cfg:
             DATA_STORE['topic_owners'][tid] = cfg['user_id']
@@ -1863,55 +2818,72 @@ def update_domestic_news():
         else:
             keywords_zh = keywords.get('zh', [])
 
-        negative_keywords = cfg.get('negative_keywords', [])
-
         if not keywords_zh:
             continue
 
-        # 取得現有新聞列表
-        existing_news = DATA_STORE['topics'].get(tid, [])
-        existing_hashes = {hashlib.md5(item['title'].encode()).hexdigest(): item
-                         for item in existing_news}
-
-        # 過濾新新聞
-        seen_tw = set(existing_hashes.keys())
-        new_items = []
-
-        for item in all_news_tw:
-            content = f"{item['title']} {item['summary']}"
-            if keyword_match(content, keywords_zh, negative_keywords):
-                h = hashlib.md5(item['title'].encode()).hexdigest()
-                if h not in seen_tw:
-                    seen_tw.add(h)
-                    new_items.append(item)
+        routes[tid] = (keywords_zh, cfg.get('negative_keywords', []))
+
+        # 取得現有新聞列表的緩衝區（認證模式下在擁有者的資料中）
+        if AUTH_ENABLED and 'user_id' in cfg:
+            existing_news = DATA_STORE.get(cfg['user_id'], {}).get('topics', {}).get(tid, [])
+        else:
+            existing_news = DATA_STORE['topics'].get(tid, [])
+        buffers[tid] = get_topic_buffer('topics', tid, existing_news)
+
+    # 2. 串流管線：每個到期來源抓完就去重、分派到專題，不等所有來源
+    print(f"[UPDATE:DOMESTIC] 到期來源 {len(due_sources)}/{len(RSS_SOURCES_TW)}，Google 補充: {'是' if google_topup else '否'}")
+    new_by_topic = {tid: [] for tid in routes}
+    cycle_start = time.time()
+    completed = set()
+    if (due_sources or has_late_results('domestic')) and routes:
+        batches = iter_rss_parallel({name: RSS_SOURCES_TW[name] for name in due_sources}, max_workers=8,
+                                    late_group='domestic', routes=routes)
+        for tid, item in stage_route(stage_dedupe(stage_items(batches, completed)), routes):
+            if buffers[tid].add(item):
+                new_by_topic[tid].append(item)
+    # 只有在期限內完成且抓取成功的來源才算抓過；略過、失敗、逾時的來源維持到期
+    SOURCE_SCHEDULER.mark_polled([name for name in due_sources if name in completed], observed_since=cycle_start)
+
+    # Google News 補充：不足 10 則的專題關鍵字合併成 OR 查詢一起抓，結果再依關鍵字分派回各專題
+    google_pool = []
+    if google_topup:
+        topup_lists = [routes[tid][0] for tid in routes if buffers[tid].missing() > 0]
+        if topup_lists:
+            google_tasks = google_query_tasks(topup_lists, 'TW', 'zh-TW', max_items=100)
+            print(f"[UPDATE:DOMESTIC] Google News 查詢 {len(google_tasks)} 次（{len(topup_lists)} 個專題需要補充）")
+            google_pool = list(stage_items(iter_parallel(google_tasks, max_workers=4)))
+
+    # 3. 各專題合併、補充並寫入
+    topic_index = 0
+    for tid, cfg in topics_to_update.items():
+        topic_index += 1
+        LOADING_STATUS['current'] = topic_index
+        LOADING_STATUS['current_topic'] = cfg['name']
+
+        if tid not in routes:
+            continue
 
-        # 合併：新新聞 + 現有新聞，按時間排序
-        all_items = new_items + existing_news
-        all_items.sort(key=lambda x: x['published'], reverse=True)
+        keywords_zh, negative_keywords = routes[tid]
+        buffer = buffers[tid]
+        new_items = new_by_topic[tid]
 
         # Google News 補充
-        if len(all_items) < 10:
-            google_news = fetch_google_news_by_keywords(keywords_zh, max_items=100)
-            existing_hashes_all = {hashlib.md5(item['title'].encode()).hexdigest() for item in all_items}
-            for item in google_news:
-                if len(all_items) >= 10:
+        if google_pool and buffer.missing() > 0:
+            for item in google_pool:
+                if buffer.missing() <= 0:
                     break
-                content = f"{item['title']} {item['summary']}"
-                if keyword_match(content, keywords_zh, negative_keywords):
-                    h = hashlib.md5(item['title'].encode()).hexdigest()
-                    if h not in existing_hashes_all:
-                        existing_hashes_all.add(h)
-                        all_items.append(item)
-
-            all_items.sort(key=lambda x: x['published'], reverse=True)
+                if item_matches(item, keywords_zh, negative_keywords):
+                    buffer.add(item)
 
         if AUTH_ENABLED and 'user_id' in cfg:
             owner_id = cfg['user_id']
             # 確保該使用者的資料結構存在
             if owner_id in DATA_STORE and 'topics' in DATA_STORE[owner_id]:
-                DATA_STORE[owner_id]['topics'][tid] = all_items[:10]
+                DATA_STORE[owner_id]['topics'][tid] = publish_topic_buffer(buffer)
+                mark_topic_fresh(DATA_STORE[owner_id], tid, 'topics')
+                publish_user_topic(owner_id, tid)
         else:
-            DATA_STORE['topics'][tid] = all_items[:10]
+            DATA_STORE['topics'][tid] = publish_topic_buffer(buffer)
 
         if new_items:
             print(f"[UPDATE:DOMESTIC] {cfg['name']}: 新增 {len(new_items)} 則新聞")
@@ -1922,12 +2894,19 @@ def update_domestic_news():
     print("[UPDATE:DOMESTIC] 完成")
 
 def update_international_news():
-    """只更新國際新聞（15分開始每30分鐘）"""
+    """只更新國際新聞（每 30 分鐘檢查一次，只抓取已到期的來源）"""
     global LOADING_STATUS
 
+    due_sources = SOURCE_SCHEDULER.due(RSS_SOURCES_INTL)
+    google_topup = _google_topup_due('international')
+    if not due_sources and not google_topup and not has_late_results('international'):
+        print(f"[UPDATE:INTL] 沒有到期的來源，略過本輪")
+        return
+
     # 在認證模式下，從 Supabase 讀取所有使用者的專題
     if AUTH_ENABLED:
         try:
+            sync_all_users_from_store()
             all_user_topics = auth.get_all_topics_admin()
             topics_to_update = {}
             for topic in all_user_topics:
@@ -1958,29 +2937,11 @@ def update_international_news():
     }
     print(f"\n[UPDATE:INTL] 開始更新國際新聞 - {datetime.now(TAIPEI_TZ).strftime('%H:%M:%S')}")
 
-    # 1. 並行抓取國際新聞固定來源（4 個）
-    all_news_intl = fetch_rss_parallel(RSS_SOURCES_INTL, max_workers=4)
-
-    # 2. 抓取 Google News 國際版
-    for tid, cfg in topics_to_update.items():
-        keywords = cfg.get('keywords', {})
-        if isinstance(keywords, dict):
-            keywords_en = keywords.get('en', [])
-            keywords_ja = keywords.get('ja', [])
-
-            if keywords_ja:
-                all_news_intl.extend(fetch_google_news_intl(keywords_ja, 'JP', 'ja', max_items=20))
-            if keywords_en:
-                all_news_intl.extend(fetch_google_news_intl(keywords_en, 'US', 'en', max_items=20))
-                all_news_intl.extend(fetch_google_news_intl(keywords_en, 'FR', 'fr', max_items=20))
-
-    # 3. 過濾國際新聞
-    topic_index = 0
+    # 1. 整理各專題的關鍵字與現有國際新聞
+    routes = {}
+    intl_keywords_by_topic = {}
+    buffers = {}
     for tid, cfg in topics_to_update.items():
-        topic_index += 1
-        LOADING_STATUS['current'] = topic_index
-        LOADING_STATUS['current_topic'] = cfg['name']
-
         # 記錄專題擁有者（在認證模式下）
         if AUTH_ENABLED and 'user_id' in cfg:
             DATA_STORE['topic_owners'][tid] = cfg['user_id']
@@ -1996,42 +2957,72 @@ def update_international_news():
             keywords_ja = keywords.get('ja', [])
             keywords_ko = keywords.get('ko', [])
 
-        negative_keywords = cfg.get('negative_keywords', [])
         intl_keywords = keywords_en + keywords_ja + keywords_ko
-
         if not intl_keywords:
             continue
 
-        # 取得現有國際新聞
-        existing_intl = DATA_STORE['international'].get(tid, [])
-        existing_intl_hashes = {hashlib.md5(item.get('title_original', item['title']).encode()).hexdigest(): item
-                               for item in existing_intl}
-
-        seen_intl = set(existing_intl_hashes.keys())
-        new_intl_items = []
-
-        for item in all_news_intl:
-            content = f"{item['title']} {item['summary']}"
-            if keyword_match(content, intl_keywords, negative_keywords):
-                h = hashlib.md5(item['title'].encode()).hexdigest()
-                if h not in seen_intl:
-                    seen_intl.add(h)
-                    # 翻譯標題
-                    original_title = item['title']
-                    translated_title = translate_with_gemini(original_title)
-                    item['title_original'] = original_title
-                    item['title'] = translated_title
-                    new_intl_items.append(item)
-                    time.sleep(0.5)
-
-        # 合併並排序
-        all_intl_items = new_intl_items + existing_intl
-        all_intl_items.sort(key=lambda x: x['published'], reverse=True)
+        routes[tid] = (intl_keywords, cfg.get('negative_keywords', []))
+        intl_keywords_by_topic[tid] = (keywords_en, keywords_ja, keywords_ko)
+
+        # 取得現有國際新聞（認證模式下在擁有者的資料中）
+        if AUTH_ENABLED and 'user_id' in cfg:
+            existing_intl = DATA_STORE.get(cfg['user_id'], {}).get('international', {}).get(tid, [])
+        else:
+            existing_intl = DATA_STORE['international'].get(tid, [])
+        buffers[tid] = get_topic_buffer('international', tid, existing_intl)
+
+    fetch_tasks = [(name, fetch_rss, (url, name), {'timeout': 15, 'max_items': 50, 'routes': routes})
+                   for name, url in RSS_SOURCES_INTL.items() if name in due_sources]
+
+    # Google News 國際版：所有專題的關鍵字依地區合併成 OR 查詢，與 RSS 來源放進同一個抓取池（維持原本頻率）
+    if google_topup:
+        ja_lists = [kw[1] for kw in intl_keywords_by_topic.values() if kw[1]]
+        en_lists = [kw[0] for kw in intl_keywords_by_topic.values() if kw[0]]
+        google_tasks = (google_query_tasks(ja_lists, 'JP', 'ja')
+                        + google_query_tasks(en_lists, 'US', 'en')
+                        + google_query_tasks(en_lists, 'FR', 'fr'))
+        print(f"[UPDATE:INTL] Google News 查詢 {len(google_tasks)} 次（{len(intl_keywords_by_topic)} 個專題）")
+        fetch_tasks.extend(google_tasks)
+
+    # 2. 串流管線：抓取 → 去重 → 分派專題 → 專題緩衝區，先抓完的來源先處理（與國內管線相同）
+    # 以原文標題進入緩衝區，寫入前才翻譯最後留下的 10 則
+    print(f"[UPDATE:INTL] 到期來源 {len(due_sources)}/{len(RSS_SOURCES_INTL)}，Google 補充: {'是' if google_topup else '否'}")
+    new_by_topic = {tid: [] for tid in routes}
+    candidates = set()
+    cycle_start = time.time()
+    completed = set()
+    if (fetch_tasks or has_late_results('international')) and routes:
+        batches = iter_parallel(fetch_tasks, max_workers=4, late_group='international',
+                                on_straggler=record_rss_straggler)
+        for tid, item in stage_route(stage_dedupe(stage_items(batches, completed)), routes):
+            if buffers[tid].add(item):
+                new_by_topic[tid].append(item)
+                if 'title_original' not in item:
+                    candidates.add(id(item))
+    # 只有在期限內完成且抓取成功的來源才算抓過；略過、失敗、逾時的來源維持到期
+    SOURCE_SCHEDULER.mark_polled([name for name in due_sources if name in completed], observed_since=cycle_start)
+    translated = 0
+
+    # 3. 各專題合併、補充並寫入
+    google_query_cache = {}
+    topic_index = 0
+    for tid, cfg in topics_to_update.items():
+        topic_index += 1
+        LOADING_STATUS['current'] = topic_index
+        LOADING_STATUS['current_topic'] = cfg['name']
+
+        if tid not in routes:
+            continue
+
+        intl_keywords, negative_keywords = routes[tid]
+        keywords_en, keywords_ja, keywords_ko = intl_keywords_by_topic[tid]
+        buffer = buffers[tid]
+        new_intl_items = new_by_topic[tid]
 
         # Google News 國際版補充
-        if len(all_intl_items) < 5:
+        if google_topup and len(buffer) < 5:
             for region_name, region_info in GOOGLE_NEWS_INTL_REGIONS.items():
-                if len(all_intl_items) >= 5:
+                if len(buffer) >= 5:
                     break
                 
                 # 選擇對應語言的關鍵字
@@ -2045,37 +3036,34 @@ def update_international_news():
                 if not search_keywords:
                     continue
 
-                google_intl = fetch_google_news_intl(search_keywords, region_info['code'], region_info['lang'], max_items=20)
-                existing_hashes_all = {hashlib.md5(item.get('title_original', item['title']).encode()).hexdigest()
-                                     for item in all_intl_items}
+                # 多個使用者的專題關鍵字相同時，同一輪只查詢一次
+                query_key = (region_info['code'], tuple(plan_google_queries([search_keywords])))
+                if query_key not in google_query_cache:
+                    google_query_cache[query_key] = fetch_google_news_intl(search_keywords, region_info['code'], region_info['lang'], max_items=20)
+                google_intl = [dict(item) for item in google_query_cache[query_key]]  # 後續會就地翻譯，各專題各自一份
                 for item in google_intl:
-                    if len(all_intl_items) >= 5:
+                    if len(buffer) >= 5:
                         break
-                    content = f"{item['title']} {item['summary']}"
-                    if keyword_match(content, intl_keywords, negative_keywords):
-                        h = hashlib.md5(item['title'].encode()).hexdigest()
-                        if h not in existing_hashes_all:
-                            existing_hashes_all.add(h)
-                            original_title = item['title']
-                            translated_title = translate_with_gemini(original_title)
-                            item['title_original'] = original_title
-                            item['title'] = translated_title
-                            all_intl_items.append(item)
-                            time.sleep(0.5)
-
-            all_intl_items.sort(key=lambda x: x['published'], reverse=True)
-
-            # 保持最新的 10 則
-            if AUTH_ENABLED and 'user_id' in cfg:
-                owner_id = cfg['user_id']
-                if owner_id in DATA_STORE and 'international' in DATA_STORE[owner_id]:
-                    DATA_STORE[owner_id]['international'][tid] = all_intl_items[:10]
-            else:
-                DATA_STORE['international'][tid] = all_intl_items[:10]
+                    if item_matches(item, intl_keywords, negative_keywords) and buffer.add(item):
+                        candidates.add(id(item))
+
+        # 只翻譯最後留下的 10 則
+        translated += translate_for_display(buffer.items())
+
+        # 保持最新的 10 則（非 Google 補充的輪次也要寫回新抓到的國際新聞）
+        if AUTH_ENABLED and 'user_id' in cfg:
+            owner_id = cfg['user_id']
+            if owner_id in DATA_STORE and 'international' in DATA_STORE[owner_id]:
+                DATA_STORE[owner_id]['international'][tid] = publish_topic_buffer(buffer)
+                mark_topic_fresh(DATA_STORE[owner_id], tid, 'international')
+                publish_user_topic(owner_id, tid)
+        else:
+            DATA_STORE['international'][tid] = publish_topic_buffer(buffer)
 
         if new_intl_items:
             print(f"[UPDATE:INTL] {cfg['name']}: 新增 {len(new_intl_items)} 則國際報導")
 
+    record_translation_cycle('international', candidates, translated)
     DATA_STORE['last_update'] = datetime.now(TAIPEI_TZ).isoformat()
     LOADING_STATUS['is_loading'] = False
     save_data_cache()
@@ -2086,7 +3074,8 @@ def update_all_summaries():
 
     # 在認證模式下，只更新有快取的使用者專題（按需載入策略）
     if AUTH_ENABLED:
-        # 從快取中取得已載入的使用者 ID
+        # 從快取中取得已載入的使用者 ID（含其他 worker 載入的使用者）
+        sync_all_users_from_store()
         cached_user_ids = [uid for uid in DATA_STORE.keys() if uid not in ['topics', 'international', 'summaries', 'last_update', 'topic_owners']]
 
         if not cached_user_ids:
@@ -2156,6 +3145,7 @@ def update_all_summaries():
                 if 'summaries' not in DATA_STORE[user_id]:
                     DATA_STORE[user_id]['summaries'] = {}
                 DATA_STORE[user_id]['summaries'][tid] = summary_data
+                publish_user_topic(user_id, tid)
         
         time.sleep(1)
 
@@ -2209,13 +3199,13 @@ def get_all():
         # 讀取前端傳來的 check_freshness 參數 (字串 'true' 轉布林值)
         check_freshness = request.args.get('check_freshness', 'false').lower() == 'true'
 
+        # 從 Supabase 讀取該使用者的專題（新鮮度檢查與回應共用這一次讀取）
+        user_topics = auth.get_user_topics(user_id)
+
         # 按需載入：總是呼叫 load_user_data
         # check_freshness=True: 登入時檢查 (5分鐘門檻)
         # check_freshness=False: 定期輪詢 (60分鐘門檻)
-        load_user_data(user_id, check_freshness)
-
-        # 從 Supabase 讀取該使用者的專題
-        user_topics = auth.get_user_topics(user_id)
+        load_user_data(user_id, check_freshness, user_topics)
 
         # 取得該使用者的資料
         user_data = DATA_STORE.get(user_id, {'topics': {}, 'international': {}, 'summaries': {}, 'last_update': ''})
@@ -2414,6 +3404,7 @@ def loading_status():
             user = auth.get_user_from_token(token)
             if user:
                 user_id = user.id
+                sync_user_from_store(user_id)
                 user_topics = auth.get_user_topics(user_id)
                 user_topic_count = len(user_topics)
 
@@ -2822,6 +3813,20 @@ def delete_topic(tid):
             del DATA_STORE['topics'][tid]
         if tid in DATA_STORE['summaries']:
             del DATA_STORE['summaries'][tid]
+        if user.id in DATA_STORE:
+            DATA_STORE[user.id].get('topic_updated', {}).pop(tid, None)
+        try:
+            STORE.delete_topic(user.id, tid)
+        except Exception as e:
+            print(f"[STORE] 刪除專題資料失敗 ({tid}): {e}")
+        if SEARCH_INDEX:
+            try:
+                SEARCH_INDEX.delete_topic(user.id, tid)
+            except Exception as e:
+                print(f"[SEARCH] 刪除專題索引失敗 ({tid}): {e}")
+        with _archive_counters_lock:
+            ARCHIVE_COUNTERS.pop((user.id, tid), None)
+        drop_topic_buffers(tid)
         
         return jsonify({'status': 'ok'})
     
@@ -2830,6 +3835,7 @@ def delete_topic(tid):
         if tid in TOPICS:
             del TOPICS[tid]
             save_topics_config()
+        drop_topic_buffers(tid)
         return jsonify({'status': 'ok'})
 
 @app.route('/api/admin/topics/reorder', methods=['PUT'])
@@ -3116,26 +4122,175 @@ def update_user_role(user_id):
 # ============ Main ============
 
 def init_scheduler():
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     scheduler = BackgroundScheduler(timezone='Asia/Taipei')
-    # 新聞更新排程（國內每小時，國際每2小時）
-    scheduler.add_job(update_domestic_news, 'cron', minute='0')
-    scheduler.add_job(update_international_news, 'cron', hour='*/2', minute='30')
+    # 新聞更新排程：國內每 15 分鐘、國際每 30 分鐘檢查，各來源依自己的間隔到期才抓取
+    scheduler.add_job(update_domestic_news, 'cron', minute='*/15')
+    scheduler.add_job(update_international_news, 'cron', minute='5,35')
 
     # 摘要生成排程（每天 08:00, 12:00, 18:00）
     scheduler.add_job(update_all_summaries, 'cron', hour=8, minute=0)
     scheduler.add_job(update_all_summaries, 'cron', hour=12, minute=0)
     scheduler.add_job(update_all_summaries, 'cron', hour=18, minute=0)
     scheduler.start()
-    print("[SCHEDULER] 排程已啟動 - 國內:每小時0分, 國際:每2小時30分, 摘要:08:00/12:00/18:00")
+    print("[SCHEDULER] 排程已啟動 - 國內:每15分鐘檢查, 國際:每30分鐘檢查（來源間隔自適應）, 摘要:08:00/12:00/18:00")
+
+# ============ 排程領導權（多 worker 時只有一個程序執行排程）============
+
+# 同一台機器上的所有 worker 共用這個鎖檔；取得 flock 的程序即為排程 leader
+# 注意：不可搭配 gunicorn --preload，否則鎖會在 master 取得後被所有 worker 繼承
+SCHEDULER_LOCK_FILE = os.getenv('SCHEDULER_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'topicradar-scheduler.lock'))
+SCHEDULER_LEADER_RETRY_SECONDS = 30
+
+SCHEDULER_STATE = {
+    'is_leader': False,
+    'pid': os.getpid(),
+    'leader_since': None
+}
+
+_scheduler_lock_fd = None
+
+def _try_acquire_scheduler_leadership():
+    """嘗試以非阻塞方式取得排程鎖，成功後持有至程序結束（程序結束時由作業系統釋放）"""
+    global _scheduler_lock_fd
+    try:
+        import fcntl
+    except ImportError:
+        # 不支援 fcntl 的平台（Windows 開發環境）只會以單一程序執行
+        return True
+
+    fd = os.open(SCHEDULER_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+
+    # 寫入 leader PID 方便除錯
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode())
+    _scheduler_lock_fd = fd
+    return True
+
+def _init_background_services():
+    """
+    不影響冷啟動的初始化：預先建立 supabase 客戶端（套件損壞或設定錯誤時在這裡就會發現並停用認證）、
+    開啟分析佇列並接續重啟前未完成的工作、搜尋索引為空時從歸檔重建
+    """
+    if not AUTH_ENABLED:
+        return
+    try:
+        supabase._load()
+    except Exception:
+        return  # 已改用非認證模式（見 _create_supabase_client）
+    try:
+        ANALYSIS_QUEUE.start()
+    except Exception as e:
+        print(f"[ANALYSIS-QUEUE] 佇列啟動失敗: {e}")
+    try:
+        backfill_search_index()
+    except Exception as e:
+        print(f"[SEARCH] 重建索引失敗: {e}")
+
+def _init_scheduler_background():
+    """在背景執行緒完成其餘初始化、競選排程領導權，取得後才匯入 APScheduler 並啟動排程"""
+    with _startup_phase('init_services'):
+        _init_background_services()
+    try:
+        announced = False
+        while not _try_acquire_scheduler_leadership():
+            if not announced:
+                print(f"[SCHEDULER] 其他 worker 已持有排程領導權，本程序 (pid={os.getpid()}) 只處理請求")
+                announced = True
+            # leader 結束後鎖會釋放，由仍在運作的 worker 接手
+            time.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+            if not AUTH_ENABLED:
+                # 認證模式下資料經由 Supabase/STORE 版本同步；非認證模式只能靠 leader 寫出的快取檔案
+                try:
+                    reload_data_cache_if_changed()
+                except Exception as e:
+                    print(f"[CACHE] 重新載入快取失敗: {e}")
+
+        SCHEDULER_STATE['is_leader'] = True
+        SCHEDULER_STATE['leader_since'] = datetime.now(TAIPEI_TZ).isoformat()
+        print(f"[SCHEDULER] 本程序 (pid={os.getpid()}) 取得排程領導權")
+
+        with _startup_phase('init_scheduler'):
+            init_scheduler()
+    except Exception as e:
+        print(f"[SCHEDULER] 排程啟動失敗: {e}")
+
+@app.route('/api/admin/startup-timings', methods=['GET'])
+def get_startup_timings():
+    """取得冷啟動各階段耗時（追蹤啟動效能退化）"""
+    if AUTH_ENABLED:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return jsonify({'error': '未登入'}), 401
+
+        user = auth.get_user_from_token(token)
+        if not user or not auth.is_admin(user.id):
+            return jsonify({'error': '需要管理員權限'}), 403
+
+    return jsonify({'timings': STARTUP_TIMINGS, 'scheduler': SCHEDULER_STATE})
+
+@app.route('/api/admin/sources', methods=['GET'])
+def get_source_schedule():
+    """各 RSS 來源目前的抓取間隔與新新聞速率"""
+    if AUTH_ENABLED:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return jsonify({'error': '未登入'}), 401
+
+        user = auth.get_user_from_token(token)
+        if not user or not auth.is_admin(user.id):
+            return jsonify({'error': '需要管理員權限'}), 403
 
-import urllib3
-urllib3.disable_warnings()
+    sources = SOURCE_SCHEDULER.snapshot()
+    for state in sources.values():
+        for key in ('last_polled', 'next_due'):
+            if state[key]:
+                state[key] = datetime.fromtimestamp(state[key], TAIPEI_TZ).isoformat()
 
-# ============ 模組載入時初始化（Gunicorn 需要）============
-load_topics_config()
-load_data_cache()  # 先從快取載入資料（快速啟動）
-init_scheduler()
+    # 排程只在 leader 程序執行，其他 worker 的數據只反映使用者觸發的抓取
+    return jsonify({'sources': sources, 'is_leader': SCHEDULER_STATE['is_leader']})
+
+@app.route('/api/admin/source-health', methods=['GET'])
+def get_source_health():
+    """各 RSS 來源的延遲、錯誤率、最後成功時間與斷路器狀態（另附解析器統計）"""
+    if AUTH_ENABLED:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return jsonify({'error': '未登入'}), 401
+
+        user = auth.get_user_from_token(token)
+        if not user or not auth.is_admin(user.id):
+            return jsonify({'error': '需要管理員權限'}), 403
+
+    sources = SOURCE_HEALTH.snapshot()
+    for state in sources.values():
+        for key in ('last_success', 'last_error_at', 'open_until'):
+            if state[key]:
+                state[key] = datetime.fromtimestamp(state[key], TAIPEI_TZ).isoformat()
+
+    return jsonify({'sources': sources, 'parser': FEED_PARSER_STATS, 'is_leader': SCHEDULER_STATE['is_leader']})
+
+@app.route('/api/admin/translation-stats', methods=['GET'])
+def get_translation_stats():
+    """國際新聞翻譯統計：實際翻譯與省下的呼叫數、各流程最近一輪、重試佇列狀態"""
+    if AUTH_ENABLED:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return jsonify({'error': '未登入'}), 401
+
+        user = auth.get_user_from_token(token)
+        if not user or not auth.is_admin(user.id):
+            return jsonify({'error': '需要管理員權限'}), 403
 
+    return jsonify({'translation': TRANSLATION_STATS,
+                    'retry': TRANSLATION_RETRY.stats() if TRANSLATION_RETRY else None,
+                    'is_leader': SCHEDULER_STATE['is_leader']})
 
 
 @app.route('/api/topics/<topic_id>/discover-angles', methods=['POST'])
@@ -3153,38 +4308,54 @@ def discover_topic_angles(topic_id):
         return jsonify({'error': '認證失敗'}), 401
     
     try:
-        # 檢查資料量
+        # 檢查資料量（與取得新聞共用同一次讀取）
         thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
+        window = read_archive_window(user.id, topic_id)
         
-        count_result = supabase.table('topic_archive')\
-            .select('id', count='exact')\
-            .eq('topic_id', topic_id)\
-            .eq('user_id', user.id)\
-            .gte('published_at', thirty_days_ago)\
-            .execute()
-        
-        if count_result.count < 30:
+        if not archive_window_has_at_least(window, ARCHIVE_READY_THRESHOLD):
             return jsonify({
                 'status': 'insufficient',
-                'count': count_result.count,
-                'required': 30,
-                'message': f'資料不足，還需要 {30 - count_result.count} 則新聞'
+                'count': window['count'],
+                'required': ARCHIVE_READY_THRESHOLD,
+                'message': f'資料不足，還需要 {ARCHIVE_READY_THRESHOLD - window["count"]} 則新聞'
             })
         
-        # 取得新聞資料
-        news_result = supabase.table('topic_archive')\
-            .select('title, summary, published_at, source')\
-            .eq('topic_id', topic_id)\
-            .eq('user_id', user.id)\
-            .gte('published_at', thirty_days_ago)\
-            .order('published_at', desc=True)\
-            .limit(100)\
-            .execute()
+        # 取得新聞資料（經相關性挑選）與背景摘要
+        news_data, summary_context = _load_analysis_inputs(topic_id, user.id)
         
+        # 相同輸入已分析過時直接回傳結果
+        fingerprint = analysis_fingerprint(news_data, summary_context)
+        cached = find_cached_analysis(user.id, topic_id, fingerprint)
+        if cached:
+            angles_data = dict(cached['angles_data'])
+            angles_data['status'] = 'success'
+            angles_data['analyzed_count'] = len(news_data)
+            angles_data['cache_hit'] = True
+            return jsonify(angles_data)
+
         # AI 分析
-        angles_data = analyze_topic_angles(topic_id, news_result.data)
+        angles_data = analyze_topic_angles(topic_id, news_data, summary_context)
+
+        # 保存結果供下次相同輸入使用
+        if angles_data.get('angles'):
+            insert_result = supabase.table('topic_angles')\
+                .insert({
+                    'user_id': user.id,
+                    'topic_id': topic_id,
+                    'status': 'completed',
+                    'angles_data': angles_data,
+                    'analyzed_news_count': len(news_data),
+                    'data_range_start': thirty_days_ago,
+                    'data_range_end': datetime.now().isoformat()
+                })\
+                .execute()
+            if insert_result.data:
+                save_analysis_fingerprint(insert_result.data[0]['id'], fingerprint, angles_data)
+            set_archive_analysis_status(user.id, topic_id, 'completed')
+
         angles_data['status'] = 'success'
-        angles_data['analyzed_count'] = len(news_result.data)
+        angles_data['analyzed_count'] = len(news_data)
+        angles_data['cache_hit'] = False
         
         return jsonify(angles_data)
         
@@ -3193,6 +4364,60 @@ def discover_topic_angles(topic_id):
         return jsonify({'error': f'分析失敗: {str(e)}'}), 500
 
 
+# ============ 歸檔全文搜尋 API ============
+
+def _parse_search_date(value, end_of_day=False):
+    """YYYY-MM-DD（台北時間）→ epoch 秒；end_of_day 時回傳隔天 0 點（不含）"""
+    if not value:
+        return None
+    day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=TAIPEI_TZ)
+    if end_of_day:
+        day += timedelta(days=1)
+    return day.timestamp()
+
+@app.route('/api/search', methods=['GET'])
+def search_archive():
+    """搜尋自己的歸檔新聞：q, topic_id, source, from, to (YYYY-MM-DD), limit"""
+    if not AUTH_ENABLED:
+        return jsonify({'error': '認證系統未啟用'}), 503
+    if not SEARCH_INDEX:
+        return jsonify({'error': '全文搜尋未啟用'}), 503
+
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    if not token:
+        return jsonify({'error': '未登入'}), 401
+
+    user = auth.get_user_from_token(token)
+    if not user:
+        return jsonify({'error': '認證失敗'}), 401
+
+    try:
+        date_from = _parse_search_date(request.args.get('from'))
+        date_to = _parse_search_date(request.args.get('to'), end_of_day=True)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except ValueError:
+        return jsonify({'error': '參數格式錯誤（日期請用 YYYY-MM-DD）'}), 400
+
+    try:
+        results, took_ms = SEARCH_INDEX.search(
+            user.id,
+            request.args.get('q', ''),
+            topic_id=request.args.get('topic_id') or None,
+            source=request.args.get('source') or None,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit
+        )
+    except Exception as e:
+        print(f"[SEARCH] 搜尋失敗: {e}")
+        return jsonify({'error': f'搜尋失敗: {str(e)}'}), 500
+
+    for item in results:
+        ts = item.pop('published_ts')
+        item['published_at'] = datetime.fromtimestamp(ts, TAIPEI_TZ).isoformat() if ts else None
+
+    return jsonify({'results': results, 'count': len(results), 'took_ms': took_ms})
+
 # ============ 角度發現功能 API (Turbo 深度分析) ============
 
 
@@ -3211,39 +4436,14 @@ def get_archive_count(topic_id):
         return jsonify({'error': '認證失敗'}), 401
     
     try:
-        # 查詢過去 30 天累積數量
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-        
-        count_result = supabase.table('topic_archive')\
-            .select('id', count='exact')\
-            .eq('topic_id', topic_id)\
-            .eq('user_id', user.id)\
-            .gte('published_at', thirty_days_ago)\
-            .execute()
-        
-        actual_count = count_result.count
-        
-        # 檢查是否有已完成的分析報告
-        analysis_result = supabase.table('topic_angles')\
-            .select('id, status')\
-            .eq('topic_id', topic_id)\
-            .eq('user_id', user.id)\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
-            
-        has_report = False
-        analysis_status = None
-        if analysis_result.data:
-            has_report = analysis_result.data[0]['status'] == 'completed'
-            analysis_status = analysis_result.data[0]['status']
-        
+        # 由記憶體計數回答，不必每次輪詢都查資料庫
+        actual_count, analysis_status = get_archive_stats(user.id, topic_id)
 
         return jsonify({
             'count': actual_count,
-            'ready': actual_count >= 30,
-            'threshold': 30,
-            'has_report': has_report,
+            'ready': actual_count >= ARCHIVE_READY_THRESHOLD,
+            'threshold': ARCHIVE_READY_THRESHOLD,
+            'has_report': analysis_status == 'completed',
             'analysis_status': analysis_status
         })
     except Exception as e:
@@ -3255,42 +4455,53 @@ def get_archive_count(topic_id):
             'error': str(e)
         }), 500
 
+def _load_analysis_inputs(topic_id, user_id):
+    """讀取角度分析的輸入：近 30 天歸檔新聞（經相關性挑選）+ 該專題最新摘要"""
+    window = read_archive_window(user_id, topic_id)
+
+    # 依專題關鍵字挑選最有訊號的新聞，而非單純取最新 100 則
+    keywords, negative_keywords = [], []
+    for topic in auth.get_user_topics(user_id):
+        if topic.get('id') == topic_id:
+            for kw_list in normalize_keywords(topic.get('keywords')).values():
+                keywords.extend(kw_list)
+            negative_keywords = topic.get('negative_keywords') or []
+            break
+    news_data = select_analysis_items(window['rows'][:ANALYSIS_CANDIDATE_LIMIT], keywords, negative_keywords)
+
+    # 獲取該專題的最新摘要作為背景 (來自 DATA_STORE)
+    summary_context = None
+    if user_id in DATA_STORE and 'summaries' in DATA_STORE[user_id]:
+        summary_data = DATA_STORE[user_id]['summaries'].get(topic_id)
+        if summary_data:
+            summary_context = summary_data.get('text', '')
+
+    return news_data, summary_context
+
 def _run_angle_analysis_task(topic_id, user_id, analysis_id):
-    """背景執行：執行角度分析並更新資料庫"""
+    """
+    背景執行：執行角度分析並更新資料庫
+    失敗時拋出例外，由分析佇列重試；超過重試上限後 _give_up_analysis_job 將記錄標記為失敗
+    """
     print(f"[ANALYSIS] 開始執行分析任務: task={analysis_id}, topic={topic_id}")
     
     try:
-        # 1. 獲取歸檔新聞
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-        
-        news_response = supabase.table('topic_archive')\
-            .select('title, summary, source, published_at')\
-            .eq('topic_id', topic_id)\
-            .eq('user_id', user_id)\
-            .gte('published_at', thirty_days_ago)\
-            .order('published_at', desc=True)\
-            .limit(100)\
-            .execute()
-            
-        news_data = news_response.data
-        
-
+        # 1. 獲取歸檔新聞與背景摘要
+        news_data, summary_context = _load_analysis_inputs(topic_id, user_id)
 
         if not news_data:
             raise Exception("無足夠新聞資料可供分析")
 
-            
-        # 1.5 獲取該專題的最新摘要作為背景 (來自 DATA_STORE)
-        summary_context = None
-        if user_id in DATA_STORE and 'summaries' in DATA_STORE[user_id]:
-            summary_data = DATA_STORE[user_id]['summaries'].get(topic_id)
-            if summary_data:
-                summary_context = summary_data.get('text', '')
-                print(f"[ANALYSIS] 已為專題 {topic_id} 找到背景摘要，長度: {len(summary_context)}")
-
-        # 2. 執行 AI 分析
-        # 注意：這裡直接呼叫 app.py 中已有的 analyze_topic_angles 函數邏輯
-        result = analyze_topic_angles(topic_id, news_data, summary_context) # 這裡重用現有邏輯
+        if summary_context:
+            print(f"[ANALYSIS] 已為專題 {topic_id} 找到背景摘要，長度: {len(summary_context)}")
+
+        # 2. 輸入未變時沿用先前結果，否則執行 AI 分析
+        fingerprint = analysis_fingerprint(news_data, summary_context)
+        cached = find_cached_analysis(user_id, topic_id, fingerprint)
+        if cached:
+            result = cached['angles_data']
+        else:
+            result = analyze_topic_angles(topic_id, news_data, summary_context, raise_errors=True)
         
         # 3. 更新資料庫
         supabase.table('topic_angles')\
@@ -3302,22 +4513,53 @@ def _run_angle_analysis_task(topic_id, user_id, analysis_id):
             })\
             .eq('id', analysis_id)\
             .execute()
+
+        if not cached:
+            save_analysis_fingerprint(analysis_id, fingerprint, result)
+        set_archive_analysis_status(user_id, topic_id, 'completed')
             
         print(f"[ANALYSIS] 分析任務完成: {analysis_id}")
         
     except Exception as e:
         print(f"[ANALYSIS] 分析任務失敗: {e}")
-        try:
-            supabase.table('topic_angles')\
-                .update({
-                    'status': 'failed',
-                    'error_message': str(e),
-                    'updated_at': datetime.now().isoformat()
-                })\
-                .eq('id', analysis_id)\
-                .execute()
-        except:
-            pass
+        raise
+
+# ============ 角度分析工作佇列 ============
+
+ANALYSIS_QUEUE_PATH = os.getenv('ANALYSIS_QUEUE_PATH', 'analysis_queue.db')
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+
+def _handle_analysis_job(job):
+    """佇列 worker：執行單一角度分析工作"""
+    _run_angle_analysis_task(job['topic_id'], job['user_id'], job['analysis_id'])
+
+def _give_up_analysis_job(job, error):
+    """工作超過重試上限時，將分析記錄標記為失敗"""
+    set_archive_analysis_status(job['user_id'], job['topic_id'], 'failed')
+    supabase.table('topic_angles')\
+        .update({
+            'status': 'failed',
+            'error_message': f'分析失敗，請重新嘗試（{error}）',
+            'updated_at': datetime.now().isoformat()
+        })\
+        .eq('id', job['analysis_id'])\
+        .execute()
+
+def _create_analysis_queue():
+    queue_ = analysis_queue.AnalysisQueue(
+        ANALYSIS_QUEUE_PATH,
+        _handle_analysis_job,
+        workers=ANALYSIS_WORKERS,
+        on_give_up=_give_up_analysis_job
+    )
+    queue_.start()
+    return queue_
+
+# 固定大小的 worker 池取代每個請求一條執行緒；工作存於 SQLite，重啟後自動接續
+# 首次使用或背景初始化（_init_background_services）時才開啟 SQLite 並啟動 worker
+ANALYSIS_QUEUE = None
+if AUTH_ENABLED:
+    ANALYSIS_QUEUE = _LazyProxy('analysis_queue', _create_analysis_queue)
 
 @app.route('/api/topics/<topic_id>/analyze', methods=['POST'])
 def trigger_analysis(topic_id):
@@ -3331,6 +4573,41 @@ def trigger_analysis(topic_id):
         return jsonify({'error': '認證失敗'}), 401
         
     try:
+        # 同一專題已有排隊或執行中的分析時，直接回傳該任務（連點 Turbo 不會產生多筆工作）
+        active_job = ANALYSIS_QUEUE.find_active(user.id, topic_id)
+        if active_job:
+            return jsonify({
+                'status': 'processing',
+                'analysis_id': active_job['analysis_id'],
+                'message': '分析任務已在佇列中'
+            }), 202
+
+        # 輸入新聞與摘要都沒變時，直接沿用上次的分析結果，不呼叫 Claude
+        news_data, summary_context = _load_analysis_inputs(topic_id, user.id)
+        if news_data:
+            fingerprint = analysis_fingerprint(news_data, summary_context)
+            cached = find_cached_analysis(user.id, topic_id, fingerprint)
+            if cached:
+                insert_result = supabase.table('topic_angles')\
+                    .insert({
+                        'user_id': user.id,
+                        'topic_id': topic_id,
+                        'status': 'completed',
+                        'angles_data': cached['angles_data'],
+                        'analyzed_news_count': len(news_data),
+                        'input_fingerprint': fingerprint,
+                        'data_range_start': (datetime.now() - timedelta(days=30)).isoformat(),
+                        'data_range_end': datetime.now().isoformat()
+                    })\
+                    .execute()
+                set_archive_analysis_status(user.id, topic_id, 'completed')
+                return jsonify({
+                    'status': 'completed',
+                    'analysis_id': insert_result.data[0]['id'] if insert_result.data else cached['id'],
+                    'cache_hit': True,
+                    'data': cached['angles_data']
+                })
+
         # 建立一筆 processing 狀態的記錄
         insert_result = supabase.table('topic_angles')\
             .insert({
@@ -3346,19 +4623,20 @@ def trigger_analysis(topic_id):
             return jsonify({'error': '無法建立分析任務'}), 500
             
         analysis_id = insert_result.data[0]['id']
+        set_archive_analysis_status(user.id, topic_id, 'processing')
         
-        # 啟動背景執行緒
-        thread = threading.Thread(
-            target=_run_angle_analysis_task,
-            args=(topic_id, user.id, analysis_id)
-        )
-        thread.daemon = True
-        thread.start()
+        # 加入持久化佇列，由固定大小的 worker 池執行
+        job, created = ANALYSIS_QUEUE.enqueue(user.id, topic_id, analysis_id)
+        if not created and job:
+            # 併發請求已搶先建立工作，移除本次多建立的記錄
+            supabase.table('topic_angles').delete().eq('id', analysis_id).execute()
+            analysis_id = job['analysis_id']
         
         return jsonify({
             'status': 'processing', 
             'analysis_id': analysis_id,
-            'message': '分析任務已啟動'
+            'message': '分析任務已啟動' if created else '分析任務已在佇列中',
+            'queue_depth': ANALYSIS_QUEUE.stats()['pending']
         }), 202
         
     except Exception as e:
@@ -3392,8 +4670,9 @@ def get_analysis_status(topic_id):
         record = result.data[0]
         status = record['status']
         
-        # 處理卡住的 processing 狀態：如果超過 5 分鐘，視為失敗
-        if status == 'processing':
+        # 處理卡住的 processing 狀態：佇列中已沒有對應工作且超過 5 分鐘，視為失敗
+        active_job = ANALYSIS_QUEUE.find_active(user.id, topic_id)
+        if status == 'processing' and not (active_job and active_job['analysis_id'] == record['id']):
             try:
                 created_at_str = record.get('created_at', '')
                 if created_at_str:
@@ -3419,6 +4698,7 @@ def get_analysis_status(topic_id):
                             .eq('id', record['id'])\
                             .execute()
                         status = 'failed'
+                        set_archive_analysis_status(user.id, topic_id, 'failed')
             except Exception as time_e:
                 print(f"[ANALYSIS] 時間檢查失敗: {time_e}")
         
@@ -3432,6 +4712,51 @@ def get_analysis_status(topic_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/analysis-queue', methods=['GET'])
+def get_analysis_queue_stats():
+    """角度分析佇列深度與處理統計（管理員）"""
+    if not AUTH_ENABLED:
+        return jsonify({'error': '認證系統未啟用'}), 503
+
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    if not token:
+        return jsonify({'error': '未登入'}), 401
+
+    user = auth.get_user_from_token(token)
+    if not user or not auth.is_admin(user.id):
+        return jsonify({'error': '需要管理員權限'}), 403
+
+    with _analysis_cache_lock:
+        cache_stats = dict(ANALYSIS_CACHE_STATS)
+
+    return jsonify({'queue': ANALYSIS_QUEUE.stats(), 'cache': cache_stats})
+
+@app.route('/api/admin/load-queue', methods=['GET'])
+def get_load_queue_stats():
+    """使用者資料載入佇列的深度、等待時間與執行中數量（管理員）"""
+    if AUTH_ENABLED:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return jsonify({'error': '未登入'}), 401
+
+        user = auth.get_user_from_token(token)
+        if not user or not auth.is_admin(user.id):
+            return jsonify({'error': '需要管理員權限'}), 403
+
+    return jsonify({'queue': USER_LOAD_QUEUE.stats()})
+
+# ============ 模組載入時初始化（Gunicorn 需要；放在最後，背景執行緒啟動時所有全域物件都已定義）============
+with _startup_phase('load_topics_config'):
+    load_topics_config()
+with _startup_phase('load_data_cache'):
+    load_data_cache()  # 先從快取載入資料（快速啟動）
+    queue_translation_retries(DATA_STORE['international'].values())  # 上次執行時翻譯失敗的標題
+threading.Thread(target=_init_scheduler_background, daemon=True, name='scheduler-init').start()
+
+STARTUP_TIMINGS['ready'] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+print(f"[STARTUP] 冷啟動完成 {STARTUP_TIMINGS['ready']} ms - " +
+      ", ".join(f"{k}={v}ms" for k, v in STARTUP_TIMINGS.items() if k != 'ready'))
+
 # ============ Main Entry Point ============
 
 if __name__ == '__main__':
@@ -2,22 +2,30 @@
 # TopicRadar 使用者認證模組
 
 import os
+import threading
 from functools import wraps
+from typing import TYPE_CHECKING
 from flask import request, jsonify, g
-from supabase import create_client, Client
 
-# Supabase 客戶端（延遲初始化）
-_supabase_client: Client = None
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase() -> Client:
+# Supabase 客戶端（延遲初始化，supabase 套件也在首次使用時才匯入）
+_supabase_client: 'Client' = None
+_supabase_lock = threading.Lock()
+
+def get_supabase() -> 'Client':
     """取得 Supabase 客戶端（單例模式）"""
     global _supabase_client
     if _supabase_client is None:
-        url = os.getenv('SUPABASE_URL')
-        key = os.getenv('SUPABASE_KEY')
-        if not url or not key:
-            raise ValueError("SUPABASE_URL 和 SUPABASE_KEY 環境變數未設定")
-        _supabase_client = create_client(url, key)
+        with _supabase_lock:
+            if _supabase_client is None:
+                url = os.getenv('SUPABASE_URL')
+                key = os.getenv('SUPABASE_KEY')
+                if not url or not key:
+                    raise ValueError("SUPABASE_URL 和 SUPABASE_KEY 環境變數未設定")
+                from supabase import create_client
+                _supabase_client = create_client(url, key)
     return _supabase_client
 
 def get_user_from_token(token: str):
@@ -462,7 +470,8 @@ def save_topic_cache_item(user_id: str, topic_id: str, domestic_news: list, intl
         def serialize_news(news_list):
             serialized = []
             for item in news_list:
-                new_item = item.copy()
+                # 以底線開頭的欄位是記憶體內的比對/排序暫存，不寫入資料庫
+                new_item = {k: v for k, v in item.items() if not k.startswith('_')}
                 if 'published' in new_item and isinstance(new_item['published'], datetime):
                     new_item['published'] = new_item['published'].isoformat()
                 serialized.append(new_item)
@@ -0,0 +1,173 @@
+# feed_parser.py - 精簡的串流 RSS/RDF/Atom 解析器
+# 只取我們用到的欄位（標題、連結、id、摘要、時間、Google News 來源），抓滿 max_items 就停止
+# 遇到非預期的格式（解析錯誤、不支援的編碼或日期格式）拋出 UnsupportedFeed，由呼叫端改用 feedparser
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_RSS1 = '{http://purl.org/rss/1.0/}'
+_RDF = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedFeed(ValueError):
+    """不是精簡解析器能處理的格式，應改用 feedparser"""
+
+
+def _text(elem):
+    return (elem.text or '').strip() if elem is not None else ''
+
+
+def _parse_rfc822(value):
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError) as e:
+        raise UnsupportedFeed(f'無法解析日期: {value}') from e
+    if dt is None:
+        raise UnsupportedFeed(f'無法解析日期: {value}')
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).timetuple()
+
+
+def _parse_iso8601(value):
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise UnsupportedFeed(f'無法解析日期: {value}') from e
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).timetuple()
+
+
+def _entry(title, link, entry_id, summary, published, updated, source=None):
+    """與 feedparser 相同的欄位名稱；published_parsed / updated_parsed 為 UTC 的 struct_time"""
+    return {
+        'title': title,
+        'link': link,
+        'id': entry_id,
+        'summary': summary,
+        'published_parsed': published,
+        'updated_parsed': updated,
+        'source': source
+    }
+
+
+def _rss2_item(elem):
+    title = link = guid = summary = ''
+    published = updated = None
+    source = None
+    for child in elem:
+        tag = child.tag
+        if tag == 'title':
+            title = _text(child)
+        elif tag == 'link':
+            link = _text(child)
+        elif tag == 'guid':
+            guid = _text(child)
+        elif tag == 'description':
+            summary = (child.text or '').strip()
+        elif tag == 'pubDate' and _text(child):
+            # 與 feedparser 一致：pubDate 同時作為 published 與 updated，dc:date 只作為 updated
+            published = updated = _parse_rfc822(_text(child))
+        elif tag == _DC + 'date' and _text(child) and updated is None:
+            updated = _parse_iso8601(_text(child))
+        elif tag == 'source':
+            source = {'title': _text(child), 'href': child.get('url', '')}
+    return _entry(title, link, guid, summary, published, updated, source)
+
+
+def _rdf_item(elem):
+    title = link = summary = ''
+    updated = None
+    for child in elem:
+        tag = child.tag
+        if tag == _RSS1 + 'title':
+            title = _text(child)
+        elif tag == _RSS1 + 'link':
+            link = _text(child)
+        elif tag == _RSS1 + 'description':
+            summary = (child.text or '').strip()
+        elif tag == _DC + 'date' and _text(child):
+            updated = _parse_iso8601(_text(child))
+    return _entry(title, link, elem.get(_RDF + 'about', ''), summary, None, updated)
+
+
+def _atom_entry(elem):
+    title = link = entry_id = summary = content = ''
+    published = updated = None
+    for child in elem:
+        tag = child.tag
+        if tag == _ATOM + 'title':
+            if child.get('type') not in (None, 'text'):
+                raise UnsupportedFeed('Atom 標題不是純文字')
+            title = _text(child)
+        elif tag == _ATOM + 'link':
+            if child.get('rel', 'alternate') == 'alternate' and not link:
+                link = child.get('href', '')
+        elif tag == _ATOM + 'id':
+            entry_id = _text(child)
+        elif tag == _ATOM + 'summary':
+            summary = (child.text or '').strip()
+        elif tag == _ATOM + 'content':
+            content = (child.text or '').strip()
+        elif tag == _ATOM + 'published' and _text(child):
+            published = _parse_iso8601(_text(child))
+        elif tag == _ATOM + 'updated' and _text(child):
+            updated = _parse_iso8601(_text(child))
+    return _entry(title, link, entry_id, summary or content, published, updated)
+
+
+# 根元素 → (項目標籤, 項目解析函數)
+_SHAPES = {
+    'rss': ('item', _rss2_item),
+    _RDF + 'RDF': (_RSS1 + 'item', _rdf_item),
+    _ATOM + 'feed': (_ATOM + 'entry', _atom_entry),
+}
+
+
+def parse(content, max_items=50):
+    """
+    解析 RSS 2.0 / RSS 1.0 (RDF) / Atom，回傳前 max_items 則項目
+    Raises:
+        UnsupportedFeed: 非上述格式、XML 不合法或欄位格式非預期
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    entries = []
+    item_tag = item_parser = None
+    root = None
+
+    try:
+        for offset in range(0, len(content), _CHUNK_SIZE):
+            parser.feed(content[offset:offset + _CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                        if elem.tag not in _SHAPES:
+                            raise UnsupportedFeed(f'不支援的根元素: {elem.tag}')
+                        item_tag, item_parser = _SHAPES[elem.tag]
+                    continue
+
+                if elem.tag == item_tag:
+                    entries.append(item_parser(elem))
+                    elem.clear()
+                    if len(entries) >= max_items:
+                        return entries
+        parser.close()
+    except UnsupportedFeed:
+        raise
+    except (ET.ParseError, ValueError) as e:
+        # ValueError：expat 不支援的編碼（例如 Big5）
+        raise UnsupportedFeed(f'XML 解析失敗: {e}') from e
+
+    if root is None:
+        raise UnsupportedFeed('空白內容')
+    return entries
@@ -0,0 +1,203 @@
+# feed_pipeline.py - RSS 內容解析、正規化與專題分派
+# 只依賴標準函式庫與 feed_parser（feedparser 於需要時才載入），可以在解析程序池的子程序中執行，不會載入 app
+
+import hashlib
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import feed_parser
+
+# URL 黑名單：排除社群媒體貼文
+URL_BLACKLIST = [
+    'facebook.com',
+    'fb.com',
+    'm.facebook.com',
+    'instagram.com',
+    'twitter.com',
+    'x.com',
+    'threads.net',
+]
+
+# 追蹤用的網址參數，正規化網址時移除
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+
+def keyword_match(text, keywords, negative_keywords=None):
+    """
+    關鍵字比對，支援負面關鍵字過濾
+
+    Args:
+        text: 要檢查的文字
+        keywords: 正面關鍵字列表（匹配任一即可）
+        negative_keywords: 負面關鍵字列表（包含任一則排除）
+    """
+    if not text or not keywords:
+        return False
+    return _match_lower(text.lower(), keywords, negative_keywords)
+
+
+def _match_lower(text_lower, keywords, negative_keywords):
+    # 先檢查負面關鍵字，如果包含則直接排除
+    if negative_keywords:
+        for neg_kw in negative_keywords:
+            if neg_kw.lower() in text_lower:
+                return False
+
+    # 再檢查正面關鍵字
+    for kw in keywords:
+        if kw.lower() in text_lower:
+            return True
+
+    return False
+
+
+# ---------- 新聞信封：抓取時算一次，後續比對、去重、排序、寫入都重用 ----------
+# hash 會寫入快取與歸檔；以底線開頭的欄位只存在記憶體，寫入快取/資料庫前以 persisted() 去除
+
+def canonical_url(url):
+    """去除追蹤參數與 #fragment、主機名稱轉小寫，讓同一篇文章的不同連結可以比對"""
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def item_hash(item):
+    """穩定的內容 hash：原文標題的 MD5（國際新聞翻譯後仍以 title_original 計算）"""
+    h = item.get('hash')
+    if not h:
+        h = item['hash'] = hashlib.md5((item.get('title_original') or item['title']).encode()).hexdigest()
+    return h
+
+
+def match_text(item):
+    """關鍵字比對用的小寫「標題 摘要」"""
+    text = item.get('_match')
+    if text is None:
+        text = item['_match'] = f"{item['title']} {item.get('summary', '')}".lower()
+    return text
+
+
+def item_url(item):
+    url = item.get('_url')
+    if url is None:
+        url = item['_url'] = canonical_url(item.get('link', ''))
+    return url
+
+
+def item_ts(item):
+    """發布時間的 epoch 秒（排序用；無法解析時為 0）"""
+    ts = item.get('_ts')
+    if ts is None:
+        published = item.get('published')
+        if isinstance(published, datetime):
+            ts = published.timestamp()
+        elif isinstance(published, str) and published:
+            try:
+                ts = datetime.fromisoformat(published).timestamp()
+            except ValueError:
+                ts = 0.0
+        else:
+            ts = 0.0
+        item['_ts'] = ts
+    return ts
+
+
+def envelope(item):
+    """新聞建立時呼叫，一次算好 hash、比對文字、正規化網址與時間戳"""
+    item_hash(item)
+    match_text(item)
+    item_url(item)
+    item_ts(item)
+    return item
+
+
+def item_matches(item, keywords, negative_keywords=None):
+    """以信封中的比對文字做關鍵字比對（語意同 keyword_match(標題 + 摘要)）"""
+    if not keywords:
+        return False
+    return _match_lower(match_text(item), keywords, negative_keywords)
+
+
+def persisted(item):
+    """寫入快取或資料庫用的副本（去除記憶體內的信封欄位）"""
+    return {k: v for k, v in item.items() if not k.startswith('_')}
+
+
+def parse_entries(content, max_items=50):
+    """
+    解析 RSS/RDF/Atom 內容，回傳 (前 max_items 則項目, 是否改用 feedparser)
+    先用精簡的串流解析器；遇到非預期格式改用 feedparser
+    """
+    try:
+        return feed_parser.parse(content, max_items), False
+    except feed_parser.UnsupportedFeed as e:
+        print(f"[RSS] 改用 feedparser 解析: {e}")
+        import feedparser
+        return feedparser.parse(content).entries[:max_items], True
+
+
+def entry_key(entry):
+    """游標用的項目識別（guid，其次連結、標題）"""
+    return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+
+def normalize_entries(entries, source_name, tz):
+    """RSS 項目 → 新聞 dict（略過空標題與社群媒體連結，時間轉為 tz）"""
+    items = []
+    for entry in entries:
+        # 獲取標題，跳過空標題
+        title = entry.get('title', '').strip()
+        if not title:
+            continue
+
+        # 獲取連結並檢查是否為社群媒體貼文
+        link = entry.get('link', '')
+        if any(domain in link.lower() for domain in URL_BLACKLIST):
+            continue
+
+        if entry.get('published_parsed'):
+            # RSS 時間通常是 UTC，轉換為台北時間
+            published = datetime(*entry['published_parsed'][:6], tzinfo=timezone.utc).astimezone(tz)
+        elif entry.get('updated_parsed'):
+            published = datetime(*entry['updated_parsed'][:6], tzinfo=timezone.utc).astimezone(tz)
+        else:
+            published = datetime.now(tz)
+
+        items.append(envelope({
+            'title': title,
+            'link': link,
+            'source': source_name,
+            'published': published,
+            'summary': entry.get('summary', '')[:200]
+        }))
+    return items
+
+
+def parse_and_route(content, source_name, tz, max_items=50, seen_keys=None, routes=None):
+    """
+    原始 RSS 內容 → 正規化的新聞（解析程序池的工作函數，參數與回傳值都可 pickle）
+
+    Args:
+        seen_keys: 游標中已處理過的項目識別；指定時只回傳不在其中的項目
+        routes: {topic_id: (keywords, negative_keywords)}；指定時每則新聞帶 topic_ids
+    Returns:
+        (本次所有項目識別, 新聞列表, 是否改用 feedparser)
+    """
+    entries, used_fallback = parse_entries(content, max_items)
+    keys = [entry_key(entry) for entry in entries]
+    if seen_keys is not None:
+        entries = [entry for entry, key in zip(entries, keys) if key not in seen_keys]
+
+    items = normalize_entries(entries, source_name, tz)
+    if routes is not None:
+        for item in items:
+            item['topic_ids'] = [tid for tid, (keywords, negative_keywords) in routes.items()
+                                 if item_matches(item, keywords, negative_keywords)]
+    return keys, items, used_fallback
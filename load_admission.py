@@ -0,0 +1,136 @@
+# load_admission.py - 使用者資料載入的准入控制
+# 固定數量的 worker 從優先佇列取出載入工作；同一使用者只排一次；正在輪詢等待的使用者優先
+# 部署後大量登入時，同時進行的完整抓取不會超過 worker 數，不會壓垮本服務與上游 RSS/API
+
+import heapq
+import itertools
+import threading
+import time
+
+# 優先順序（數字小的先執行）
+PRIORITY_ACTIVE = 0   # 排隊期間又來輪詢（使用者正在儀表板上等待）
+PRIORITY_NEW = 1      # 剛登入或資料過期的第一次請求
+
+
+class LoadAdmission:
+    """
+    handler(user_id, max_age) 在 worker 執行緒中執行
+    max_age: 只重新處理超過幾秒未更新的專題；None 代表全部專題
+    """
+
+    def __init__(self, handler, workers=2, max_pending=500, wait_samples=200):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._heap = []        # (優先順序, 排入時間, 序號, user_id)
+        self._queued = {}      # user_id -> {'entry', 'max_age', 'enqueued_at'}
+        self._running = 0      # 執行中的工作數
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._waits = []       # 最近 wait_samples 筆的排隊秒數
+        self._wait_samples = wait_samples
+        self._metrics = {'admitted': 0, 'deduplicated': 0, 'promoted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'user-load-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, user_id, max_age=None, priority=PRIORITY_NEW):
+        """
+        排入載入工作；回傳 False 代表佇列已滿（呼叫端應解除載入中狀態，下次請求再試）
+        同一使用者已在佇列中時合併：取較高的優先順序、較大的專題範圍
+        （執行中的工作在結束前就會解除載入中狀態，之後的請求照常排入，避免被合併掉而卡在載入中）
+        """
+        self.start()  # 第一次排入時才啟動 worker
+        with self._cond:
+            queued = self._queued.get(user_id)
+            if queued:
+                self._metrics['deduplicated'] += 1
+                if max_age is None or (queued['max_age'] is not None and max_age < queued['max_age']):
+                    queued['max_age'] = max_age
+                self._reprioritize(user_id, queued, priority)
+                return True
+
+            if len(self._queued) >= self.max_pending:
+                self._metrics['rejected'] += 1
+                return False
+
+            now = time.time()
+            entry = (priority, now, next(self._seq), user_id)
+            self._queued[user_id] = {'entry': entry, 'max_age': max_age, 'enqueued_at': now}
+            heapq.heappush(self._heap, entry)
+            self._metrics['admitted'] += 1
+            self._cond.notify()
+            return True
+
+    def touch(self, user_id):
+        """使用者排隊期間又來輪詢：提升為 PRIORITY_ACTIVE"""
+        with self._cond:
+            queued = self._queued.get(user_id)
+            if queued:
+                self._reprioritize(user_id, queued, PRIORITY_ACTIVE)
+
+    def _reprioritize(self, user_id, queued, priority):
+        # heap 不支援原地修改：推入新項目，舊項目在取出時因與 _queued 不符而略過
+        old = queued['entry']
+        if priority >= old[0]:
+            return
+        entry = (priority, old[1], next(self._seq), user_id)
+        queued['entry'] = entry
+        heapq.heappush(self._heap, entry)
+        self._metrics['promoted'] += 1
+
+    def stats(self):
+        with self._cond:
+            now = time.time()
+            waits = self._waits
+            oldest = min((q['enqueued_at'] for q in self._queued.values()), default=None)
+            stats = dict(self._metrics)
+            stats.update({
+                'workers': self.workers,
+                'pending': len(self._queued),
+                'pending_active': sum(1 for q in self._queued.values() if q['entry'][0] == PRIORITY_ACTIVE),
+                'running': self._running,
+                'oldest_wait_seconds': round(now - oldest, 1) if oldest else 0,
+                'avg_wait_seconds': round(sum(waits) / len(waits), 2) if waits else 0,
+                'max_wait_seconds': round(max(waits), 2) if waits else 0,
+            })
+            return stats
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                entry = heapq.heappop(self._heap)
+                user_id = entry[3]
+                queued = self._queued.get(user_id)
+                if not queued or queued['entry'] is not entry:
+                    continue  # 已被提升優先順序的舊項目
+                del self._queued[user_id]
+                now = time.time()
+                self._running += 1
+                self._waits.append(now - queued['enqueued_at'])
+                if len(self._waits) > self._wait_samples:
+                    del self._waits[0]
+                return user_id, queued['max_age']
+
+    def _worker_loop(self):
+        while True:
+            user_id, max_age = self._next_job()
+            try:
+                self.handler(user_id, max_age)
+                outcome = 'completed'
+            except Exception as e:
+                print(f"[LOAD] 使用者 {user_id} 載入工作失敗: {e}")
+                outcome = 'failed'
+            with self._cond:
+                self._running -= 1
+                self._metrics[outcome] += 1
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Feed Parser Benchmark
+用途：比較 feed_parser（精簡串流解析器）與 feedparser 在實際 RSS 上的解析時間與結果
+
+使用方式：
+    python scripts/bench_feed_parser.py --record   # 抓取目前的 RSS 來源存到 scripts/bench_feeds/
+    python scripts/bench_feed_parser.py            # 以存下的檔案做基準測試
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import quote_plus
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import feedparser
+import feed_parser
+
+FEED_DIR = os.path.join(os.path.dirname(__file__), 'bench_feeds')
+GOOGLE_SAMPLE_QUERY = '颱風 OR 地震 OR 停電'
+
+
+def record():
+    """抓取國內外 RSS 來源與一次 Google News 搜尋，原始內容存成檔案"""
+    import requests
+    from app import RSS_SOURCES_TW, RSS_SOURCES_INTL
+
+    os.makedirs(FEED_DIR, exist_ok=True)
+    feeds = dict(RSS_SOURCES_TW)
+    feeds.update(RSS_SOURCES_INTL)
+    feeds['Google News'] = (
+        f'https://news.google.com/rss/search?q={quote_plus(GOOGLE_SAMPLE_QUERY)}'
+        '&hl=zh-TW&gl=TW&ceid=TW:zh-Hant'
+    )
+
+    for name, url in feeds.items():
+        try:
+            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            continue
+        filename = re.sub(r'[^\w.-]+', '_', name) + '.xml'
+        with open(os.path.join(FEED_DIR, filename), 'wb') as f:
+            f.write(response.content)
+        print(f"✅ {name}: {len(response.content) / 1024:.1f} KB")
+
+
+def _time(func, content, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = func(content)
+    return (time.perf_counter() - started) / rounds * 1000, result
+
+
+def bench(rounds, max_items):
+    if not os.path.isdir(FEED_DIR) or not os.listdir(FEED_DIR):
+        print(f"❌ {FEED_DIR} 沒有檔案，請先執行 --record")
+        sys.exit(1)
+
+    total_fast = total_full = 0.0
+    print(f"{'來源':<32}{'feedparser':>12}{'feed_parser':>13}{'倍數':>8}  結果")
+    for filename in sorted(os.listdir(FEED_DIR)):
+        with open(os.path.join(FEED_DIR, filename), 'rb') as f:
+            content = f.read()
+
+        full_ms, full = _time(lambda c: feedparser.parse(c).entries[:max_items], content, rounds)
+        try:
+            fast_ms, fast = _time(lambda c: feed_parser.parse(c, max_items), content, rounds)
+        except feed_parser.UnsupportedFeed as e:
+            # 正式環境會改用 feedparser，成本等於 feedparser
+            print(f"{filename:<32}{full_ms:>10.2f}ms{'fallback':>13}{'':>8}  {e}")
+            total_fast += full_ms
+            total_full += full_ms
+            continue
+
+        same = len(full) == len(fast) and all(
+            a.get('title', '') == b['title'] and a.get('link', '') == b['link'] for a, b in zip(full, fast)
+        )
+        print(f"{filename:<32}{full_ms:>10.2f}ms{fast_ms:>11.2f}ms{full_ms / fast_ms:>7.1f}x  "
+              f"{len(fast)} 則{'' if same else '（標題/連結與 feedparser 不一致）'}")
+        total_fast += fast_ms
+        total_full += full_ms
+
+    print(f"\n合計（每輪）: feedparser {total_full:.1f}ms, feed_parser {total_fast:.1f}ms, "
+          f"{total_full / total_fast:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='feed_parser 與 feedparser 基準測試')
+    parser.add_argument('--record', action='store_true', help='抓取目前的 RSS 來源存成檔案')
+    parser.add_argument('--rounds', type=int, default=20, help='每個檔案解析次數')
+    parser.add_argument('--max-items', type=int, default=50, help='每個來源取的項目數')
+    args = parser.parse_args()
+
+    if args.record:
+        record()
+    else:
+        bench(args.rounds, args.max_items)
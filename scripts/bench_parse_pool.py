@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Parse Pool Benchmark
+用途：以錄下的 RSS（scripts/bench_feeds/，由 bench_feed_parser.py --record 產生）測試解析程序池
+對不同程序數的擴展性；每個工作 = 解析 + 正規化 + 依 topics_config.json 的關鍵字分派專題
+
+使用方式：
+    python scripts/bench_parse_pool.py                  # 1、2、4… 到 CPU 核心數
+    python scripts/bench_parse_pool.py --workers 1 2 8 --rounds 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import feed_pipeline
+
+FEED_DIR = os.path.join(os.path.dirname(__file__), 'bench_feeds')
+TOPICS_FILE = os.path.join(os.path.dirname(__file__), '..', 'topics_config.json')
+TAIPEI_TZ = ZoneInfo('Asia/Taipei')
+
+
+def load_corpus():
+    if not os.path.isdir(FEED_DIR) or not os.listdir(FEED_DIR):
+        print(f"❌ {FEED_DIR} 沒有檔案，請先執行 python scripts/bench_feed_parser.py --record")
+        sys.exit(1)
+    corpus = []
+    for filename in sorted(os.listdir(FEED_DIR)):
+        with open(os.path.join(FEED_DIR, filename), 'rb') as f:
+            corpus.append((filename, f.read()))
+    return corpus
+
+
+def load_routes():
+    """與排程更新相同的 routes 結構：{topic_id: (keywords, negative_keywords)}"""
+    with open(TOPICS_FILE, 'r', encoding='utf-8') as f:
+        topics = json.load(f)
+    routes = {}
+    for tid, cfg in topics.items():
+        keywords = cfg.get('keywords', [])
+        if isinstance(keywords, dict):
+            keywords = keywords.get('zh', []) + keywords.get('en', []) + keywords.get('ja', []) + keywords.get('ko', [])
+        if keywords:
+            routes[tid] = (keywords, cfg.get('negative_keywords', []))
+    return routes
+
+
+def run_serial(jobs, routes):
+    for name, content in jobs:
+        feed_pipeline.parse_and_route(content, name, TAIPEI_TZ, 50, None, routes)
+
+
+def run_pool(pool, jobs, routes):
+    futures = [pool.submit(feed_pipeline.parse_and_route, content, name, TAIPEI_TZ, 50, None, routes)
+               for name, content in jobs]
+    for future in futures:
+        future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解析程序池擴展性測試')
+    parser.add_argument('--workers', type=int, nargs='*', help='要測試的程序數（預設 1、2、4… 到核心數）')
+    parser.add_argument('--rounds', type=int, default=5, help='語料重複次數（模擬多輪/多使用者的工作量）')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    routes = load_routes()
+    jobs = corpus * args.rounds
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({2 ** i for i in range(cpu_count.bit_length()) if 2 ** i <= cpu_count} | {cpu_count})
+
+    print(f"語料 {len(corpus)} 個來源 × {args.rounds} 輪 = {len(jobs)} 個工作，{len(routes)} 個專題，CPU 核心 {cpu_count}")
+
+    started = time.perf_counter()
+    run_serial(jobs, routes)
+    serial = time.perf_counter() - started
+    print(f"{'單執行緒':<10}{serial * 1000:>10.1f}ms{'1.00x':>9}")
+
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload(['feed_pipeline'])
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            # 先暖機，不把程序啟動時間算進去
+            run_pool(pool, corpus[:workers], routes)
+            started = time.perf_counter()
+            run_pool(pool, jobs, routes)
+            elapsed = time.perf_counter() - started
+        print(f"{f'{workers} 程序':<10}{elapsed * 1000:>10.1f}ms{serial / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# search_index.py - 新聞歸檔的本地全文索引
+# SQLite FTS5；中日韓文字切成字元 bigram，其餘文字以小寫單字索引，查詢時使用相同的前處理
+
+import re
+import sqlite3
+import threading
+import time
+
+# 中日韓文字（含假名、韓文）連續片段 / 英數單字
+_TOKEN_RE = re.compile(r'([\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uac00-\ud7af]+)|([0-9A-Za-z\u00c0-\u024f]+)')
+
+
+def fts5_available():
+    """目前的 SQLite 是否編譯了 FTS5"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        try:
+            conn.execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+        finally:
+            conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def tokenize(text):
+    """
+    將文字轉為索引用的 token 列表
+    中日韓片段 → 相鄰字元 bigram（單字片段保留單字）；英數 → 小寫單字
+    """
+    tokens = []
+    for cjk, word in _TOKEN_RE.findall(text or ''):
+        if cjk:
+            if len(cjk) == 1:
+                tokens.append(cjk)
+            else:
+                tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def build_match_query(query):
+    """
+    使用者輸入 → (FTS5 MATCH 語法, 改用 LIKE 比對的詞)
+    每個以空白分隔的詞轉為片語（bigram 需相鄰），詞與詞之間為 AND
+    含單一中文字片段的詞（例如「灣」）沒有對應的 bigram 可查（片段結尾的單字只出現在前一個 bigram 裡），改用子字串比對
+    """
+    clauses = []
+    like_terms = []
+    for term in (query or '').split():
+        tokens = tokenize(term)
+        if not tokens:
+            continue
+        if any(len(t) == 1 and not t.isascii() for t in tokens):
+            like_terms.append(term)
+            continue
+        clauses.append('"' + ' '.join(t.replace('"', '""') for t in tokens) + '"')
+    return ' AND '.join(clauses), like_terms
+
+
+def _like_pattern(term):
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class SearchIndex:
+    """單一 SQLite 檔案：docs 存原始欄位，docs_fts 存前處理後的 token"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                topic_id TEXT NOT NULL,
+                news_hash TEXT NOT NULL,
+                title TEXT,
+                summary TEXT,
+                url TEXT,
+                source TEXT,
+                published_ts REAL,
+                UNIQUE (user_id, topic_id, news_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_docs_user_published
+                ON docs(user_id, published_ts DESC);
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(title, summary, tokenize='unicode61');
+        ''')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add(self, user_id, topic_id, docs):
+        """
+        寫入或更新新聞（以 user_id + topic_id + news_hash 去重）
+        docs: [{'news_hash', 'title', 'summary', 'url', 'source', 'published_ts'}]
+        """
+        if not docs:
+            return 0
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for doc in docs:
+                conn.execute(
+                    'INSERT INTO docs (user_id, topic_id, news_hash, title, summary, url, source, published_ts) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (user_id, topic_id, news_hash) DO UPDATE SET '
+                    'title = excluded.title, summary = excluded.summary, url = excluded.url, '
+                    'source = excluded.source, published_ts = excluded.published_ts',
+                    (user_id, topic_id, doc['news_hash'], doc.get('title', ''), doc.get('summary', ''),
+                     doc.get('url', ''), doc.get('source', ''), doc.get('published_ts'))
+                )
+                row = conn.execute(
+                    'SELECT id FROM docs WHERE user_id = ? AND topic_id = ? AND news_hash = ?',
+                    (user_id, topic_id, doc['news_hash'])
+                ).fetchone()
+                conn.execute('DELETE FROM docs_fts WHERE rowid = ?', (row[0],))
+                conn.execute(
+                    'INSERT INTO docs_fts (rowid, title, summary) VALUES (?, ?, ?)',
+                    (row[0], ' '.join(tokenize(doc.get('title'))), ' '.join(tokenize(doc.get('summary'))))
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return len(docs)
+
+    def delete_topic(self, user_id, topic_id):
+        """專題刪除時一併移除索引"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'DELETE FROM docs_fts WHERE rowid IN (SELECT id FROM docs WHERE user_id = ? AND topic_id = ?)',
+                (user_id, topic_id)
+            )
+            conn.execute('DELETE FROM docs WHERE user_id = ? AND topic_id = ?', (user_id, topic_id))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def search(self, user_id, query='', topic_id=None, source=None, date_from=None, date_to=None, limit=50):
+        """
+        全文搜尋（限定使用者），有可用 FTS 查詢的關鍵字時依 bm25 排序，否則依時間新到舊
+        date_from / date_to 為 epoch 秒
+        Returns:
+            (results, took_ms)
+        """
+        started = time.perf_counter()
+        match, like_terms = build_match_query(query)
+
+        where = ['d.user_id = ?']
+        params = [user_id]
+        if topic_id:
+            where.append('d.topic_id = ?')
+            params.append(topic_id)
+        if source:
+            where.append('d.source = ?')
+            params.append(source)
+        if date_from is not None:
+            where.append('d.published_ts >= ?')
+            params.append(date_from)
+        if date_to is not None:
+            where.append('d.published_ts < ?')
+            params.append(date_to)
+        for term in like_terms:
+            where.append("(d.title LIKE ? ESCAPE '\\' OR d.summary LIKE ? ESCAPE '\\')")
+            params.extend([_like_pattern(term)] * 2)
+
+        if match:
+            sql = ('SELECT d.*, bm25(docs_fts, 3.0, 1.0) AS rank FROM docs_fts '
+                   'JOIN docs d ON d.id = docs_fts.rowid '
+                   f'WHERE docs_fts MATCH ? AND {" AND ".join(where)} '
+                   'ORDER BY rank, d.published_ts DESC LIMIT ?')
+            params = [match] + params
+        else:
+            sql = (f'SELECT d.*, 0 AS rank FROM docs d WHERE {" AND ".join(where)} '
+                   'ORDER BY d.published_ts DESC LIMIT ?')
+        params.append(limit)
+
+        rows = self._conn().execute(sql, params).fetchall()
+        results = [{
+            'topic_id': row['topic_id'],
+            'news_hash': row['news_hash'],
+            'title': row['title'],
+            'summary': row['summary'],
+            'url': row['url'],
+            'source': row['source'],
+            'published_ts': row['published_ts']
+        } for row in rows]
+        return results, round((time.perf_counter() - started) * 1000, 2)
+
+    def count(self, user_id=None):
+        if user_id:
+            return self._conn().execute('SELECT COUNT(*) FROM docs WHERE user_id = ?', (user_id,)).fetchone()[0]
+        return self._conn().execute('SELECT COUNT(*) FROM docs').fetchone()[0]
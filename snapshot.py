@@ -0,0 +1,252 @@
+# snapshot.py - 本地資料快取的二進位快照格式
+# 取代 data_cache.json 的緊湊格式：長度前綴紀錄 + 來源字串表 + epoch 時間戳
+
+import os
+import json
+import mmap
+import struct
+import tempfile
+from datetime import datetime, timezone
+
+# 檔案開頭標記（含格式版本）
+MAGIC = b'TRSNAP01'
+
+# 紀錄類型
+REC_META = 1      # JSON：last_update、summaries
+REC_STRINGS = 2   # 來源名稱字串表
+REC_TOPIC = 3     # 單一專題的新聞列表
+REC_END = 0xFF    # 結尾標記，缺少代表檔案不完整
+
+# 新聞類別
+KIND_TOPICS = 0
+KIND_INTERNATIONAL = 1
+
+# 新聞旗標
+FLAG_DATE_ONLY = 0x01
+FLAG_HAS_ORIGINAL = 0x02
+FLAG_NO_PUBLISHED = 0x04
+
+_REC_HEADER = struct.Struct('<BI')     # type, length
+_ITEM_HEADER = struct.Struct('<dHB')   # published epoch, source index, flags
+_U32 = struct.Struct('<I')
+_U16 = struct.Struct('<H')
+
+
+class SnapshotError(ValueError):
+    """快照檔案格式錯誤或不完整"""
+
+
+def _pack_str(buf, text):
+    data = (text or '').encode('utf-8')
+    buf += _U32.pack(len(data))
+    buf += data
+
+
+def _localize(dt, tz):
+    """無時區的時間視為 tz 的當地時間（與 app 其他地方的解讀一致，不依主機時區）"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=tz)
+    return dt
+
+
+def _encode_topic(kind, topic_id, news_list, source_index, tz):
+    buf = bytearray()
+    buf += bytes([kind])
+    _pack_str(buf, topic_id)
+    buf += _U32.pack(len(news_list))
+
+    for news in news_list:
+        published = news.get('published')
+        flags = 0
+        if news.get('is_date_only'):
+            flags |= FLAG_DATE_ONLY
+        if 'title_original' in news:
+            flags |= FLAG_HAS_ORIGINAL
+
+        if isinstance(published, str) and published:
+            published = datetime.fromisoformat(published)
+        if isinstance(published, datetime):
+            ts = _localize(published, tz).timestamp()
+        else:
+            ts = 0.0
+            flags |= FLAG_NO_PUBLISHED
+
+        source = news.get('source', '')
+        if source not in source_index:
+            source_index[source] = len(source_index)
+
+        buf += _ITEM_HEADER.pack(ts, source_index[source], flags)
+        _pack_str(buf, news.get('title', ''))
+        _pack_str(buf, news.get('link', ''))
+        _pack_str(buf, news.get('summary', ''))
+        _pack_str(buf, news.get('hash', ''))
+        if flags & FLAG_HAS_ORIGINAL:
+            _pack_str(buf, news.get('title_original', ''))
+
+    return buf
+
+
+def _write_record(f, rec_type, payload):
+    f.write(_REC_HEADER.pack(rec_type, len(payload)))
+    f.write(payload)
+
+
+def write_snapshot(path, topics, international, summaries, last_update, tz=timezone.utc):
+    """
+    原子寫入快照：先寫暫存檔並 fsync，再以 os.replace 取代正式檔案
+    當機時只會留下舊檔或新檔，不會出現寫到一半的檔案
+    tz: 無時區的發布時間以此時區解讀（app 傳入台北時區）
+    """
+    source_index = {}
+    topic_records = []
+    for kind, store in ((KIND_TOPICS, topics), (KIND_INTERNATIONAL, international)):
+        for tid, news_list in store.items():
+            topic_records.append(_encode_topic(kind, tid, news_list, source_index, tz))
+
+    strings = bytearray(_U32.pack(len(source_index)))
+    for name in source_index:  # dict 保持插入順序，與索引一致
+        data = name.encode('utf-8')
+        strings += _U16.pack(len(data))
+        strings += data
+
+    meta = json.dumps({'last_update': last_update, 'summaries': summaries},
+                      ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            _write_record(f, REC_META, meta)
+            _write_record(f, REC_STRINGS, strings)
+            for payload in topic_records:
+                _write_record(f, REC_TOPIC, payload)
+            _write_record(f, REC_END, b'')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # 確保目錄項目也落盤（部分平台不支援，失敗可忽略）
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def _read_str(buf, offset):
+    (length,) = _U32.unpack_from(buf, offset)
+    offset += 4
+    end = offset + length
+    if end > len(buf):
+        raise SnapshotError('字串長度超出檔案範圍')
+    return str(buf[offset:end], 'utf-8'), end
+
+
+def _from_epoch(ts, tz):
+    """epoch 一律以 UTC 解讀，再轉成呼叫端要的時區（tz 為 None 時保留 UTC）"""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return dt.astimezone(tz) if tz else dt
+
+
+def _decode_topic(buf, strings, tz):
+    kind = buf[0]
+    tid, offset = _read_str(buf, 1)
+    (count,) = _U32.unpack_from(buf, offset)
+    offset += 4
+
+    news_list = []
+    for _ in range(count):
+        ts, source_idx, flags = _ITEM_HEADER.unpack_from(buf, offset)
+        offset += _ITEM_HEADER.size
+        title, offset = _read_str(buf, offset)
+        link, offset = _read_str(buf, offset)
+        summary, offset = _read_str(buf, offset)
+        news_hash, offset = _read_str(buf, offset)
+
+        news = {
+            'title': title,
+            'link': link,
+            'source': strings[source_idx],
+            'published': None if flags & FLAG_NO_PUBLISHED else _from_epoch(ts, tz),
+            'summary': summary,
+        }
+        if news_hash:
+            news['hash'] = news_hash
+        if flags & FLAG_DATE_ONLY:
+            news['is_date_only'] = True
+        if flags & FLAG_HAS_ORIGINAL:
+            news['title_original'], offset = _read_str(buf, offset)
+        news_list.append(news)
+
+    return kind, tid, news_list
+
+
+def read_snapshot(path, tz):
+    """
+    以 mmap 讀取快照，回傳與 DATA_STORE 相同結構的字典
+    {'topics': {...}, 'international': {...}, 'summaries': {...}, 'last_update': ...}
+    """
+    result = {'topics': {}, 'international': {}, 'summaries': {}, 'last_update': None}
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC) + _REC_HEADER.size:
+            raise SnapshotError('快照檔案過短')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                raise SnapshotError('快照檔案標記不符')
+
+            view = memoryview(mm)
+            try:
+                strings = []
+                offset = len(MAGIC)
+                complete = False
+                while offset + _REC_HEADER.size <= len(view):
+                    rec_type, length = _REC_HEADER.unpack_from(view, offset)
+                    offset += _REC_HEADER.size
+                    if offset + length > len(view):
+                        raise SnapshotError('紀錄長度超出檔案範圍')
+                    record = view[offset:offset + length]
+                    offset += length
+
+                    if rec_type == REC_END:
+                        record.release()
+                        complete = True
+                        break
+
+                    with record as payload:
+                        if rec_type == REC_META:
+                            meta = json.loads(str(payload, 'utf-8'))
+                            result['summaries'] = meta.get('summaries') or {}
+                            result['last_update'] = meta.get('last_update')
+                        elif rec_type == REC_STRINGS:
+                            (count,) = _U32.unpack_from(payload, 0)
+                            pos = 4
+                            for _ in range(count):
+                                (slen,) = _U16.unpack_from(payload, pos)
+                                pos += 2
+                                strings.append(str(payload[pos:pos + slen], 'utf-8'))
+                                pos += slen
+                        elif rec_type == REC_TOPIC:
+                            kind, tid, news_list = _decode_topic(payload, strings, tz)
+                            key = 'international' if kind == KIND_INTERNATIONAL else 'topics'
+                            result[key][tid] = news_list
+                        # 未知紀錄類型直接略過（向前相容）
+
+                if not complete:
+                    raise SnapshotError('快照檔案不完整（缺少結尾標記）')
+            except (struct.error, IndexError, UnicodeDecodeError) as e:
+                raise SnapshotError(f'快照解析失敗: {e}') from e
+            finally:
+                view.release()
+
+    return result
@@ -0,0 +1,134 @@
+# source_health.py - RSS 來源健康狀態與斷路器
+# 記錄每個來源的延遲、錯誤率、最後成功時間；連續失敗後暫停抓取，冷卻結束時放行一次探測
+
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'        # 正常抓取
+OPEN = 'open'            # 冷卻中，略過抓取
+HALF_OPEN = 'half_open'  # 冷卻結束，正在探測是否恢復
+
+
+class SourceHealth:
+    """
+    failure_threshold 次連續失敗後斷路；冷卻時間從 base_cooldown 起，探測失敗則加倍（上限 max_cooldown）
+    """
+
+    def __init__(self, failure_threshold=3, base_cooldown=300, max_cooldown=3600, window=20):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.window = window
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def _state(self, name):
+        state = self._sources.get(name)
+        if state is None:
+            state = self._sources[name] = {
+                'state': CLOSED,
+                'consecutive_failures': 0,
+                'cooldown': self.base_cooldown,
+                'open_until': None,
+                'probing': False,
+                'latency_ms': None,
+                'last_latency_ms': None,
+                'last_success': None,
+                'last_error': None,
+                'last_error_at': None,
+                'skipped': 0,
+                'stragglers': 0,
+                'outcomes': deque(maxlen=self.window)
+            }
+        return state
+
+    def allow(self, name):
+        """是否可以抓取；斷路中回傳 False，冷卻結束時只放行一個探測請求"""
+        now = time.time()
+        with self._lock:
+            state = self._state(name)
+            if state['state'] == CLOSED:
+                return True
+            if state['state'] == OPEN and now >= state['open_until']:
+                state['state'] = HALF_OPEN
+                state['probing'] = False
+            if state['state'] == HALF_OPEN and not state['probing']:
+                state['probing'] = True
+                return True
+            state['skipped'] += 1
+            return False
+
+    def record_success(self, name, latency):
+        with self._lock:
+            state = self._state(name)
+            if state['state'] != CLOSED:
+                print(f"[SOURCE-HEALTH] {name} 已恢復")
+            state.update({
+                'state': CLOSED,
+                'consecutive_failures': 0,
+                'cooldown': self.base_cooldown,
+                'open_until': None,
+                'probing': False,
+                'last_success': time.time()
+            })
+            self._record_latency(state, latency)
+            state['outcomes'].append(True)
+
+    def record_failure(self, name, latency, error):
+        now = time.time()
+        with self._lock:
+            state = self._state(name)
+            state['consecutive_failures'] += 1
+            state['last_error'] = str(error)[:200]
+            state['last_error_at'] = now
+            self._record_latency(state, latency)
+            state['outcomes'].append(False)
+
+            if state['state'] == HALF_OPEN:
+                # 探測失敗：冷卻加倍後再斷路
+                state['cooldown'] = min(state['cooldown'] * 2, self.max_cooldown)
+                self._open(name, state, now)
+            elif state['state'] == CLOSED and state['consecutive_failures'] >= self.failure_threshold:
+                self._open(name, state, now)
+
+    def record_straggler(self, name):
+        """並行抓取到期時仍未完成（結果可能在之後才併入）"""
+        with self._lock:
+            self._state(name)['stragglers'] += 1
+
+    def _open(self, name, state, now):
+        state['state'] = OPEN
+        state['open_until'] = now + state['cooldown']
+        state['probing'] = False
+        print(f"[SOURCE-HEALTH] {name} 連續失敗 {state['consecutive_failures']} 次，暫停 {state['cooldown'] // 60} 分鐘")
+
+    @staticmethod
+    def _record_latency(state, latency):
+        latency_ms = latency * 1000
+        state['last_latency_ms'] = round(latency_ms, 1)
+        if state['latency_ms'] is None:
+            state['latency_ms'] = latency_ms
+        else:
+            state['latency_ms'] = 0.3 * latency_ms + 0.7 * state['latency_ms']
+
+    def snapshot(self):
+        """各來源健康狀態（管理介面用）"""
+        with self._lock:
+            result = {}
+            for name, state in self._sources.items():
+                outcomes = state['outcomes']
+                result[name] = {
+                    'state': state['state'],
+                    'consecutive_failures': state['consecutive_failures'],
+                    'error_rate': round(outcomes.count(False) / len(outcomes), 2) if outcomes else None,
+                    'latency_ms': round(state['latency_ms'], 1) if state['latency_ms'] is not None else None,
+                    'last_latency_ms': state['last_latency_ms'],
+                    'last_success': state['last_success'],
+                    'last_error': state['last_error'],
+                    'last_error_at': state['last_error_at'],
+                    'open_until': state['open_until'] if state['state'] == OPEN else None,
+                    'skipped': state['skipped'],
+                    'stragglers': state['stragglers']
+                }
+            return result
@@ -0,0 +1,137 @@
+# source_schedule.py - RSS 來源的自適應抓取頻率
+# 依每個來源觀察到的新新聞速率（EWMA）調整抓取間隔：更新頻繁的來源抓得勤，冷門來源拉長間隔
+# 每個來源的 seen 同時是排程抓取的游標：速率與「哪些項目是新的」用同一份紀錄判斷
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class SourceScheduler:
+    """
+    每個來源的狀態：
+        interval      目前抓取間隔（秒）
+        rate          新新聞速率的指數移動平均（則/小時），None 代表尚無觀察
+        last_seen_at  最近一次觀察（排程抓取）時間
+        seen          最近處理過的項目識別（guid / link / 標題，最多 seen_limit 筆），即排程抓取的游標
+        last_polled   最近一次排程抓取時間，決定下次到期時間
+        last_new      最近一次觀察到的新新聞數
+    """
+
+    def __init__(self, min_interval=900, max_interval=21600, target_new_per_poll=5, alpha=0.3, seen_limit=500):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new_per_poll = target_new_per_poll
+        self.alpha = alpha
+        self.seen_limit = seen_limit
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def register(self, name, group, default_interval):
+        """登記來源（重複登記不會重設已觀察到的狀態）"""
+        with self._lock:
+            if name in self._sources:
+                return
+            self._sources[name] = {
+                'group': group,
+                'interval': default_interval,
+                'rate': None,
+                'last_seen_at': None,
+                'last_polled': None,
+                'last_new': 0,
+                'seen': OrderedDict()
+            }
+
+    def seen_keys(self, name):
+        """來源游標中已處理過的項目識別（未登記的來源回傳空集合）"""
+        with self._lock:
+            state = self._sources.get(name)
+            return set(state['seen']) if state else set()
+
+    def observe(self, name, keys):
+        """
+        記錄一次排程抓取的結果：keys 為這次 feed 中所有項目的識別
+        不在游標中的算新項目，用來更新速率與抓取間隔，並推進游標；未登記的來源忽略
+        """
+        now = time.time()
+        with self._lock:
+            state = self._sources.get(name)
+            if state is None:
+                return
+
+            seen = state['seen']
+            new_count = 0
+            for key in keys:
+                if not key:
+                    continue
+                if key in seen:
+                    seen.move_to_end(key)
+                else:
+                    seen[key] = None
+                    new_count += 1
+            while len(seen) > self.seen_limit:
+                seen.popitem(last=False)
+
+            if state['last_seen_at'] is not None:
+                elapsed_hours = max((now - state['last_seen_at']) / 3600, 1 / 60)
+                rate = new_count / elapsed_hours
+                if state['rate'] is None:
+                    state['rate'] = rate
+                else:
+                    state['rate'] = self.alpha * rate + (1 - self.alpha) * state['rate']
+                state['interval'] = self._interval_for(state['rate'])
+
+            state['last_seen_at'] = now
+            state['last_new'] = new_count
+
+    def _interval_for(self, rate):
+        """每次抓取預期拿到 target_new_per_poll 則新新聞的間隔"""
+        if rate <= 0:
+            return self.max_interval
+        interval = self.target_new_per_poll / rate * 3600
+        return int(min(self.max_interval, max(self.min_interval, interval)))
+
+    def mark_polled(self, names, observed_since=None):
+        """
+        排程抓取完成後呼叫，下次到期時間 = 本次時間 + 目前間隔
+        observed_since 指定時只標記該時間之後 observe 過（確實抓取成功）的來源；
+        斷路略過、抓取失敗或逾時的來源維持到期，下一輪再試
+        """
+        now = time.time()
+        with self._lock:
+            for name in names:
+                state = self._sources.get(name)
+                if state is None:
+                    continue
+                if observed_since is not None and (state['last_seen_at'] or 0) < observed_since:
+                    continue
+                state['last_polled'] = now
+
+    def due(self, names, now=None):
+        """回傳 names 中已到期（或從未排程抓取）的來源"""
+        now = now or time.time()
+        with self._lock:
+            result = []
+            for name in names:
+                state = self._sources.get(name)
+                if state is None or state['last_polled'] is None:
+                    result.append(name)
+                elif now - state['last_polled'] >= state['interval']:
+                    result.append(name)
+            return result
+
+    def snapshot(self):
+        """各來源目前的間隔與速率（管理介面用）"""
+        with self._lock:
+            result = {}
+            for name, state in self._sources.items():
+                next_due = state['last_polled'] + state['interval'] if state['last_polled'] else None
+                result[name] = {
+                    'group': state['group'],
+                    'interval_minutes': round(state['interval'] / 60, 1),
+                    'rate_per_hour': round(state['rate'], 2) if state['rate'] is not None else None,
+                    'last_new': state['last_new'],
+                    'last_polled': state['last_polled'],
+                    'next_due': next_due
+                }
+            return result
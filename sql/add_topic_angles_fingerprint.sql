@@ -0,0 +1,9 @@
+-- TopicRadar: topic_angles 新增分析輸入指紋欄位
+-- 已建立 topic_angles 的資料庫執行此檔即可；新安裝請直接使用 create_topic_angles.sql
+
+ALTER TABLE topic_angles ADD COLUMN IF NOT EXISTS input_fingerprint TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_topic_angles_fingerprint
+ON topic_angles(user_id, topic_id, input_fingerprint);
+
+COMMENT ON COLUMN topic_angles.input_fingerprint IS '分析輸入的指紋，相同輸入直接沿用已完成的分析結果';
@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS topic_angles (
     analyzed_news_count INTEGER,               -- 本次分析使用的新聞數量
     data_range_start TIMESTAMP WITH TIME ZONE, -- 分析資料的開始時間
     data_range_end TIMESTAMP WITH TIME ZONE,   -- 分析資料的結束時間
+    input_fingerprint TEXT,                    -- 分析輸入（新聞集合 + 摘要 + 模型）的 SHA-256，用於重用結果
     
     -- 時間戳記
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -33,7 +34,12 @@ ON topic_angles(topic_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_topic_angles_user 
 ON topic_angles(user_id);
 
+-- 索引：以輸入指紋查詢可重用的分析結果
+CREATE INDEX IF NOT EXISTS idx_topic_angles_fingerprint
+ON topic_angles(user_id, topic_id, input_fingerprint);
+
 -- 註解
 COMMENT ON TABLE topic_angles IS '儲存 AI 針對專題新聞分析出的調查角度';
 COMMENT ON COLUMN topic_angles.status IS '分析狀態：processing (分析中), completed (完成), failed (失敗)';
 COMMENT ON COLUMN topic_angles.angles_data IS 'AI 分析回傳的 JSON 結構，包含多個角度與建議';
+COMMENT ON COLUMN topic_angles.input_fingerprint IS '分析輸入的指紋，相同輸入直接沿用已完成的分析結果';
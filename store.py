@@ -0,0 +1,220 @@
+# store.py - DATA_STORE 的共享後端
+# memory = 單一程序內（預設）；sqlite = 同機多個 Gunicorn worker 共用的 SQLite（WAL 模式）
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f'無法序列化 {type(obj).__name__}')
+
+
+def _encode_news(news_list):
+    # 以底線開頭的欄位是記憶體內的比對/排序暫存（見 feed_pipeline.envelope），不寫入
+    return json.dumps([{k: v for k, v in news.items() if not k.startswith('_')} for news in news_list],
+                      ensure_ascii=False, default=_json_default)
+
+
+def _decode_news(raw):
+    news_list = json.loads(raw) if raw else []
+    for news in news_list:
+        published = news.get('published')
+        if isinstance(published, str) and published:
+            try:
+                news['published'] = datetime.fromisoformat(published)
+            except ValueError:
+                pass
+    return news_list
+
+
+class MemoryStore:
+    """程序內後端：只保存物件參照，不做序列化"""
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def _user(self, user_id):
+        return self._users.setdefault(user_id, {'version': 0, 'meta': {}, 'topics': {}})
+
+    def put_topic(self, user_id, topic_id, domestic, intl, summary):
+        """寫入單一專題資料，回傳該使用者的新版本號"""
+        with self._lock:
+            user = self._user(user_id)
+            user['topics'][topic_id] = {
+                'topics': domestic,
+                'international': intl,
+                'summary': summary,
+                'updated_at': time.time()
+            }
+            user['version'] += 1
+            return user['version']
+
+    def put_user_meta(self, user_id, meta):
+        """寫入使用者層級的狀態（last_update、載入中旗標），回傳新版本號"""
+        with self._lock:
+            user = self._user(user_id)
+            user['meta'].update(meta)
+            user['version'] += 1
+            return user['version']
+
+    def delete_topic(self, user_id, topic_id):
+        with self._lock:
+            user = self._users.get(user_id)
+            if user and user['topics'].pop(topic_id, None) is not None:
+                user['version'] += 1
+
+    def user_version(self, user_id):
+        user = self._users.get(user_id)
+        return user['version'] if user else 0
+
+    def get_user(self, user_id):
+        """回傳 {'version', 'meta', 'topics': {tid: {...}}}，不存在時回傳 None"""
+        with self._lock:
+            user = self._users.get(user_id)
+            if not user:
+                return None
+            return {
+                'version': user['version'],
+                'meta': dict(user['meta']),
+                'topics': dict(user['topics'])
+            }
+
+    def list_users(self):
+        return list(self._users.keys())
+
+
+class SQLiteStore:
+    """跨程序後端：同一台機器上的 worker 透過 WAL 模式的 SQLite 共用資料"""
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS user_meta (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                meta TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE TABLE IF NOT EXISTS topic_data (
+                user_id TEXT NOT NULL,
+                topic_id TEXT NOT NULL,
+                domestic TEXT,
+                intl TEXT,
+                summary TEXT,
+                updated_at REAL,
+                PRIMARY KEY (user_id, topic_id)
+            );
+        ''')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _bump_version(self, conn, user_id, meta=None):
+        conn.execute('INSERT OR IGNORE INTO user_meta (user_id) VALUES (?)', (user_id,))
+        if meta is not None:
+            row = conn.execute('SELECT meta FROM user_meta WHERE user_id = ?', (user_id,)).fetchone()
+            merged = json.loads(row[0]) if row and row[0] else {}
+            merged.update(meta)
+            conn.execute('UPDATE user_meta SET meta = ? WHERE user_id = ?',
+                         (json.dumps(merged, ensure_ascii=False, default=_json_default), user_id))
+        conn.execute('UPDATE user_meta SET version = version + 1 WHERE user_id = ?', (user_id,))
+        return conn.execute('SELECT version FROM user_meta WHERE user_id = ?', (user_id,)).fetchone()[0]
+
+    def put_topic(self, user_id, topic_id, domestic, intl, summary):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO topic_data (user_id, topic_id, domestic, intl, summary, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    user_id, topic_id,
+                    _encode_news(domestic),
+                    _encode_news(intl),
+                    json.dumps(summary or {}, ensure_ascii=False, default=_json_default),
+                    time.time()
+                )
+            )
+            version = self._bump_version(conn, user_id)
+            conn.execute('COMMIT')
+            return version
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def put_user_meta(self, user_id, meta):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = self._bump_version(conn, user_id, meta)
+            conn.execute('COMMIT')
+            return version
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete_topic(self, user_id, topic_id):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            cur = conn.execute('DELETE FROM topic_data WHERE user_id = ? AND topic_id = ?', (user_id, topic_id))
+            if cur.rowcount:
+                self._bump_version(conn, user_id)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def user_version(self, user_id):
+        row = self._conn().execute('SELECT version FROM user_meta WHERE user_id = ?', (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_user(self, user_id):
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            row = conn.execute('SELECT version, meta FROM user_meta WHERE user_id = ?', (user_id,)).fetchone()
+            if not row:
+                return None
+            topics = {}
+            for tid, domestic, intl, summary, updated_at in conn.execute(
+                    'SELECT topic_id, domestic, intl, summary, updated_at FROM topic_data WHERE user_id = ?',
+                    (user_id,)):
+                topics[tid] = {
+                    'topics': _decode_news(domestic),
+                    'international': _decode_news(intl),
+                    'summary': json.loads(summary) if summary else {},
+                    'updated_at': updated_at
+                }
+        finally:
+            conn.execute('COMMIT')
+        return {'version': row[0], 'meta': json.loads(row[1] or '{}'), 'topics': topics}
+
+    def list_users(self):
+        return [row[0] for row in self._conn().execute('SELECT user_id FROM user_meta')]
+
+
+def create_store(backend, sqlite_path='topicradar_store.db'):
+    """依設定建立後端：'memory'（預設）或 'sqlite'"""
+    if backend == 'sqlite':
+        return SQLiteStore(sqlite_path)
+    if backend not in ('', 'memory'):
+        print(f"[STORE] 未知的後端 {backend}，改用 memory")
+    return MemoryStore()
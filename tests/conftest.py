@@ -0,0 +1,59 @@
+# conftest.py - 測試共用設定：讓測試能直接 import 專案根目錄的模組
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _wait_for(predicate, timeout=5.0, interval=0.01):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return False
+
+
+@pytest.fixture
+def wait_for():
+    """輪詢 predicate 直到成立或逾時（背景執行緒的測試用），回傳是否成立"""
+    return _wait_for
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """
+    以非認證模式匯入 app（需要 Flask）
+    先佔住排程鎖，背景初始化不會啟動排程；快取與專題設定檔寫在暫存目錄
+    """
+    pytest.importorskip('flask')
+    import fcntl
+
+    workdir = tmp_path_factory.mktemp('app')
+    lock_path = str(workdir / 'scheduler.lock')
+    lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    overrides = {'SUPABASE_URL': '', 'SUPABASE_KEY': '', 'GEMINI_API_KEY': '', 'SCHEDULER_LOCK_FILE': lock_path}
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    app.TOPICS_FILE = str(workdir / app.TOPICS_FILE)
+    app.DATA_CACHE_FILE = str(workdir / app.DATA_CACHE_FILE)
+    app.DATA_SNAPSHOT_FILE = str(workdir / app.DATA_SNAPSHOT_FILE)
+    yield app
+    os.close(lock_fd)
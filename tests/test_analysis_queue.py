@@ -0,0 +1,100 @@
+# test_analysis_queue.py - 角度分析工作佇列：去重、重試 / 放棄、租約逾時與續約
+import threading
+import time
+
+import analysis_queue
+
+
+def _queue(tmp_path, handler=None, **kwargs):
+    kwargs.setdefault('poll_seconds', 0.05)
+    return analysis_queue.AnalysisQueue(str(tmp_path / 'queue.db'), handler or (lambda job: None), **kwargs)
+
+
+def _status(queue, job_id):
+    return queue._conn().execute('SELECT status FROM analysis_jobs WHERE id = ?', (job_id,)).fetchone()[0]
+
+
+def test_enqueue_deduplicates_active_job(tmp_path):
+    queue = _queue(tmp_path)
+    job, created = queue.enqueue('u', 't', 'a1')
+    again, created_again = queue.enqueue('u', 't', 'a2')
+
+    assert created and not created_again
+    assert again['id'] == job['id'] and again['analysis_id'] == 'a1'
+    assert queue.enqueue('u', 'other', 'a3')[1]
+
+
+def test_worker_runs_job_once(tmp_path, wait_for):
+    ran = []
+    queue = _queue(tmp_path, ran.append, workers=2)
+    job, _ = queue.enqueue('u', 't', 'a1')
+    queue.start()
+
+    assert wait_for(lambda: queue.stats()['done'] == 1)
+    assert [j['id'] for j in ran] == [job['id']]
+    assert queue.find_active('u', 't') is None
+
+
+def test_failed_job_is_retried_then_given_up(tmp_path, wait_for):
+    attempts = []
+    given_up = []
+
+    def handler(job):
+        attempts.append(job['attempts'])
+        raise RuntimeError('boom')
+
+    queue = _queue(tmp_path, handler, workers=1, max_attempts=3,
+                   on_give_up=lambda job, error: given_up.append((job['id'], str(error))))
+    job, _ = queue.enqueue('u', 't', 'a1')
+    queue.start()
+
+    assert wait_for(lambda: given_up)
+    assert attempts == [1, 2, 3]
+    assert given_up == [(job['id'], 'boom')]
+    assert _status(queue, job['id']) == 'failed'
+    stats = queue.stats()
+    assert stats['retried_total'] == 2 and stats['failed_total'] == 1
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path):
+    first = _queue(tmp_path, lease_seconds=0.1)
+    second = _queue(tmp_path, lease_seconds=0.1)
+    second.worker_id = 'other-host:1'
+    first.enqueue('u', 't', 'a1')
+
+    claimed = first._claim()
+    assert claimed['attempts'] == 1
+    assert second._claim() is None  # 租約仍有效
+
+    time.sleep(0.15)
+    reclaimed = second._claim()
+    assert reclaimed['id'] == claimed['id'] and reclaimed['attempts'] == 2
+    assert not first._renew_lease(claimed)  # 已被其他程序取得，不再續約
+
+
+def test_lease_expired_too_often_is_given_up(tmp_path):
+    given_up = []
+    queue = _queue(tmp_path, lease_seconds=0.05, max_attempts=1,
+                   on_give_up=lambda job, error: given_up.append(job['id']))
+    job, _ = queue.enqueue('u', 't', 'a1')
+
+    assert queue._claim()['id'] == job['id']
+    time.sleep(0.1)
+    assert queue._claim() is None
+    assert given_up == [job['id']]
+    assert _status(queue, job['id']) == 'failed'
+
+
+def test_heartbeat_keeps_long_job_leased(tmp_path, wait_for):
+    release = threading.Event()
+    queue = _queue(tmp_path, lambda job: release.wait(5), workers=1, lease_seconds=0.3)
+    other = _queue(tmp_path, lease_seconds=0.3)
+    other.worker_id = 'other-host:1'
+    job, _ = queue.enqueue('u', 't', 'a1')
+    queue.start()
+
+    assert wait_for(lambda: _status(queue, job['id']) == 'running')
+    time.sleep(0.6)  # 超過兩倍租約時間
+    assert other._claim() is None
+    release.set()
+    assert wait_for(lambda: _status(queue, job['id']) == 'done')
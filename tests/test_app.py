@@ -0,0 +1,319 @@
+# test_app.py - app.py 中的抓取排程輔助函數（以非認證模式匯入 app）
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from feed_pipeline import envelope
+
+TAIPEI_TZ = ZoneInfo('Asia/Taipei')
+
+
+@pytest.fixture
+def app(app_module):
+    return app_module
+
+
+def test_iter_parallel_yields_finished_tasks_and_reports_stragglers(app):
+    release = threading.Event()
+    stragglers = []
+    tasks = [
+        ('fast', lambda: ['a'], (), {}),
+        ('slow', lambda: release.wait(5) and ['late'], (), {}),
+        ('broken', lambda: 1 / 0, (), {}),
+    ]
+    try:
+        results = dict(app.iter_parallel(tasks, max_workers=3, timeout=0.3, on_straggler=stragglers.append))
+    finally:
+        release.set()
+
+    assert results == {'fast': ['a'], 'broken': []}
+    assert stragglers == ['slow']
+
+
+def test_only_rss_sources_are_recorded_as_stragglers(app):
+    source = next(iter(app.RSS_SOURCES_INTL))
+    before = app.SOURCE_HEALTH.snapshot().get(source, {}).get('stragglers', 0)
+
+    app.record_rss_straggler(source)
+    app.record_rss_straggler('Google JP: 台灣 OR 選舉')
+
+    health = app.SOURCE_HEALTH.snapshot()
+    assert health[source]['stragglers'] == before + 1
+    assert 'Google JP: 台灣 OR 選舉' not in health
+
+
+def test_login_feeds_skip_source_that_misses_deadline(app, monkeypatch):
+    release = threading.Event()
+
+    def fake_snapshot(url, name):
+        if name == 'slow-intl':
+            release.wait(5)
+        return [{'title': name}]
+
+    monkeypatch.setattr(app, 'RSS_SOURCES_TW', {'tw-a': 'u1', 'tw-b': 'u2'})
+    monkeypatch.setattr(app, 'RSS_SOURCES_INTL', {'intl-a': 'u3', 'slow-intl': 'u4'})
+    monkeypatch.setattr(app, 'fetch_rss_snapshot', fake_snapshot)
+    try:
+        tw, intl = app.fetch_login_feeds(timeout=0.3)
+    finally:
+        release.set()
+
+    assert sorted(item['title'] for item in tw) == ['tw-a', 'tw-b']
+    assert [item['title'] for item in intl] == ['intl-a']
+    assert app.SOURCE_HEALTH.snapshot()['slow-intl']['stragglers'] == 1
+
+
+def test_rss_source_names_are_unique_across_groups(app):
+    assert not set(app.RSS_SOURCES_TW) & set(app.RSS_SOURCES_INTL)
+
+
+def _news(title, source, minutes_ago):
+    published = datetime.now(TAIPEI_TZ) - timedelta(minutes=minutes_ago)
+    return envelope({'title': title, 'link': f'https://example.com/{title}', 'source': source,
+                     'published': published, 'summary': ''})
+
+
+@pytest.fixture
+def fake_feeds(app, monkeypatch):
+    """每個來源回傳一則含來源名稱的新聞，抓取各花 0.2 秒；記錄 Google 查詢"""
+    google_queries = []
+
+    def fake_rss(url, name, **kwargs):
+        time.sleep(0.2)
+        return [_news(f'{name} 電價 energy', name, 5)]
+
+    def fake_snapshot(url, name):
+        return fake_rss(url, name)
+
+    def fake_google(query, region_code='TW', lang='zh-TW', max_items=50):
+        google_queries.append((region_code, query))
+        return []
+
+    monkeypatch.setattr(app, 'fetch_rss', fake_rss)
+    monkeypatch.setattr(app, 'fetch_rss_snapshot', fake_snapshot)
+    monkeypatch.setattr(app, 'fetch_google_news_query', fake_google)
+    monkeypatch.setattr(app, 'translate_for_display', lambda items, delay=0.5: 0)
+    monkeypatch.setattr(app, 'save_data_cache', lambda: None)
+    monkeypatch.setattr(app, 'TOPICS', {
+        'energy': {'name': '能源', 'keywords': {'zh': ['電價'], 'en': ['energy'], 'ja': [], 'ko': []},
+                   'negative_keywords': []},
+    })
+    return google_queries
+
+
+def test_single_topic_refresh_fetches_sources_in_parallel(app, fake_feeds):
+    started = time.perf_counter()
+    app.update_single_topic_news('energy')
+    elapsed = time.perf_counter() - started
+
+    serial = 0.2 * (len(app.RSS_SOURCES_TW) + len(app.RSS_SOURCES_INTL))
+    assert elapsed < serial / 2
+    assert len(app.DATA_STORE['topics']['energy']) == 10
+    assert len(app.DATA_STORE['international']['energy']) == min(10, len(app.RSS_SOURCES_INTL))
+    assert {region for region, _ in fake_feeds} >= {'US', 'FR'}
+
+
+def test_full_refresh_streams_into_topic_buffers(app, fake_feeds):
+    started = time.perf_counter()
+    app.update_topic_news()
+    elapsed = time.perf_counter() - started
+
+    serial = 0.2 * (len(app.RSS_SOURCES_TW) + len(app.RSS_SOURCES_INTL))
+    assert elapsed < serial / 2
+    titles = [item['title'] for item in app.DATA_STORE['topics']['energy']]
+    assert len(titles) == 10 and len(set(titles)) == 10
+    assert not app.LOADING_STATUS['is_loading']
+
+
+def test_retried_translation_persists_only_affected_topics(app, monkeypatch):
+    saved_all = []
+    saved_topics = []
+    monkeypatch.setattr(app, 'AUTH_ENABLED', True)
+    monkeypatch.setattr(app, 'save_data_cache', lambda: saved_all.append(True))
+    monkeypatch.setattr(app.auth, 'save_topic_cache_item',
+                        lambda user_id, tid, dom, intl, summary: saved_topics.append((user_id, tid, intl[0]['title'])))
+    monkeypatch.setitem(app.DATA_STORE, 'international', {'t1': [{'title': 'Hello', 'title_original': 'Hello'}]})
+    monkeypatch.setitem(app.DATA_STORE, 'user-a', {
+        'topics': {}, 'summaries': {},
+        'international': {'t1': [{'title': 'Hello', 'title_original': 'Hello', '_translation_failed': True}],
+                          't2': [{'title': 'Other', 'title_original': 'Other'}]},
+    })
+    monkeypatch.setitem(app.DATA_STORE, 'user-b', {'topics': {}, 'summaries': {}, 'international': {}})
+
+    app._apply_retried_translation('Hello', '你好')
+
+    assert saved_topics == [('user-a', 't1', '你好')]
+    assert saved_all == []  # 不會同步所有使用者
+    assert app.DATA_STORE['international']['t1'][0]['title'] == '你好'
+    assert '_translation_failed' not in app.DATA_STORE['user-a']['international']['t1'][0]
+
+
+def test_retried_translation_saves_local_cache_without_auth(app, monkeypatch):
+    saved_all = []
+    monkeypatch.setattr(app, 'save_data_cache', lambda: saved_all.append(True))
+    monkeypatch.setitem(app.DATA_STORE, 'international', {'t1': [{'title': 'Hello', 'title_original': 'Hello'}]})
+
+    app._apply_retried_translation('Hello', '你好')
+    app._apply_retried_translation('Hello', '你好')  # 已更新過，不再寫入
+
+    assert saved_all == [True]
+
+
+def test_invalid_supabase_settings_fall_back_to_non_auth(app, monkeypatch):
+    monkeypatch.setenv('SUPABASE_URL', 'not-a-url')
+    monkeypatch.setenv('SUPABASE_KEY', 'key')
+    monkeypatch.setattr(app.auth, '_supabase_client', None)
+    monkeypatch.setattr(app, 'AUTH_ENABLED', True)
+    monkeypatch.setattr(app, 'supabase', app._LazyProxy('supabase', app._create_supabase_client))
+    monkeypatch.setattr(app, 'ANALYSIS_QUEUE', object())  # 不應被啟動
+    monkeypatch.setattr(app, 'SEARCH_INDEX', object())
+
+    app._init_background_services()
+
+    assert app.AUTH_ENABLED is False
+    assert app.supabase is None
+    assert app.ANALYSIS_QUEUE is None
+    assert app.SEARCH_INDEX is None
+
+
+def test_non_leader_reloads_data_cache_written_by_leader(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'DATA_SNAPSHOT_FILE', str(tmp_path / 'data_cache.bin'))
+    monkeypatch.setattr(app, 'DATA_CACHE_FILE', str(tmp_path / 'data_cache.json'))
+    for key in ('topics', 'international', 'summaries', 'last_update', 'topic_owners'):
+        monkeypatch.setitem(app.DATA_STORE, key, app.DATA_STORE.get(key))
+    published = datetime(2026, 1, 1, 8, 0, tzinfo=TAIPEI_TZ)
+    app.DATA_STORE.update(topics={'t1': [envelope({'title': 'A', 'link': 'https://a', 'source': 's', 'published': published})]},
+                          international={}, summaries={}, last_update=published.isoformat())
+
+    app.save_data_cache()  # 自己寫入的檔案不需要重新載入
+    assert app.reload_data_cache_if_changed() is False
+
+    # 模擬 leader 寫入新資料：檔案內容與修改時間都改變
+    app.DATA_STORE['topics'] = {'t1': [envelope({'title': 'B', 'link': 'https://b', 'source': 's', 'published': published})]}
+    app.save_data_cache()
+    mtime = os.path.getmtime(app.DATA_SNAPSHOT_FILE) + 10
+    os.utime(app.DATA_SNAPSHOT_FILE, (mtime, mtime))
+    app.DATA_STORE['topics'] = {}
+
+    assert app.reload_data_cache_if_changed() is True
+    assert [n['title'] for n in app.DATA_STORE['topics']['t1']] == ['B']
+    assert app.reload_data_cache_if_changed() is False
+
+
+def test_plan_google_queries_groups_keywords_across_topics(app):
+    queries = app.plan_google_queries([['移工', '外勞'], ['Migrant Workers', '外勞', '移工'], ['migrant workers']])
+    assert queries == ['移工 OR 外勞 OR "Migrant Workers"']  # 不分大小寫去重，保留首次出現順序
+
+
+def test_plan_google_queries_single_keyword(app):
+    assert app.plan_google_queries(['地震']) == ['地震']
+    assert app.plan_google_queries([['  "能源"  ', '', None]]) == ['能源']
+    assert app.plan_google_queries([[]]) == []
+
+
+def test_plan_google_queries_splits_by_term_count(app):
+    keywords = [f'kw{i}' for i in range(app.GOOGLE_QUERY_MAX_TERMS * 2 + 1)]
+    queries = app.plan_google_queries([keywords])
+    assert [len(q.split(' OR ')) for q in queries] == [app.GOOGLE_QUERY_MAX_TERMS, app.GOOGLE_QUERY_MAX_TERMS, 1]
+    assert ' OR '.join(queries).split(' OR ') == keywords
+
+
+def test_plan_google_queries_splits_by_encoded_length(app, monkeypatch):
+    from urllib.parse import quote_plus
+    monkeypatch.setattr(app, 'GOOGLE_QUERY_MAX_ENCODED_CHARS', 60)
+    keywords = ['再生能源', '離岸風電', '太陽能', '儲能']  # 每個中文字編碼後 9 字元
+    queries = app.plan_google_queries([keywords])
+    assert len(queries) > 1
+    assert all(len(quote_plus(q)) <= 60 for q in queries)
+    assert ' OR '.join(queries).split(' OR ') == keywords
+
+    # 單一關鍵字超過上限時仍自成一個查詢，不會被丟棄
+    monkeypatch.setattr(app, 'GOOGLE_QUERY_MAX_ENCODED_CHARS', 5)
+    assert app.plan_google_queries([['再生能源', '儲能']]) == ['再生能源', '儲能']
+
+
+ANALYSIS_NEWS = [
+    {'published_at': '2026-01-02T08:00:00', 'source': '中央社', 'title': '離岸風電新進度', 'summary': '第三階段區塊開發'},
+    {'published_at': '2026-01-01T08:00:00', 'source': 'Reuters', 'title': 'Offshore wind', 'summary': 'Auction results'},
+]
+
+
+def test_analysis_fingerprint_is_stable_for_unchanged_input(app):
+    copy = [dict(item) for item in ANALYSIS_NEWS]
+    assert app.analysis_fingerprint(ANALYSIS_NEWS, '背景') == app.analysis_fingerprint(copy, '背景')
+    assert app.analysis_fingerprint(ANALYSIS_NEWS) == app.analysis_fingerprint(ANALYSIS_NEWS, '')
+
+
+def test_analysis_fingerprint_changes_with_summary_or_model(app, monkeypatch):
+    base = app.analysis_fingerprint(ANALYSIS_NEWS, '背景')
+    assert app.analysis_fingerprint(ANALYSIS_NEWS, '新的背景') != base
+
+    edited = [dict(ANALYSIS_NEWS[0], summary='第三階段區塊延後'), ANALYSIS_NEWS[1]]
+    assert app.analysis_fingerprint(edited, '背景') != base
+
+    monkeypatch.setattr(app, 'ANALYSIS_MODEL', app.ANALYSIS_MODEL + '-next')
+    assert app.analysis_fingerprint(ANALYSIS_NEWS, '背景') != base
+
+
+class _FakeTopicAngles:
+    """topic_angles 資料表的最小替身：支援 select/update + eq/order/limit 串接"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.values = None
+        self.filters = []
+
+    def select(self, columns):
+        return self
+
+    def update(self, values):
+        self.values = values
+        return self
+
+    def eq(self, key, value):
+        self.filters.append((key, value))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        matched = [row for row in self.rows if all(row.get(k) == v for k, v in self.filters)]
+        if self.values is not None:
+            for row in matched:
+                row.update(self.values)
+        return type('Result', (), {'data': [dict(row) for row in matched]})()
+
+
+def test_unchanged_analysis_input_reuses_cached_result(app, monkeypatch):
+    rows = [{'id': f'a{i}', 'user_id': 'u1', 'topic_id': 'wind', 'status': 'pending'} for i in range(3)]
+    monkeypatch.setattr(app, 'supabase', type('Supabase', (), {'table': lambda self, name: _FakeTopicAngles(rows)})())
+    monkeypatch.setattr(app, 'ANALYSIS_CACHE_STATS', {'hits': 0, 'misses': 0})
+    monkeypatch.setattr(app, 'set_archive_analysis_status', lambda *args: None)
+    inputs = {'summary': '背景'}
+    monkeypatch.setattr(app, '_load_analysis_inputs', lambda topic_id, user_id: (ANALYSIS_NEWS, inputs['summary']))
+    calls = []
+
+    def fake_analyze(topic_id, news_data, summary_context, raise_errors=False):
+        calls.append(summary_context)
+        return {'angles': [{'title': f'角度 {len(calls)}'}]}
+
+    monkeypatch.setattr(app, 'analyze_topic_angles', fake_analyze)
+
+    app._run_angle_analysis_task('wind', 'u1', 'a0')
+    app._run_angle_analysis_task('wind', 'u1', 'a1')  # 輸入未變：沿用 a0 的結果
+    assert calls == ['背景']
+    assert rows[1]['angles_data'] == rows[0]['angles_data']
+    assert app.ANALYSIS_CACHE_STATS == {'hits': 1, 'misses': 1}
+
+    inputs['summary'] = '新的背景'
+    app._run_angle_analysis_task('wind', 'u1', 'a2')  # 摘要改變：重新分析
+    assert calls == ['背景', '新的背景']
+    assert rows[2]['angles_data'] == {'angles': [{'title': '角度 2'}]}
@@ -0,0 +1,81 @@
+# test_feed_parser.py - 精簡解析器的三種格式、提早停止與 feedparser 相容性
+import time
+
+import pytest
+
+import feed_parser
+
+RSS2 = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>c</title>
+<item><title>第一則</title><link>https://example.com/1</link><guid>g1</guid>
+<description>摘要一</description><pubDate>Thu, 01 Jan 2026 08:00:00 +0800</pubDate>
+<source url="https://cna.com.tw">中央社</source></item>
+<item><title>第二則</title><link>https://example.com/2</link><dc:date>2026-01-01T01:00:00Z</dc:date></item>
+<item><title>第三則</title><link>https://example.com/3</link></item>
+</channel></rss>'''
+
+ATOM = '''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>f</title>
+<entry><title>Atom entry</title><link rel="alternate" href="https://example.com/a"/>
+<id>urn:a</id><content>內容</content><updated>2026-01-01T00:00:00Z</updated></entry>
+</feed>'''
+
+RDF = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+ xmlns:dc="http://purl.org/dc/elements/1.1/">
+<item rdf:about="https://example.com/r"><title>RDF item</title><link>https://example.com/r</link>
+<dc:date>2026-01-01T09:00:00+09:00</dc:date></item>
+</rdf:RDF>'''
+
+
+def _utc(year, month, day, hour):
+    return time.struct_time((year, month, day, hour, 0, 0, 0, 0, 0))[:6]
+
+
+def test_rss2_fields():
+    first, second, third = feed_parser.parse(RSS2)
+
+    assert (first['title'], first['link'], first['id'], first['summary']) == \
+        ('第一則', 'https://example.com/1', 'g1', '摘要一')
+    assert tuple(first['published_parsed'])[:6] == _utc(2026, 1, 1, 0)
+    assert first['source'] == {'title': '中央社', 'href': 'https://cna.com.tw'}
+    assert second['published_parsed'] is None
+    assert tuple(second['updated_parsed'])[:6] == _utc(2026, 1, 1, 1)
+    assert third['published_parsed'] is None and third['updated_parsed'] is None
+
+
+def test_atom_and_rdf():
+    (atom,) = feed_parser.parse(ATOM)
+    assert (atom['title'], atom['link'], atom['id'], atom['summary']) == \
+        ('Atom entry', 'https://example.com/a', 'urn:a', '內容')
+
+    (rdf,) = feed_parser.parse(RDF.encode('utf-8'))
+    assert rdf['id'] == 'https://example.com/r'
+    assert tuple(rdf['updated_parsed'])[:6] == _utc(2026, 1, 1, 0)
+
+
+def test_stops_at_max_items():
+    assert [e['title'] for e in feed_parser.parse(RSS2, max_items=2)] == ['第一則', '第二則']
+
+
+@pytest.mark.parametrize('content', [
+    '',
+    '<html><body>not a feed</body></html>',
+    '<rss><channel><item><title>broken',
+    '<rss><channel><item><pubDate>yesterday</pubDate></item></channel></rss>',
+    '<feed xmlns="http://www.w3.org/2005/Atom"><entry><title type="html">&lt;b&gt;x</title></entry></feed>',
+])
+def test_unexpected_input_raises_unsupported(content):
+    with pytest.raises(feed_parser.UnsupportedFeed):
+        feed_parser.parse(content)
+
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')  # feedparser 的 updated_parsed 對應提示
+def test_matches_feedparser_fields():
+    feedparser = pytest.importorskip('feedparser')
+    expected = feedparser.parse(RSS2).entries
+    for ours, theirs in zip(feed_parser.parse(RSS2), expected):
+        assert ours['title'] == theirs.get('title')
+        assert ours['link'] == theirs.get('link')
+        for key in ('published_parsed', 'updated_parsed'):  # 呼叫端只取前 6 欄
+            assert (ours[key] and tuple(ours[key])[:6]) == (theirs.get(key) and tuple(theirs.get(key))[:6])
@@ -0,0 +1,86 @@
+# test_feed_pipeline.py - RSS 內容 → 正規化新聞與專題分派
+from datetime import timedelta, timezone
+
+import pytest
+
+import feed_pipeline
+
+TW = timezone(timedelta(hours=8))
+
+RSS = '''<rss version="2.0"><channel>
+<item><title>台電宣布電價調整</title><link>https://example.com/power</link><guid>g1</guid>
+<description>經濟部說明</description><pubDate>Thu, 01 Jan 2026 00:00:00 GMT</pubDate></item>
+<item><title>颱風假消息</title><link>https://www.facebook.com/post/1</link><guid>g2</guid></item>
+<item><title>   </title><link>https://example.com/empty</link><guid>g3</guid></item>
+<item><title>電動車補助延長</title><link>https://example.com/ev</link><guid>g4</guid>
+<pubDate>Thu, 01 Jan 2026 01:00:00 GMT</pubDate></item>
+</channel></rss>'''
+
+
+def test_keyword_match_with_negative_keywords():
+    assert feed_pipeline.keyword_match('台電電價調整', ['電價'])
+    assert not feed_pipeline.keyword_match('台電電價調整', ['電價'], ['台電'])
+    assert not feed_pipeline.keyword_match('', ['電價'])
+    assert feed_pipeline.keyword_match('OpenAI News', ['openai'])
+
+
+def test_parse_and_route_normalizes_and_filters():
+    keys, items, used_fallback = feed_pipeline.parse_and_route(RSS, '中央社', TW)
+
+    assert keys == ['g1', 'g2', 'g3', 'g4']
+    assert not used_fallback
+    assert [item['title'] for item in items] == ['台電宣布電價調整', '電動車補助延長']  # 略過社群連結與空標題
+    first = items[0]
+    assert first['source'] == '中央社'
+    assert first['published'].isoformat() == '2026-01-01T08:00:00+08:00'
+    assert first['summary'] == '經濟部說明'
+
+
+def test_seen_keys_skip_already_processed_entries():
+    keys, items, _ = feed_pipeline.parse_and_route(RSS, '中央社', TW, seen_keys={'g1'})
+    assert keys == ['g1', 'g2', 'g3', 'g4']  # 游標仍看到全部項目
+    assert [item['title'] for item in items] == ['電動車補助延長']
+
+
+def test_routes_assign_topic_ids():
+    routes = {
+        'energy': (['電價', '電動車'], None),
+        'ev': (['電動車'], ['補助']),
+        'weather': (['颱風'], None),
+    }
+    _, items, _ = feed_pipeline.parse_and_route(RSS, '中央社', TW, routes=routes)
+    assert [item['topic_ids'] for item in items] == [['energy'], ['energy']]
+
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')  # feedparser 的 updated_parsed 對應提示
+def test_falls_back_to_feedparser_for_unsupported_feed():
+    pytest.importorskip('feedparser')
+    content = '<rss><channel><item><title>日期格式怪</title><link>https://example.com/x</link>' \
+              '<pubDate>yesterday</pubDate></item></channel></rss>'
+    keys, items, used_fallback = feed_pipeline.parse_and_route(content, 'x', TW)
+    assert used_fallback
+    assert [item['title'] for item in items] == ['日期格式怪']
+
+
+def test_canonical_url_drops_tracking_and_fragment():
+    assert feed_pipeline.canonical_url('HTTPS://Example.com/news/1/?utm_source=x&id=5&fbclid=y#top') == \
+        'https://example.com/news/1?id=5'
+    assert feed_pipeline.canonical_url('') == ''
+
+
+def test_envelope_is_computed_once_and_not_persisted():
+    item = feed_pipeline.envelope({'title': 'Title', 'title_original': 'Original', 'summary': 'Body',
+                                   'link': 'https://example.com/a?utm_medium=rss', 'published': '2026-01-01T00:00:00+00:00'})
+    assert item['hash'] == feed_pipeline.hashlib.md5(b'Original').hexdigest()
+    assert item['_match'] == 'title body'
+    assert item['_url'] == 'https://example.com/a'
+    assert item['_ts'] == 1767225600.0
+
+    item['title'] = 'Changed'
+    assert feed_pipeline.match_text(item) == 'title body'  # 沿用已算好的欄位
+    assert feed_pipeline.persisted(item) == {
+        'title': 'Changed', 'title_original': 'Original', 'summary': 'Body',
+        'link': 'https://example.com/a?utm_medium=rss', 'published': '2026-01-01T00:00:00+00:00',
+        'hash': item['hash'],
+    }
+    assert feed_pipeline.item_ts({'published': 'not a date'}) == 0.0
@@ -0,0 +1,93 @@
+# test_load_admission.py - 使用者載入的准入控制：優先順序、合併、上限與並行數
+import threading
+import time
+
+import load_admission
+
+
+class BlockingHandler:
+    """第一個工作卡住，讓後續工作排隊，之後依序記錄執行順序"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def __call__(self, user_id, max_age):
+        self.calls.append((user_id, max_age))
+        self.started.set()
+        self.release.wait(5)
+
+
+def test_active_users_run_before_new_ones(wait_for):
+    handler = BlockingHandler()
+    queue = load_admission.LoadAdmission(handler, workers=1)
+    queue.submit('first')
+    assert handler.started.wait(5)
+
+    queue.submit('new-1')
+    queue.submit('new-2')
+    queue.submit('polling', priority=load_admission.PRIORITY_ACTIVE)
+    queue.touch('new-2')
+    assert queue.stats()['pending_active'] == 2
+
+    handler.release.set()
+    assert wait_for(lambda: queue.stats()['completed'] == 4)
+    assert [user for user, _ in handler.calls] == ['first', 'new-2', 'polling', 'new-1']
+    assert queue.stats()['promoted'] == 1
+
+
+def test_duplicate_submit_merges_scope(wait_for):
+    handler = BlockingHandler()
+    queue = load_admission.LoadAdmission(handler, workers=1)
+    queue.submit('first')
+    assert handler.started.wait(5)
+
+    queue.submit('u', max_age=600)
+    queue.submit('u', max_age=300)
+    queue.submit('u', max_age=900)
+    queue.submit('v', max_age=600)
+    queue.submit('v', max_age=None)  # None = 全部專題
+
+    handler.release.set()
+    assert wait_for(lambda: queue.stats()['completed'] == 3)
+    assert handler.calls[1:] == [('u', 300), ('v', None)]
+    assert queue.stats()['deduplicated'] == 3
+
+
+def test_rejects_when_queue_is_full():
+    handler = BlockingHandler()
+    queue = load_admission.LoadAdmission(handler, workers=1, max_pending=1)
+    queue.submit('first')
+    assert handler.started.wait(5)
+
+    assert queue.submit('a')
+    assert queue.submit('a')   # 已在佇列中，合併不算新的一筆
+    assert not queue.submit('b')
+    assert queue.stats()['rejected'] == 1
+    handler.release.set()
+
+
+def test_concurrency_never_exceeds_workers_and_failures_are_counted(wait_for):
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def handler(user_id, max_age):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        if user_id.endswith('7'):
+            raise RuntimeError('boom')
+
+    queue = load_admission.LoadAdmission(handler, workers=3)
+    for i in range(20):
+        queue.submit(f'user-{i}')
+
+    assert wait_for(lambda: queue.stats()['completed'] + queue.stats()['failed'] == 20)
+    stats = queue.stats()
+    assert peak[0] <= 3
+    assert stats['failed'] == 2 and stats['running'] == 0 and stats['pending'] == 0
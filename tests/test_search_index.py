@@ -0,0 +1,69 @@
+# test_search_index.py - 全文索引的斷詞、查詢與使用者隔離
+import pytest
+
+import search_index
+
+pytestmark = pytest.mark.skipif(not search_index.fts5_available(), reason='SQLite 未支援 FTS5')
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = search_index.SearchIndex(str(tmp_path / 'search.db'))
+    idx.add('u', 't1', [
+        {'news_hash': 'h1', 'title': '台灣選舉結果出爐', 'summary': 'Turnout hit 70%', 'source': '中央社', 'published_ts': 100},
+        {'news_hash': 'h2', 'title': '美國大選辯論', 'summary': '', 'source': 'BBC', 'published_ts': 200},
+    ])
+    idx.add('u', 't2', [
+        {'news_hash': 'h3', 'title': '颱風逼近台灣', 'summary': '', 'source': '中央社', 'published_ts': 300},
+    ])
+    idx.add('someone-else', 't1', [
+        {'news_hash': 'h9', 'title': '台灣選舉', 'summary': '', 'source': '中央社', 'published_ts': 400},
+    ])
+    return idx
+
+
+def _hashes(idx, query='', **kwargs):
+    results, _ = idx.search('u', query, **kwargs)
+    return [r['news_hash'] for r in results]
+
+
+def test_tokenize_uses_cjk_bigrams_and_lowercase_words():
+    assert search_index.tokenize('台灣選舉 AI News') == ['台灣', '灣選', '選舉', 'ai', 'news']
+    assert search_index.tokenize('颱') == ['颱']
+
+
+def test_phrase_search_is_scoped_to_user(index):
+    assert _hashes(index, '選舉') == ['h1']
+    assert sorted(_hashes(index, '台灣')) == ['h1', 'h3']
+    assert _hashes(index, 'turnout') == ['h1']
+
+
+def test_single_cjk_character_matches_end_of_run(index):
+    # 「灣」只出現在 bigram「台灣」的第二個字
+    assert sorted(_hashes(index, '灣')) == ['h1', 'h3']
+    assert _hashes(index, '灣 選舉') == ['h1']
+
+
+def test_like_fallback_escapes_wildcards(index):
+    assert _hashes(index, '%') == ['h3', 'h2', 'h1']  # 沒有可索引的字元，等同空查詢
+    match, like_terms = search_index.build_match_query('灣%')
+    assert match == '' and like_terms == ['灣%']
+    assert _hashes(index, '灣%') == []
+
+
+def test_filters_and_empty_query_order_by_time(index):
+    assert _hashes(index) == ['h3', 'h2', 'h1']
+    assert _hashes(index, topic_id='t1') == ['h2', 'h1']
+    assert _hashes(index, source='BBC') == ['h2']
+    assert _hashes(index, date_from=150, date_to=300) == ['h2']
+
+
+def test_re_adding_updates_and_delete_topic_removes(index):
+    index.add('u', 't1', [{'news_hash': 'h1', 'title': '地震消息', 'summary': '', 'published_ts': 100}])
+    assert _hashes(index, '選舉') == []
+    assert _hashes(index, '地震') == ['h1']
+    assert index.count('u') == 3
+
+    index.delete_topic('u', 't1')
+    assert _hashes(index) == ['h3']
+    assert index.count() == 2
@@ -0,0 +1,77 @@
+# test_snapshot.py - 二進位快照的寫入 / 讀回
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import snapshot
+
+TW = timezone(timedelta(hours=8))
+
+
+def _roundtrip(tmp_path, topics=None, international=None, summaries=None, last_update=None, tz=TW):
+    path = tmp_path / 'data_cache.bin'
+    snapshot.write_snapshot(str(path), topics or {}, international or {}, summaries or {}, last_update)
+    return snapshot.read_snapshot(str(path), tz)
+
+
+def test_roundtrip_keeps_fields_and_kinds(tmp_path):
+    news = {
+        'title': '台灣選舉', 'link': 'https://example.com/a', 'source': '中央社',
+        'published': datetime(2026, 1, 1, 20, tzinfo=TW), 'summary': '摘要', 'hash': 'h1',
+    }
+    intl = {
+        'title': '翻譯後', 'title_original': 'Translated', 'link': 'https://example.com/b', 'source': 'BBC',
+        'published': datetime(2026, 1, 2, tzinfo=TW), 'summary': '', 'is_date_only': True,
+    }
+    result = _roundtrip(tmp_path, {'t1': [news]}, {'world': [intl]}, {'t1': '今日摘要'}, '2026-01-01T20:00:00')
+
+    assert result['topics']['t1'] == [news]
+    assert result['international']['world'] == [intl]
+    assert result['summaries'] == {'t1': '今日摘要'}
+    assert result['last_update'] == '2026-01-01T20:00:00'
+
+
+def _write(tmp_path, topics):
+    path = tmp_path / 'data_cache.bin'
+    snapshot.write_snapshot(str(path), topics, {}, {}, None, tz=TW)
+    return snapshot.read_snapshot(str(path), TW)
+
+
+def test_naive_datetimes_use_app_timezone(tmp_path):
+    items = [
+        {'title': 'a', 'published': datetime(2026, 1, 1, 20)},
+        {'title': 'b', 'published': '2026-01-01T20:00:00'},
+        {'title': 'c', 'published': None},
+    ]
+    a, b, c = _write(tmp_path, {'t': items})['topics']['t']
+
+    # 與 JSON 快取 / API 相同：無時區的時間是台北時間，讀回時不會偏移
+    expected = datetime(2026, 1, 1, 20, tzinfo=TW)
+    assert a['published'] == expected and a['published'].replace(tzinfo=None) == datetime(2026, 1, 1, 20)
+    assert b['published'] == expected
+    assert c['published'] is None
+
+
+def test_naive_datetimes_default_to_utc(tmp_path):
+    path = tmp_path / 'data_cache.bin'
+    snapshot.write_snapshot(str(path), {'t': [{'title': 'a', 'published': datetime(2026, 1, 1, 12)}]}, {}, {}, None)
+    (a,) = snapshot.read_snapshot(str(path), TW)['topics']['t']
+    assert a['published'] == datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / 'data_cache.bin'
+    snapshot.write_snapshot(str(path), {'t': [{'title': 'a', 'published': None}]}, {}, {}, None)
+    data = path.read_bytes()
+    path.write_bytes(data[:-snapshot._REC_HEADER.size])
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.read_snapshot(str(path), TW)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / 'data_cache.bin'
+    path.write_bytes(b'NOTASNAP' + b'\0' * 16)
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.read_snapshot(str(path), TW)
@@ -0,0 +1,76 @@
+# test_source_health.py - 斷路器狀態轉換與退避冷卻
+import pytest
+
+import source_health
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(source_health, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def health(clock):
+    return source_health.SourceHealth(failure_threshold=3, base_cooldown=300, max_cooldown=1200)
+
+
+def _fail(health, name, times=1):
+    for _ in range(times):
+        health.record_failure(name, 0.1, 'timeout')
+
+
+def test_opens_after_consecutive_failures(health):
+    _fail(health, 'feed', 2)
+    assert health.allow('feed')
+    _fail(health, 'feed')
+
+    assert not health.allow('feed')
+    state = health.snapshot()['feed']
+    assert state['state'] == source_health.OPEN
+    assert state['skipped'] == 1
+    assert state['error_rate'] == 1.0
+
+
+def test_success_resets_failure_count(health):
+    _fail(health, 'feed', 2)
+    health.record_success('feed', 0.2)
+    _fail(health, 'feed', 2)
+    assert health.allow('feed')
+
+
+def test_half_open_lets_one_probe_through(health, clock):
+    _fail(health, 'feed', 3)
+    clock.now += 300
+
+    assert health.allow('feed')
+    assert not health.allow('feed')  # 探測進行中
+    health.record_success('feed', 0.2)
+    assert health.allow('feed')
+    assert health.snapshot()['feed']['state'] == source_health.CLOSED
+
+
+def test_failed_probe_doubles_cooldown_up_to_cap(health, clock):
+    _fail(health, 'feed', 3)
+    for expected in (600, 1200, 1200):
+        clock.now = health.snapshot()['feed']['open_until']
+        assert health.allow('feed')
+        _fail(health, 'feed')
+        assert health.snapshot()['feed']['open_until'] == clock.now + expected
+
+
+def test_latency_is_smoothed(health):
+    health.record_success('feed', 1.0)
+    health.record_success('feed', 2.0)
+    state = health.snapshot()['feed']
+    assert state['last_latency_ms'] == 2000.0
+    assert state['latency_ms'] == 1300.0
@@ -0,0 +1,77 @@
+# test_source_schedule.py - 自適應抓取間隔、游標與到期判斷
+import pytest
+
+import source_schedule
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(source_schedule, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def scheduler(clock):
+    sched = source_schedule.SourceScheduler(min_interval=900, max_interval=21600, target_new_per_poll=5, alpha=0.5)
+    sched.register('busy', 'domestic', 1800)
+    sched.register('quiet', 'domestic', 1800)
+    return sched
+
+
+def test_unpolled_sources_are_due(scheduler):
+    assert scheduler.due(['busy', 'quiet', 'unregistered']) == ['busy', 'quiet', 'unregistered']
+
+
+def test_observe_counts_only_new_keys_and_advances_cursor(scheduler):
+    scheduler.observe('busy', ['a', 'b', ''])
+    assert scheduler.seen_keys('busy') == {'a', 'b'}
+    scheduler.observe('busy', ['a', 'b', 'c'])
+    assert scheduler.snapshot()['busy']['last_new'] == 1
+    assert scheduler.seen_keys('missing') == set()
+
+
+def test_cursor_is_bounded(clock):
+    sched = source_schedule.SourceScheduler(seen_limit=3)
+    sched.register('s', 'domestic', 1800)
+    sched.observe('s', ['a', 'b', 'c'])
+    sched.observe('s', ['a', 'd'])  # a 重新出現，最舊的 b 被擠出
+    assert sched.seen_keys('s') == {'c', 'a', 'd'}
+
+
+def test_interval_adapts_to_rate(scheduler, clock):
+    scheduler.observe('busy', [])
+    scheduler.observe('quiet', [])
+    clock.now += 3600
+    scheduler.observe('busy', [f'n{i}' for i in range(40)])  # 40 則/小時
+    scheduler.observe('quiet', [])                            # 0 則/小時
+
+    state = scheduler.snapshot()
+    assert state['busy']['interval_minutes'] == 15.0   # 5 / 40 小時 < 最小間隔
+    assert state['quiet']['interval_minutes'] == 360.0
+
+
+def test_mark_polled_skips_sources_not_observed_this_cycle(scheduler, clock):
+    cycle_start = clock.now
+    clock.now += 1
+    scheduler.observe('busy', ['a'])
+    scheduler.mark_polled(['busy', 'quiet'], observed_since=cycle_start)
+
+    assert scheduler.due(['busy', 'quiet']) == ['quiet']
+    clock.now += 1800
+    assert scheduler.due(['busy', 'quiet']) == ['busy', 'quiet']
+
+
+def test_register_keeps_existing_state(scheduler):
+    scheduler.observe('busy', ['a'])
+    scheduler.register('busy', 'domestic', 60)
+    assert scheduler.seen_keys('busy') == {'a'}
+    assert scheduler.snapshot()['busy']['interval_minutes'] == 30.0
@@ -0,0 +1,60 @@
+# test_store.py - DATA_STORE 後端（memory / sqlite）的共同行為
+from datetime import datetime
+
+import pytest
+
+import store
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    return store.create_store(request.param, str(tmp_path / 'store.db'))
+
+
+def test_versions_increase_on_every_write(backend):
+    assert backend.user_version('u') == 0
+    v1 = backend.put_topic('u', 't1', [], [], {})
+    v2 = backend.put_user_meta('u', {'is_loading': True})
+    v3 = backend.put_topic('u', 't2', [], [], {})
+    assert v1 < v2 < v3 == backend.user_version('u')
+
+
+def test_get_user_returns_topics_and_merged_meta(backend):
+    published = datetime(2026, 1, 1, 12)
+    news = [{'title': 'a', 'published': published, '_key': 'scratch'}]
+    backend.put_topic('u', 't1', news, [], {'text': '摘要'})
+    backend.put_user_meta('u', {'last_update': 'x'})
+    backend.put_user_meta('u', {'is_loading': False})
+
+    user = backend.get_user('u')
+    assert user['meta'] == {'last_update': 'x', 'is_loading': False}
+    topic = user['topics']['t1']
+    assert topic['topics'][0]['title'] == 'a'
+    assert topic['topics'][0]['published'] == published
+    assert topic['summary'] == {'text': '摘要'}
+    assert backend.get_user('nobody') is None
+
+
+def test_delete_topic_only_bumps_version_when_present(backend):
+    backend.put_topic('u', 't1', [], [], {})
+    version = backend.user_version('u')
+    backend.delete_topic('u', 'missing')
+    assert backend.user_version('u') == version
+    backend.delete_topic('u', 't1')
+    assert backend.user_version('u') == version + 1
+    assert 't1' not in backend.get_user('u')['topics']
+
+
+def test_sqlite_store_drops_scratch_fields_and_is_shared(tmp_path):
+    path = str(tmp_path / 'store.db')
+    writer = store.SQLiteStore(path)
+    reader = store.SQLiteStore(path)
+    writer.put_topic('u', 't1', [{'title': 'a', '_key': 'scratch'}], [], {})
+
+    assert reader.user_version('u') == 1
+    assert reader.get_user('u')['topics']['t1']['topics'] == [{'title': 'a'}]
+    assert reader.list_users() == ['u']
+
+
+def test_unknown_backend_falls_back_to_memory():
+    assert isinstance(store.create_store('redis'), store.MemoryStore)
@@ -0,0 +1,60 @@
+# test_topic_buffer.py - 專題 top-K 緩衝區的去重、擠出與重建
+import topic_buffer
+
+
+def _news(title, ts):
+    return {'title': title, '_ts': float(ts)}
+
+
+def _titles(buf):
+    return [item['title'] for item in buf.items()]
+
+
+def test_keeps_newest_k_in_order():
+    buf = topic_buffer.TopKBuffer(capacity=3)
+    for ts in [5, 1, 4, 2, 3]:
+        buf.add(_news(f'n{ts}', ts))
+
+    assert _titles(buf) == ['n5', 'n4', 'n3']
+    assert buf.missing() == 0
+
+
+def test_rejects_duplicates_and_older_than_oldest():
+    buf = topic_buffer.TopKBuffer(capacity=2)
+    assert buf.add(_news('a', 10))
+    assert not buf.add(_news('a', 20))  # 同標題 = 同 hash
+    assert buf.add(_news('b', 5))
+    assert not buf.admits(_news('c', 1))
+    assert not buf.add(_news('c', 1))
+    assert buf.missing() == 0
+
+
+def test_evicted_items_are_not_readmitted():
+    buf = topic_buffer.TopKBuffer(capacity=1)
+    buf.add(_news('old', 1))
+    buf.add(_news('new', 2))
+
+    old_hash = topic_buffer.item_hash(_news('old', 1))
+    assert old_hash in buf
+    assert not buf.add(_news('old', 3))
+    assert _titles(buf) == ['new']
+
+
+def test_evicted_memory_is_bounded():
+    buf = topic_buffer.TopKBuffer(capacity=1, evicted_limit=2)
+    for ts in range(1, 5):
+        buf.add(_news(f'n{ts}', ts))
+    assert buf.add(_news('n1', 10))  # 最早被擠出的已被遺忘
+
+
+def test_reset_from_rebuilds_and_forgets_readded_evictions():
+    buf = topic_buffer.TopKBuffer(capacity=2)
+    buf.add(_news('a', 1))
+    buf.add(_news('b', 2))
+    buf.add(_news('c', 3))  # 擠出 a
+    buf.published = buf.items()
+
+    buf.reset_from([_news('a', 1), _news('d', 4), _news('e', 5), _news('d', 4)])
+    assert _titles(buf) == ['e', 'd']
+    assert buf.published is None
+    assert topic_buffer.item_hash(_news('a', 1)) in buf  # 重建時再被擠出，仍記得
@@ -0,0 +1,73 @@
+# test_translation_retry.py - 翻譯重試佇列的退避、去重、上限與放棄
+import threading
+
+import translation_retry
+
+
+def test_backoff_doubles_with_jitter_and_cap():
+    queue = translation_retry.TranslationRetryQueue(None, None, base_delay=30, max_delay=200)
+    for attempts, base in ((0, 30), (1, 60), (2, 120), (3, 200), (6, 200)):
+        for _ in range(20):
+            assert base * 0.9 <= queue._backoff(attempts) <= base * 1.1
+
+
+def test_enqueue_deduplicates_and_bounds_pending():
+    queue = translation_retry.TranslationRetryQueue(lambda text: None, None, base_delay=3600, max_pending=2)
+    assert queue.enqueue('a')
+    assert not queue.enqueue('a')
+    assert queue.enqueue('b')
+    assert not queue.enqueue('c')
+    assert not queue.enqueue('')
+
+    stats = queue.stats()
+    assert stats['pending'] == 2 and stats['enqueued'] == 2 and stats['dropped'] == 1
+    assert 'a' in queue and 'c' not in queue
+
+
+def test_success_after_retries_calls_on_success_once():
+    calls = []
+    results = {}
+    done = threading.Event()
+
+    def translate(text):
+        calls.append(text)
+        return '翻譯' if len(calls) >= 3 else None
+
+    def on_success(text, translated):
+        results[text] = translated
+        done.set()
+
+    queue = translation_retry.TranslationRetryQueue(translate, on_success, base_delay=0.01, max_delay=0.02)
+    queue.enqueue('Hello', delay=0)
+
+    assert done.wait(5)
+    assert calls == ['Hello'] * 3
+    assert results == {'Hello': '翻譯'}
+    assert not queue.enqueue('Hello')  # 已處理完的原文不再排入
+    stats = queue.stats()
+    assert stats['succeeded'] == 1 and stats['retried'] == 2 and stats['pending'] == 0
+
+
+def test_gives_up_after_max_attempts_and_survives_errors(wait_for):
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        raise RuntimeError('429')
+
+    queue = translation_retry.TranslationRetryQueue(translate, None, base_delay=0.01, max_delay=0.02, max_attempts=3)
+    queue.enqueue('Hello', delay=0)
+
+    assert wait_for(lambda: queue.stats()['given_up'] == 1)
+    assert len(calls) == 3
+    assert 'Hello' not in queue
+    assert not queue.enqueue('Hello')
+
+
+def test_settled_memory_is_bounded(wait_for):
+    queue = translation_retry.TranslationRetryQueue(lambda text: 'ok', lambda *args: None,
+                                                    base_delay=0, settled_limit=2)
+    for text in ('a', 'b', 'c'):
+        queue.enqueue(text, delay=0)
+    assert wait_for(lambda: queue.stats()['succeeded'] == 3)
+    assert queue.enqueue('a')  # 最早處理完的已被遺忘
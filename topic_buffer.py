@@ -0,0 +1,83 @@
+# topic_buffer.py - 每個專題的新聞 top-K 緩衝區
+# 以發布時間的 min-heap 保留最新的 K 則，hash 索引 O(1) 拒絕重複；被擠出的新聞記住 hash，之後不會再被補回
+
+import heapq
+import itertools
+from collections import OrderedDict
+
+from feed_pipeline import item_hash, item_ts
+
+
+class TopKBuffer:
+    """
+    capacity: 保留的則數（首頁每個專題顯示 10 則）
+    evicted_limit: 記住多少個被擠出的 hash
+    published: 最近一次 items() 寫回 DATA_STORE 的列表，用來判斷緩衝區是否仍與 DATA_STORE 一致
+    """
+
+    def __init__(self, capacity=10, evicted_limit=500):
+        self.capacity = capacity
+        self.evicted_limit = evicted_limit
+        self._heap = []       # (ts, 插入序號, hash)，最舊的在頂端
+        self._index = {}      # hash -> item
+        self._evicted = OrderedDict()
+        self._seq = itertools.count()
+        self.published = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, news_hash):
+        """目前在緩衝區內，或曾經被擠出"""
+        return news_hash in self._index or news_hash in self._evicted
+
+    def missing(self):
+        """還差幾則才滿（Google News 補充用）"""
+        return self.capacity - len(self._index)
+
+    def admits(self, item):
+        """新增這則新聞是否會留在緩衝區（不重複、且比目前最舊的一則新；未滿時一律接受）"""
+        if item_hash(item) in self:
+            return False
+        return len(self._index) < self.capacity or item_ts(item) > self._heap[0][0]
+
+    def add(self, item):
+        """O(log K) 插入；重複、曾被擠出或比最舊的一則還舊時回傳 False"""
+        if not self.admits(item):
+            return False
+        h = item_hash(item)
+        self._index[h] = item
+        entry = (item_ts(item), next(self._seq), h)
+        if len(self._index) > self.capacity:
+            _, _, old = heapq.heappushpop(self._heap, entry)
+            del self._index[old]
+            self._remember_evicted(old)
+        else:
+            heapq.heappush(self._heap, entry)
+        return True
+
+    def _remember_evicted(self, news_hash):
+        self._evicted[news_hash] = None
+        while len(self._evicted) > self.evicted_limit:
+            self._evicted.popitem(last=False)
+
+    def reset_from(self, items):
+        """以現有列表重建（DATA_STORE 被其他路徑改寫時），保留已記住的被擠出 hash"""
+        self._heap = []
+        self._index = {}
+        for item in items:
+            h = item_hash(item)
+            if h in self._index:
+                continue
+            self._evicted.pop(h, None)
+            self._index[h] = item
+            heapq.heappush(self._heap, (item_ts(item), next(self._seq), h))
+        while len(self._index) > self.capacity:
+            _, _, old = heapq.heappop(self._heap)
+            del self._index[old]
+            self._remember_evicted(old)
+        self.published = None
+
+    def items(self):
+        """新到舊排序的列表"""
+        return [self._index[h] for _, _, h in sorted(self._heap, reverse=True)]
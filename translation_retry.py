@@ -0,0 +1,128 @@
+# translation_retry.py - 翻譯失敗的延後重試佇列
+# 失敗或尚未翻譯的標題依下次重試時間放進 min-heap；單一背景執行緒以指數退避重試，成功後交給回呼就地更新
+# 更新流程只負責 enqueue，不會在翻譯重試上等待
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import OrderedDict
+
+
+class TranslationRetryQueue:
+    """
+    translate(text) 回傳翻譯結果，失敗時回傳 None
+    on_success(text, translated) 在背景執行緒中呼叫
+    同一段原文只會排隊一次；超過 max_attempts 次仍失敗就放棄（保留原文顯示）
+    已處理完（成功或放棄）的原文記住最近 settled_limit 筆，不再排入
+    （翻譯結果與原文相同的標題看起來仍像未翻譯，不會因此反覆重試）
+    """
+
+    def __init__(self, translate, on_success, base_delay=30, max_delay=1800, max_attempts=6, max_pending=1000,
+                 settled_limit=5000):
+        self.translate = translate
+        self.on_success = on_success
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.settled_limit = settled_limit
+
+        self._heap = []           # (下次重試時間, 序號, 原文)
+        self._attempts = {}       # 原文 -> 已重試次數（在佇列中的才有）
+        self._settled = OrderedDict()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._metrics = {'enqueued': 0, 'succeeded': 0, 'retried': 0, 'given_up': 0, 'dropped': 0}
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker_loop, name='translation-retry', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, text, delay=None):
+        """排入重試；已在佇列中、最近已處理過或佇列已滿時回傳 False（第一次排入時才啟動背景執行緒）"""
+        if not text:
+            return False
+        self.start()
+        with self._cond:
+            if text in self._attempts or text in self._settled:
+                return False
+            if len(self._attempts) >= self.max_pending:
+                self._metrics['dropped'] += 1
+                return False
+            self._attempts[text] = 0
+            heapq.heappush(self._heap, (time.time() + (self.base_delay if delay is None else delay), next(self._seq), text))
+            self._metrics['enqueued'] += 1
+            self._cond.notify()
+            return True
+
+    def __contains__(self, text):
+        with self._cond:
+            return text in self._attempts
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._metrics)
+            stats['pending'] = len(self._attempts)
+            stats['next_retry_in'] = round(max(self._heap[0][0] - time.time(), 0), 1) if self._heap else None
+            return stats
+
+    def _settle(self, text):
+        # 呼叫端持有 self._cond
+        del self._attempts[text]
+        self._settled[text] = None
+        while len(self._settled) > self.settled_limit:
+            self._settled.popitem(last=False)
+
+    def _backoff(self, attempts):
+        """30、60、120… 秒，上限 max_delay，加上 ±10% 抖動避免同時重試"""
+        delay = min(self.base_delay * (2 ** attempts), self.max_delay)
+        return delay * random.uniform(0.9, 1.1)
+
+    def _next_due(self):
+        """等到最早的一筆到期後取出（在 worker 執行緒中呼叫）"""
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, text = heapq.heappop(self._heap)
+                return text, self._attempts[text]
+
+    def _worker_loop(self):
+        while True:
+            text, attempts = self._next_due()
+            try:
+                translated = self.translate(text)
+            except Exception as e:
+                print(f"[TRANSLATE] 重試翻譯發生錯誤: {e}")
+                translated = None
+
+            if translated:
+                with self._cond:
+                    self._settle(text)
+                    self._metrics['succeeded'] += 1
+                try:
+                    self.on_success(text, translated)
+                except Exception as e:
+                    print(f"[TRANSLATE] 重試翻譯成功但更新失敗: {e}")
+                continue
+
+            with self._cond:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self._settle(text)
+                    self._metrics['given_up'] += 1
+                    print(f"[TRANSLATE] 放棄翻譯（已重試 {attempts} 次）: {text[:40]}")
+                    continue
+                self._attempts[text] = attempts
+                self._metrics['retried'] += 1
+                heapq.heappush(self._heap, (time.time() + self._backoff(attempts), next(self._seq), text))